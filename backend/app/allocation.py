@@ -0,0 +1,100 @@
+import os
+import time
+from typing import Callable, Dict, Any, List, Tuple
+
+import numpy as np
+
+
+ALLOCATION_PRUNE_FACTOR = int(os.getenv("ALLOCATION_PRUNE_FACTOR", "4"))
+ALLOCATION_MAX_ROUNDS = int(os.getenv("ALLOCATION_MAX_ROUNDS", "4"))
+
+# (person key, applicant id, score) for one post, best first
+Candidate = Tuple[str, str, float]
+
+
+def solve(capacity: List[int], edge_post: np.ndarray, edge_person: np.ndarray, edge_score: np.ndarray, n_persons: int) -> np.ndarray:
+    """Indices of the edges in a maximum-score assignment.
+
+    Each post takes at most ``capacity[post]`` edges and each person at most
+    one. This is a transportation problem (min-cost flow from persons to
+    posts); its constraint matrix is totally unimodular, so HiGHS returns an
+    integral optimum straight from the LP.
+    """
+    from scipy import sparse
+    from scipy.optimize import milp, LinearConstraint, Bounds
+    n_edges = len(edge_score)
+    if n_edges == 0:
+        return np.zeros(0, dtype=np.int64)
+    n_posts = len(capacity)
+    cols = np.arange(n_edges)
+    a = sparse.csr_matrix(
+        (np.ones(2 * n_edges), (np.concatenate([edge_post, n_posts + edge_person]), np.concatenate([cols, cols]))),
+        shape=(n_posts + n_persons, n_edges),
+    )
+    upper = np.concatenate([np.asarray(capacity, dtype=np.float64), np.ones(n_persons)])
+    res = milp(
+        -np.asarray(edge_score, dtype=np.float64),
+        constraints=LinearConstraint(a, -np.inf, upper),
+        bounds=Bounds(0, 1),
+        integrality=np.ones(n_edges),
+    )
+    if res.x is None:
+        raise RuntimeError(f"Allocation solver failed: {res.message}")
+    return np.flatnonzero(res.x > 0.5)
+
+
+def allocate(
+    capacity: Dict[str, int],
+    candidates: Callable[[str, int], List[Candidate]],
+    prune_factor: int = ALLOCATION_PRUNE_FACTOR,
+    max_rounds: int = ALLOCATION_MAX_ROUNDS,
+) -> Dict[str, Any]:
+    """Assign applicants to posts maximizing total score, one offer per person.
+
+    Only each post's ``capacity * prune_factor`` best candidates become
+    edges. A post left short while it still had unseen candidates gets its
+    candidate list doubled and the problem is solved again, up to
+    ``max_rounds`` times, so pruning only costs optimality where a post's
+    whole shortlist was taken by other posts.
+    """
+    start = time.perf_counter()
+    posts = [pid for pid, cap in capacity.items() if cap > 0]
+    caps = [capacity[pid] for pid in posts]
+    k = {pid: capacity[pid] * max(1, prune_factor) for pid in posts}
+    rounds = 0
+    while True:
+        rounds += 1
+        persons: Dict[str, int] = {}
+        edges: List[Tuple[int, int, float, str]] = []
+        exhausted = {}
+        for p, pid in enumerate(posts):
+            cands = candidates(pid, k[pid])
+            exhausted[pid] = len(cands) < k[pid]
+            for person, applicant_id, score in cands:
+                edges.append((p, persons.setdefault(person, len(persons)), score, applicant_id))
+        chosen = solve(
+            caps,
+            np.fromiter((e[0] for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((e[1] for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges)),
+            len(persons),
+        )
+        filled = np.bincount([edges[i][0] for i in chosen], minlength=len(posts))
+        short = [pid for p, pid in enumerate(posts) if filled[p] < caps[p] and not exhausted[pid]]
+        if not short or rounds >= max_rounds:
+            break
+        for pid in short:
+            k[pid] *= 2
+    assignments: Dict[str, List[Tuple[str, float]]] = {pid: [] for pid in posts}
+    for i in chosen.tolist():
+        p, _, score, applicant_id = edges[i]
+        assignments[posts[p]].append((applicant_id, score))
+    for rows in assignments.values():
+        rows.sort(key=lambda r: -r[1])
+    return {
+        "assignments": assignments,
+        "total_score": round(float(sum(edges[i][2] for i in chosen.tolist())), 2),
+        "edges": len(edges),
+        "rounds": rounds,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,238 @@
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Optional, Dict, Any, Iterable, List, Sequence
+
+import numpy as np
+
+
+ANALYTICS_SCORE_BIN = float(os.getenv("ANALYTICS_SCORE_BIN", "5"))
+BREAKDOWN_FIELDS = ("location", "rural", "social_category")
+PERCENTILES = (25, 50, 75, 90)
+
+
+class ScoreHistogram:
+    """Sparse fixed-width histogram; percentiles interpolate inside a bin."""
+
+    __slots__ = ("width", "bins", "count", "min", "max")
+
+    def __init__(self, width: float = ANALYTICS_SCORE_BIN):
+        self.width = width
+        self.bins: Counter = Counter()
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, scores: Sequence[float]):
+        if len(scores) == 0:
+            return
+        arr = np.asarray(scores, dtype=np.float64)
+        keys, counts = np.unique(np.floor(arr / self.width).astype(np.int64), return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            self.bins[k] += c
+        self.count += len(arr)
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+
+    def reset(self, scores: Sequence[float]):
+        self.bins.clear()
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.add(scores)
+
+    def merge(self, other: "ScoreHistogram"):
+        self.bins.update(other.bins)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        target = self.count * q / 100
+        seen = 0
+        for k in sorted(self.bins):
+            c = self.bins[k]
+            if seen + c >= target:
+                lo = max(k * self.width, self.min)
+                hi = min((k + 1) * self.width, self.max)
+                return round(lo + (hi - lo) * ((target - seen) / c), 2)
+            seen += c
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bin_width": self.width,
+            "count": self.count,
+            "min": None if not self.count else self.min,
+            "max": None if not self.count else self.max,
+            "percentiles": {f"p{q}": self.percentile(q) for q in PERCENTILES},
+            "histogram": [
+                {"from": k * self.width, "to": (k + 1) * self.width, "count": self.bins[k]}
+                for k in sorted(self.bins) if self.bins[k]
+            ],
+        }
+
+
+class PostStats:
+    __slots__ = ("department_id", "applied", "scored", "shortlisted", "tie_break", "status",
+                 "scores", "opened_at", "filled_at")
+
+    def __init__(self, department_id: str):
+        self.department_id = department_id
+        self.applied = 0
+        self.scored = 0
+        self.shortlisted = 0
+        self.tie_break = 0
+        self.status: Counter = Counter()
+        self.scores = ScoreHistogram()
+        self.opened_at = time.time()
+        self.filled_at: Optional[float] = None
+
+
+def _bucket(field: str, value) -> str:
+    return str(value).lower() if field == "rural" else str(value)
+
+
+class Analytics:
+    """Department and post aggregates maintained as events happen.
+
+    Applicant ingestion, scoring write-backs, status changes, fills,
+    shortlists and tie-break rounds each adjust a few counters, so reading
+    the analytics costs O(posts x histogram bins) however many applicants
+    there are. Nothing here scans APPLICANTS.
+    """
+
+    def __init__(self):
+        self._posts: Dict[str, PostStats] = {}
+        # department -> field -> value -> status (plus "total") -> count
+        self._breakdowns: Dict[str, Dict[str, Dict[str, Counter]]] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, post_id: str) -> Optional[PostStats]:
+        return self._posts.get(post_id)
+
+    # ---------------- Events ----------------
+    def add_post(self, post_id: str, department_id: str):
+        with self._lock:
+            self._posts.setdefault(post_id, PostStats(department_id))
+
+    def applicants_added(self, post_id: str, applicants: Iterable[Dict[str, Any]]):
+        with self._lock:
+            st = self._stats(post_id)
+            if st is None:
+                return
+            fields = self._breakdowns.setdefault(st.department_id, {f: {} for f in BREAKDOWN_FIELDS})
+            scores = []
+            for a in applicants:
+                st.applied += 1
+                st.status[a["status"]] += 1
+                if a["score"] is not None:
+                    scores.append(a["score"])
+                for f in BREAKDOWN_FIELDS:
+                    counts = fields[f].setdefault(_bucket(f, a[f]), Counter())
+                    counts["total"] += 1
+                    counts[a["status"]] += 1
+            st.scored += len(scores)
+            st.scores.add(scores)
+
+    def scores_written(self, post_id: str, scores: Sequence[float], start: int):
+        """Scores for the post's rows ``start`` onwards; ``start == 0`` means the whole post was rescored."""
+        with self._lock:
+            st = self._stats(post_id)
+            if st is None:
+                return
+            if start == 0:
+                st.scored = len(scores)
+                st.scores.reset(scores)
+            else:
+                st.scored += len(scores)
+                st.scores.add(scores)
+
+    def status_changed(self, post_id: str, applicant: Dict[str, Any], old: str, new: str):
+        if old == new:
+            return
+        with self._lock:
+            st = self._stats(post_id)
+            if st is None:
+                return
+            st.status[old] -= 1
+            st.status[new] += 1
+            fields = self._breakdowns[st.department_id]
+            for f in BREAKDOWN_FIELDS:
+                counts = fields[f].setdefault(_bucket(f, applicant[f]), Counter())
+                counts[old] -= 1
+                counts[new] += 1
+
+    def fill_changed(self, post_id: str, filled: int, positions: int):
+        with self._lock:
+            st = self._stats(post_id)
+            if st is None:
+                return
+            if filled >= positions:
+                if st.filled_at is None:
+                    st.filled_at = time.time()
+            else:
+                st.filled_at = None
+
+    def shortlisted(self, post_id: str, count: int):
+        with self._lock:
+            st = self._stats(post_id)
+            if st is not None:
+                st.shortlisted = count
+
+    def tie_break(self, post_id: str, count: int):
+        with self._lock:
+            st = self._stats(post_id)
+            if st is not None:
+                st.tie_break = count
+
+    # ---------------- Reads ----------------
+    def post_summary(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        st = self._posts.get(post["id"])
+        if st is None:
+            return {"post_id": post["id"]}
+        positions = post.get("positions", 0)
+        filled = post.get("positions_filled", 0)
+        return {
+            "post_id": post["id"],
+            "title": post.get("title"),
+            "funnel": {
+                "applied": st.applied,
+                "scored": st.scored,
+                "shortlisted": st.shortlisted,
+                "tie_break": st.tie_break,
+                "selected": st.status["selected"],
+                "rejected": st.status["rejected"],
+            },
+            "positions": positions,
+            "positions_filled": filled,
+            "fill_rate": round(filled / positions, 4) if positions else None,
+            "time_to_fill_seconds": None if st.filled_at is None else round(st.filled_at - st.opened_at, 3),
+            "scores": st.scores.to_dict(),
+        }
+
+    def department(self, department_id: str, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            summaries = [self.post_summary(p) for p in posts]
+            combined = ScoreHistogram()
+            for p in posts:
+                st = self._posts.get(p["id"])
+                if st is not None:
+                    combined.merge(st.scores)
+            fields = self._breakdowns.get(department_id, {})
+            breakdowns = {
+                f: {v: {s: n for s, n in counts.items() if n} for v, counts in sorted(fields.get(f, {}).items())}
+                for f in BREAKDOWN_FIELDS
+            }
+        positions = sum(p.get("positions", 0) for p in posts)
+        filled = sum(p.get("positions_filled", 0) for p in posts)
+        return {
+            "fill_rate": round(filled / positions, 4) if positions else None,
+            "scores": combined.to_dict(),
+            "breakdowns": breakdowns,
+            "posts": summaries,
+        }
@@ -0,0 +1,203 @@
+import sys
+import threading
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Union
+
+Codes = Optional[Tuple[int, ...]]
+
+
+class _BitVocab:
+    """Interned string <-> bit position table shared by every applicant."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+        self._lock = threading.Lock()
+        for v in values:
+            self.bit(v)
+
+    def bit(self, value: str) -> int:
+        b = self.index.get(value)
+        if b is None:
+            with self._lock:
+                b = self.index.get(value)
+                if b is None:
+                    b = len(self.values)
+                    self.values.append(sys.intern(value))
+                    self.index[self.values[b]] = b
+        return b
+
+    def encode(self, values: Iterable[str]) -> Tuple[int, Codes]:
+        """The bitset of ``values`` and their codes in the given order.
+
+        The codes are None when that order is vocabulary order without
+        repeats, which is all the bitset can render by itself.
+        """
+        codes = tuple(self.bit(v) for v in values)
+        bits = 0
+        for b in codes:
+            bits |= 1 << b
+        return bits, _order(codes)
+
+    def remap(self, values: List[str]) -> Optional[List[int]]:
+        """Register ``values`` (another vocabulary's order) and return old bit -> new bit.
+
+        Returns None when every value lands on the same bit, so bitsets
+        written against ``values`` can be used as they are.
+        """
+        mapping = [self.bit(v) for v in values]
+        return None if mapping == list(range(len(values))) else mapping
+
+    def translate(self, bits: int, codes: Codes, mapping: List[int]) -> Tuple[int, Codes]:
+        """``encode``'s output rewritten from another vocabulary's bits to this one's."""
+        codes = tuple(mapping[b] for b in (codes if codes is not None else _positions(bits)))
+        out = 0
+        for b in codes:
+            out |= 1 << b
+        return out, _order(codes)
+
+    def decode(self, bits: int, codes: Codes = None) -> List[str]:
+        values = self.values
+        return [values[b] for b in (codes if codes is not None else _positions(bits))]
+
+
+def _positions(bits: int) -> List[int]:
+    out = []
+    i = 0
+    while bits:
+        if bits & 1:
+            out.append(i)
+        bits >>= 1
+        i += 1
+    return out
+
+
+def _order(codes: Tuple[int, ...]) -> Codes:
+    return None if all(a < b for a, b in zip(codes, codes[1:])) else codes
+
+
+SKILL_VOCAB = _BitVocab()
+SECTOR_VOCAB = _BitVocab()
+
+FIELDS = (
+    "id", "name", "email", "skills", "qualifications", "location", "sector_interests",
+    "rural", "social_category", "past_participation", "score", "status",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Applicant:
+    """Slotted applicant record that still behaves like the old dict.
+
+    Categorical strings are interned so every record shares one copy, and
+    skills / sector interests are stored as bitsets over shared vocabularies.
+    When a list was given in another order, or with repeats, its vocabulary
+    codes are kept as well and it renders exactly as given. ``keys()`` and
+    ``__getitem__`` make ``{**a}``, ``dict(a)`` and FastAPI's encoder produce
+    the same JSON as a plain dict with the same keys.
+    """
+
+    __slots__ = (
+        "id", "name", "email", "skill_bits", "qualifications", "location", "sector_bits",
+        "rural", "social_category", "past_participation", "score", "status", "skill_codes", "sector_codes",
+    )
+
+    def __init__(self, id: str, name: str, email: str, skills: Iterable[str], qualifications: str,
+                 location: str, sector_interests: Iterable[str], rural: bool, social_category: str,
+                 past_participation: int = 0, score: Optional[float] = None, status: str = "applied"):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.skill_bits, self.skill_codes = SKILL_VOCAB.encode(skills)
+        self.qualifications = _intern(qualifications)
+        self.location = _intern(location)
+        self.sector_bits, self.sector_codes = SECTOR_VOCAB.encode(sector_interests)
+        self.rural = bool(rural)
+        self.social_category = _intern(social_category)
+        self.past_participation = past_participation
+        self.score = score
+        self.status = _intern(status)
+
+    @classmethod
+    def coerce(cls, a: Union["Applicant", Dict[str, Any]]) -> "Applicant":
+        if isinstance(a, Applicant):
+            return a
+        return cls(**{k: a[k] for k in FIELDS if k in a})
+
+    def to_row(self) -> tuple:
+        """Slot values in ``__slots__`` order; bitsets and codes refer to the current vocabularies."""
+        return (self.id, self.name, self.email, self.skill_bits, self.qualifications, self.location,
+                self.sector_bits, self.rural, self.social_category, self.past_participation, self.score, self.status,
+                self.skill_codes, self.sector_codes)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Applicant":
+        """Rows without the two trailing code slots (older snapshots, generated data) render in vocabulary order."""
+        a = cls.__new__(cls)
+        (a.id, a.name, a.email, a.skill_bits, a.qualifications, a.location,
+         a.sector_bits, a.rural, a.social_category, a.past_participation, a.score, a.status) = row[:12]
+        a.skill_codes, a.sector_codes = row[12:] or (None, None)
+        return a
+
+    @property
+    def skills(self) -> List[str]:
+        return SKILL_VOCAB.decode(self.skill_bits, self.skill_codes)
+
+    @property
+    def sector_interests(self) -> List[str]:
+        return SECTOR_VOCAB.decode(self.sector_bits, self.sector_codes)
+
+    # ---------------- Mapping protocol ----------------
+    def keys(self):
+        return FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET
+
+    def __getitem__(self, key: str):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key == "skills":
+            self.skill_bits, self.skill_codes = SKILL_VOCAB.encode(value)
+        elif key == "sector_interests":
+            self.sector_bits, self.sector_codes = SECTOR_VOCAB.encode(value)
+        elif key in _FIELD_SET:
+            setattr(self, key, _intern(value))
+        else:
+            raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        if key not in _FIELD_SET:
+            return default
+        return getattr(self, key)
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in FIELDS]
+
+    def values(self):
+        return [getattr(self, k) for k in FIELDS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in FIELDS}
+
+    def __eq__(self, other):
+        if isinstance(other, (Applicant, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Applicant({self.to_dict()!r})"
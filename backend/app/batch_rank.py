@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from .scoring import score_rows
+
+
+RANK_WORKERS = int(os.getenv("RANK_WORKERS", "0")) or os.cpu_count() or 1
+RANK_CHUNK_ROWS = int(os.getenv("RANK_CHUNK_ROWS", "200000"))
+RANK_JOB_RETENTION = int(os.getenv("RANK_JOB_RETENTION", "100"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# column name -> (byte offset, shape, dtype) inside the job's shared block
+Layout = Dict[str, Tuple[int, Tuple[int, ...], str]]
+
+
+def _views(buf, layout: Layout) -> Dict[str, np.ndarray]:
+    return {k: np.ndarray(shape, dtype=np.dtype(dt), buffer=buf, offset=off) for k, (off, shape, dt) in layout.items()}
+
+
+def _score_into(data_buf, layout: Layout, plan: Dict[str, Any], start: int, end: int, out_buf, out_offset: int) -> int:
+    cols = _views(data_buf, layout)
+    result = np.ndarray((end - start,), dtype=np.float64, buffer=out_buf, offset=out_offset + start * 8)
+    result[:] = score_rows(cols, plan, start, end)
+    return end - start
+
+
+def _score_chunk(data_name: str, layout: Layout, plan: Dict[str, Any], start: int, end: int,
+                 out_name: str, out_offset: int) -> int:
+    """Pool task: score rows ``start:end`` of one post straight from shared memory into the output block."""
+    data, out = shared_memory.SharedMemory(name=data_name), shared_memory.SharedMemory(name=out_name)
+    try:
+        return _score_into(data.buf, layout, plan, start, end, out.buf, out_offset)
+    finally:
+        data.close()
+        out.close()
+
+
+class RankJob:
+    __slots__ = ("id", "scope", "status", "posts_total", "posts_done", "rows_total", "rows_done",
+                 "stale", "error", "created_at", "started_at", "finished_at")
+
+    def __init__(self, scope: str, posts_total: int):
+        self.id = uuid.uuid4().hex
+        self.scope = scope
+        self.status = QUEUED
+        self.posts_total = posts_total
+        self.posts_done = 0
+        self.rows_total = 0
+        self.rows_done = 0
+        self.stale: List[str] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id, "scope": self.scope, "status": self.status,
+            "posts_total": self.posts_total, "posts_done": self.posts_done,
+            "rows_total": self.rows_total, "rows_done": self.rows_done,
+            "progress": round(self.rows_done / self.rows_total, 4) if self.rows_total else (1.0 if self.status == DONE else 0.0),
+            "stale_posts": self.stale, "error": self.error,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+        }
+
+
+class BatchRanker:
+    """Re-ranks many posts in one background job, scoring on a process pool.
+
+    Each post's column arrays are copied once into a shared-memory block and
+    workers score row ranges of it in place, writing into a shared output
+    block, so nothing but small plans and offsets is pickled. As soon as all
+    of a post's rows are in, its scores and ranking are swapped into the
+    engine together; a post whose applicants, text or weights changed while
+    the job ran is left alone and reported as stale. With one worker the
+    rows are scored in the job thread instead.
+    """
+
+    def __init__(self, workers: int = RANK_WORKERS, chunk_rows: int = RANK_CHUNK_ROWS, retention: int = RANK_JOB_RETENTION):
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.retention = retention
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, RankJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs threads can inherit held locks
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def submit(self, scope: str, engine, posts: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> RankJob:
+        job = RankJob(scope, len(posts))
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.retention:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job, engine, posts), name=f"rank-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return None if job is None else job.to_dict()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: RankJob, engine, posts):
+        job.status, job.started_at = RUNNING, time.time()
+        data = out = None
+        try:
+            snaps = []
+            for post, applicants in posts:
+                key, arrays, plan = engine.snapshot(post, applicants)
+                snaps.append((post, applicants, key, arrays, plan, len(arrays["qual"])))
+            job.rows_total = sum(s[5] for s in snaps)
+
+            layouts: List[Layout] = []
+            size = 0
+            for _, _, _, arrays, _, _ in snaps:
+                layout = {}
+                for k, arr in arrays.items():
+                    layout[k] = (size, arr.shape, arr.dtype.str)
+                    size += (arr.nbytes + 7) // 8 * 8
+                layouts.append(layout)
+            data = shared_memory.SharedMemory(create=True, size=max(size, 8))
+            out = shared_memory.SharedMemory(create=True, size=max(job.rows_total * 8, 8))
+            for (_, _, _, arrays, _, _), layout in zip(snaps, layouts):
+                views = _views(data.buf, layout)
+                for k, arr in arrays.items():
+                    views[k][...] = arr
+                del views
+
+            offsets, pending, offset = [], [], 0
+            for snap in snaps:
+                n = snap[5]
+                offsets.append(offset)
+                pending.append(-(-n // self.chunk_rows))
+                offset += n * 8
+
+            def chunks(i):
+                n = snaps[i][5]
+                for start in range(0, n, self.chunk_rows):
+                    yield i, start, min(n, start + self.chunk_rows)
+
+            tasks = [t for i in range(len(snaps)) for t in chunks(i)]
+            if self.workers <= 1:
+                done = ((i, _score_into(data.buf, layouts[i], snaps[i][4], s, e, out.buf, offsets[i])) for i, s, e in tasks)
+            else:
+                pool = self._executor()
+                futures = {pool.submit(_score_chunk, data.name, layouts[i], snaps[i][4], s, e, out.name, offsets[i]): i
+                           for i, s, e in tasks}
+                done = ((futures[f], f.result()) for f in as_completed(futures))
+            for i, rows in done:
+                job.rows_done += rows
+                pending[i] -= 1
+                if pending[i] == 0:
+                    post, applicants, key, _, _, n = snaps[i]
+                    scores = np.ndarray((n,), dtype=np.float64, buffer=out.buf, offset=offsets[i]).copy()
+                    if not engine.install(post, applicants, key, scores):
+                        job.stale.append(post["id"])
+                    job.posts_done += 1
+            status = DONE
+        except Exception as e:
+            status, job.error = FAILED, f"{type(e).__name__}: {e}"
+        finally:
+            for shm in (data, out):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            job.finished_at = time.time()
+        job.status = status
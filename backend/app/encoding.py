@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+from typing import Optional, Callable, Dict, Any, Iterable, Sequence, Tuple
+
+import numpy as np
+from fastapi import Response
+
+from .applicants import Applicant, FIELDS as APPLICANT_FIELDS
+from .exports import parse_fields
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder produces the same JSON, only slower
+    orjson = None
+
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "200000"))
+
+POST_FIELDS = (
+    "id", "title", "description", "stipend", "positions", "positions_filled", "applied",
+    "skills_required", "location_preference", "sector",
+)
+
+Fields = Optional[Tuple[str, ...]]
+
+
+class Raw(bytes):
+    """Already-encoded JSON, spliced into a response as is."""
+
+
+def _default(obj):
+    if isinstance(obj, Applicant):
+        return obj.to_dict()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj) -> bytes:
+    """JSON bytes for ``obj``; ``Raw`` values at the top level of a dict or list are spliced in."""
+    if isinstance(obj, Raw):
+        return obj
+    if isinstance(obj, dict) and any(isinstance(v, Raw) for v in obj.values()):
+        return b"{" + b",".join(_dumps(str(k)) + b":" + dumps(v) for k, v in obj.items()) + b"}"
+    if isinstance(obj, list) and any(isinstance(v, Raw) for v in obj):
+        return join(dumps(v) for v in obj)
+    return _dumps(obj)
+
+
+def join(fragments: Iterable[bytes]) -> Raw:
+    return Raw(b"[" + b",".join(fragments) + b"]")
+
+
+def extend(fragment: bytes, extra: Dict[str, Any]) -> bytes:
+    """``fragment`` (an encoded object) with ``extra``'s keys appended."""
+    if fragment == b"{}":
+        return _dumps(extra)
+    return fragment[:-1] + b"," + _dumps(extra)[1:]
+
+
+def project(fields: Optional[str], allowed: Sequence[str]) -> Fields:
+    """The ``fields=`` query parameter as a tuple, or None for every field."""
+    if not fields:
+        return None
+    return tuple(parse_fields(fields, [], allowed))
+
+
+def pick(record, fields: Fields) -> Dict[str, Any]:
+    if isinstance(record, Applicant):
+        return {k: getattr(record, k) for k in (fields or APPLICANT_FIELDS)}
+    if fields is None:
+        return record
+    return {k: record.get(k) for k in fields}
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson, skipping FastAPI's ``jsonable_encoder`` pass."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def carry_headers(out: Response, response: Optional[Response]) -> Response:
+    # A returned response replaces the injected one, so carry over the headers set on it
+    if response is not None:
+        for k, v in response.headers.items():
+            if k not in ("content-length", "content-type"):
+                out.headers[k] = v
+    return out
+
+
+def respond(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    return carry_headers(FastJSONResponse(content, status_code=status_code), response)
+
+
+class FragmentCache:
+    """Encoded JSON per (record id, projection), reused while the record's stamp is unchanged.
+
+    ``stamp`` returns the parts of a record that can change after it is
+    created; it is stored next to each fragment and compared on every hit,
+    so a hit is a dict lookup and a comparison instead of building and
+    encoding a dict. Past ``max_entries`` the oldest entries are dropped.
+    """
+
+    def __init__(self, stamp: Callable[[Any], Any], max_entries: int = FRAGMENT_CACHE_SIZE):
+        self.stamp = stamp
+        self.max_entries = max_entries
+        self._cache: Dict[Tuple[str, Fields], Tuple[Any, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, record, fields: Fields = None) -> bytes:
+        key = (record["id"], fields)
+        stamp = self.stamp(record)
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        body = _dumps(pick(record, fields))
+        with self._lock:
+            while len(self._cache) >= self.max_entries > 0:
+                self._cache.pop(next(iter(self._cache)))
+            if self.max_entries > 0:
+                self._cache[key] = (stamp, body)
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def applicant_stamp(a: Applicant) -> Tuple[Any, Any]:
+    # Score and status are the only applicant fields the app changes after creation
+    return a.score, a.status
+
+
+def post_stamp(p: Dict[str, Any]) -> Tuple[Any, ...]:
+    # Lists are copied so an in-place edit still changes the stamp
+    return tuple(tuple(v) if isinstance(v, list) else v for v in p.values())
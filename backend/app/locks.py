@@ -0,0 +1,22 @@
+import threading
+from typing import Dict, Hashable
+
+
+class KeyedLocks:
+    """One re-entrant lock per key (post id, department id, ...), created on first use.
+
+    Lets unrelated keys proceed in parallel while operations on the same key
+    are serialized. Locks are never dropped; there is one per post, so the
+    table stays as small as the post registry.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, threading.RLock] = {}
+        self._guard = threading.Lock()
+
+    def __call__(self, key: Hashable) -> threading.RLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
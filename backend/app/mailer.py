@@ -0,0 +1,301 @@
+import asyncio
+import json
+import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from email.message import EmailMessage as MIMEMessage
+from typing import Optional, Callable, Dict, Any, List, Sequence, Set
+
+
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "log")          # log | file | smtp
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", "outbox.ndjson")
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "1025"))
+EMAIL_FROM = os.getenv("EMAIL_FROM", "hr@example.com")
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "4"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "100"))
+EMAIL_RATE_PER_SEC = float(os.getenv("EMAIL_RATE_PER_SEC", "200"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_BACKOFF_SECONDS = float(os.getenv("EMAIL_BACKOFF_SECONDS", "0.5"))
+EMAIL_STATUS_RETENTION = int(os.getenv("EMAIL_STATUS_RETENTION", "200000"))
+
+QUEUED, SENDING, RETRYING, SENT, FAILED = "queued", "sending", "retrying", "sent", "failed"
+
+
+class EmailMessage:
+    __slots__ = ("id", "batch_id", "to", "subject", "body", "status", "attempts", "error", "updated_at")
+
+    def __init__(self, id: str, batch_id: str, to: str, subject: str, body: str):
+        self.id = id
+        self.batch_id = batch_id
+        self.to = to
+        self.subject = subject
+        self.body = body
+        self.status = QUEUED
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.updated_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "message_id": self.id, "batch_id": self.batch_id, "to": self.to, "subject": self.subject,
+            "status": self.status, "attempts": self.attempts, "error": self.error, "updated_at": self.updated_at,
+        }
+
+
+class EmailBatch:
+    """A group of recipients submitted by one request.
+
+    Messages are rendered by the workers, not by the request, so submitting
+    10k recipients only stores the item list and the render function.
+    """
+
+    __slots__ = ("id", "kind", "items", "render", "total", "next_index", "counts", "created_at")
+
+    def __init__(self, kind: str, items: Sequence[Any], render: Callable[[Any], Dict[str, str]]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.items = items
+        self.render = render
+        self.total = len(items)
+        self.next_index = 0
+        self.counts = {QUEUED: self.total, SENDING: 0, RETRYING: 0, SENT: 0, FAILED: 0}
+        self.created_at = time.time()
+
+    def message_id(self, i: int) -> str:
+        return f"{self.id}.{i}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"batch_id": self.id, "kind": self.kind, "total": self.total, "created_at": self.created_at, **self.counts}
+
+
+# ---------------- Transports ----------------
+class LogTransport:
+    """Accepts every message and drops it; the default when nothing is configured."""
+
+    def send(self, messages: List[EmailMessage]):
+        return None
+
+
+class FileTransport:
+    """Appends one JSON line per message; handy as a test sink."""
+
+    def __init__(self, path: str = EMAIL_FILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, messages: List[EmailMessage]):
+        lines = "".join(json.dumps({"message_id": m.id, "to": m.to, "subject": m.subject, "body": m.body}) + "\n"
+                        for m in messages)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class SMTPTransport:
+    """Delivers a chunk over one SMTP connection (e.g. ``python -m aiosmtpd -n`` for debugging)."""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, sender: str = EMAIL_FROM):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, messages: List[EmailMessage]):
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            for m in messages:
+                mime = MIMEMessage()
+                mime["From"] = self.sender
+                mime["To"] = m.to
+                mime["Subject"] = m.subject
+                mime["Message-ID"] = f"<{m.id}@pm-internship>"
+                mime.set_content(m.body)
+                smtp.send_message(mime)
+
+
+def transport_from_env():
+    if EMAIL_TRANSPORT == "file":
+        return FileTransport(EMAIL_FILE_PATH)
+    if EMAIL_TRANSPORT == "smtp":
+        return SMTPTransport(SMTP_HOST, SMTP_PORT, EMAIL_FROM)
+    return LogTransport()
+
+
+# ---------------- Dispatcher ----------------
+class Mailer:
+    """Background email dispatch on the app's asyncio loop.
+
+    ``submit`` is safe to call from the threadpool endpoints and returns
+    immediately. ``start`` (run on app startup) launches ``workers`` tasks
+    that render messages in chunks of ``batch_size``, share one token-bucket
+    rate limit, and hand chunks to the blocking transport in a thread.
+    Failed chunks are retried with exponential backoff up to
+    ``max_attempts``, after which the messages are marked failed. A
+    recipient whose message can't be rendered is marked failed on its own;
+    the rest of its chunk still goes out.
+    """
+
+    def __init__(self, transport=None, workers: int = EMAIL_WORKERS, batch_size: int = EMAIL_BATCH_SIZE,
+                 rate_per_sec: float = EMAIL_RATE_PER_SEC, max_attempts: int = EMAIL_MAX_ATTEMPTS,
+                 backoff_seconds: float = EMAIL_BACKOFF_SECONDS, retention: int = EMAIL_STATUS_RETENTION):
+        self.transport = transport or transport_from_env()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.rate_per_sec = rate_per_sec
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.retention = retention
+        self._pending: deque = deque()
+        self._batches: "OrderedDict[str, EmailBatch]" = OrderedDict()
+        self._messages: "OrderedDict[str, EmailMessage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._tokens = float(batch_size)
+        self._last_refill = time.monotonic()
+        self._rate_lock: Optional[asyncio.Lock] = None
+
+    # ---------------- Producer side ----------------
+    def submit(self, kind: str, items: Sequence[Any], render: Callable[[Any], Dict[str, str]]) -> EmailBatch:
+        batch = EmailBatch(kind, items, render)
+        with self._lock:
+            self._batches[batch.id] = batch
+            while len(self._batches) > self.retention:
+                self._batches.popitem(last=False)
+        if batch.total:
+            self._pending.append(batch)
+            self._notify()
+        return batch
+
+    def _notify(self):
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def status(self, message_id: str) -> Optional[Dict[str, Any]]:
+        msg = self._messages.get(message_id)
+        if msg is not None:
+            return msg.to_dict()
+        # Not rendered yet: answer from the batch without materializing the message
+        batch_id, _, index = message_id.partition(".")
+        batch = self._batches.get(batch_id)
+        if batch is None or not index.isdigit() or int(index) >= batch.total:
+            return None
+        return {"message_id": message_id, "batch_id": batch_id, "status": QUEUED, "attempts": 0}
+
+    def batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        batch = self._batches.get(batch_id)
+        return None if batch is None else batch.to_dict()
+
+    # ---------------- Lifecycle ----------------
+    async def start(self):
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._rate_lock = asyncio.Lock()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self._pending:
+            self._wake.set()
+
+    async def stop(self):
+        tasks = self._tasks + list(self._retries)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        self._loop = None
+
+    # ---------------- Workers ----------------
+    def _take_chunk(self):
+        try:
+            batch = self._pending.popleft()
+        except IndexError:
+            return None
+        start = batch.next_index
+        end = min(start + self.batch_size, batch.total)
+        batch.next_index = end
+        if end < batch.total:
+            # Let another worker pick up the rest of this batch in parallel
+            self._pending.appendleft(batch)
+        chunk, broken = [], []
+        for i in range(start, end):
+            try:
+                rendered = batch.render(batch.items[i])
+                chunk.append(EmailMessage(batch.message_id(i), batch.id, rendered["to"], rendered["subject"], rendered["body"]))
+            except Exception as e:
+                broken.append((EmailMessage(batch.message_id(i), batch.id, "", "", ""), repr(e)))
+        if end >= batch.total:
+            batch.items = ()  # rendering is done; release the recipient list
+        self._remember(chunk + [m for m, _ in broken])
+        for m, error in broken:
+            self._mark(batch, [m], FAILED, error)
+        return batch, chunk
+
+    def _remember(self, chunk: List[EmailMessage]):
+        with self._lock:
+            for m in chunk:
+                self._messages[m.id] = m
+            while len(self._messages) > self.retention:
+                self._messages.popitem(last=False)
+
+    def _mark(self, batch: EmailBatch, chunk: List[EmailMessage], status: str, error: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            for m in chunk:
+                batch.counts[m.status] -= 1
+                batch.counts[status] += 1
+                m.status = status
+                m.error = error
+                m.updated_at = now
+
+    async def _worker(self):
+        while True:
+            taken = self._take_chunk()
+            if taken is None:
+                self._wake.clear()
+                if not self._pending:
+                    await self._wake.wait()
+                continue
+            if taken[1]:
+                await self._deliver(*taken)
+
+    async def _throttle(self, n: int):
+        if self.rate_per_sec <= 0:
+            return
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(float(max(self.batch_size, n)), self._tokens + (now - self._last_refill) * self.rate_per_sec)
+                self._last_refill = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                await asyncio.sleep((n - self._tokens) / self.rate_per_sec)
+
+    async def _deliver(self, batch: EmailBatch, chunk: List[EmailMessage]):
+        for m in chunk:
+            m.attempts += 1
+        self._mark(batch, chunk, SENDING)
+        await self._throttle(len(chunk))
+        try:
+            await asyncio.to_thread(self.transport.send, chunk)
+        except Exception as e:  # transport errors are retried, never raised into the loop
+            attempts = chunk[0].attempts
+            if attempts >= self.max_attempts:
+                self._mark(batch, chunk, FAILED, repr(e))
+                return
+            self._mark(batch, chunk, RETRYING, repr(e))
+            task = asyncio.create_task(self._retry(batch, chunk, self.backoff_seconds * (2 ** (attempts - 1))))
+            # The loop only keeps weak references to tasks; hold on until it finishes
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+            return
+        self._mark(batch, chunk, SENT)
+
+    async def _retry(self, batch: EmailBatch, chunk: List[EmailMessage], delay: float):
+        await asyncio.sleep(delay)
+        await self._deliver(batch, chunk)
@@ -1,18 +1,75 @@
-from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import gc
 import uuid
-from typing import Optional, List, Dict, Any
-from fastapi.responses import StreamingResponse
-
-import io
-
-SELECTED: Dict[str, List[Dict[str, Any]]] = {}
-REJECTED: Dict[str, List[Dict[str, Any]]] = {}
-MEETINGS: Dict[str, List[Dict[str, Any]]] = {}
-TIE_TESTS: Dict[str, Dict[str, str]] = {}
-
-app = FastAPI()
+import threading
+import asyncio
+from contextlib import asynccontextmanager, contextmanager, ExitStack
+from typing import Optional, Callable, List, Dict, Any, Sequence
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from .sessions import SessionStore, SESSION_TTL_SECONDS, SESSION_PURGE_SECONDS
+from .registry import Registry, ACTIVE, PAST
+from .scoring import ScoringEngine
+from .applicants import Applicant, FIELDS as APPLICANT_FIELDS
+from .exports import parse_fields, stream_export
+from .encoding import (
+    FragmentCache, POST_FIELDS, Raw, applicant_stamp, carry_headers, extend, join, pick, post_stamp, project, respond,
+)
+from .versions import Versions, etag_matches
+from .membership import EntryLog
+from .notifications import NotificationFeed, NotificationHub
+from .mailer import Mailer
+from .metrics import Metrics, MetricsMiddleware, SamplingProfiler, PROFILER_ENABLED, PROFILE_MAX_SECONDS
+from .storage import storage_from_env
+from .analytics import Analytics
+from .search import InvertedIndex
+from .semantic import post_text, applicant_text
+from .allocation import allocate
+from .synthetic import (
+    SECTORS, DATA_SEED, SEED_APPLICANTS_PER_POST, SEED_SYNTHETIC_POSTS, generate_applicants, generate_posts,
+)
+from .batch_rank import BatchRanker
+from .startup import StateLoader, LAZY_LOAD
+from .locks import KeyedLocks
+from .shared import SharedSessionStore, shared_from_env, START, SHARED_POLL_SECONDS, SHARED_TRIM_INTERVAL_SECONDS
+from .pagination import NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, applicant_filter, check_sort, decode_cursor, iter_positions, paginate
+
+MAILER = Mailer()
+RANKER = BatchRanker()
+METRICS = Metrics()
+PROFILER = SamplingProfiler() if PROFILER_ENABLED else None
+NOTIFY_HUB = NotificationHub()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await MAILER.start()
+    NOTIFY_HUB.bind(asyncio.get_running_loop())
+    follower = asyncio.create_task(_follow_shared()) if SHARED is not None else None
+    purger = asyncio.create_task(_purge_sessions())
+    LOADER.start_warmup()
+    yield
+    if follower is not None:
+        follower.cancel()
+    purger.cancel()
+    await MAILER.stop()
+    RANKER.shutdown()
+    STORAGE.close()
+
+def _request_state(request: Request):
+    # Runs before every endpoint: loads the state the request touches, then
+    # catches up with changes made by other workers
+    if request.url.path in PROBE_PATHS:
+        return
+    if not LOADER.complete:
+        _ensure_request_state(request.path_params)
+    _sync_shared()
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(_request_state)])
 
 @app.get("/")
 def root():
@@ -26,17 +83,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+if METRICS.enabled:
+    # Added last so it is outermost and times the whole stack
+    app.add_middleware(MetricsMiddleware, metrics=METRICS)
 # -------------------------
 # Mock Storage
 # -------------------------
 USERS: Dict[str, Dict[str, Any]] = {}
 POSTS: Dict[str, List[Dict[str, Any]]] = {}
 PAST_POSTS: Dict[str, List[Dict[str, Any]]] = {}
-APPLICANTS: Dict[str, List[Dict[str, Any]]] = {}
-SELECTED: Dict[str, List[Dict[str, Any]]] = {}
-REJECTED: Dict[str, List[Dict[str, Any]]] = {}
-NOTIFICATIONS: Dict[str, List[Dict[str, Any]]] = {}
+APPLICANTS: Dict[str, List[Applicant]] = {}
+SELECTED: Dict[str, EntryLog] = {}
+REJECTED: Dict[str, EntryLog] = {}
+MEETINGS: Dict[str, List[Dict[str, Any]]] = {}
+TIE_TESTS: Dict[str, Dict[str, str]] = {}
+NOTIFICATIONS: Dict[str, NotificationFeed] = {}
+SELECTED_BY_POST: Dict[str, Dict[str, Dict[str, Any]]] = {}  # post_id -> applicant_id -> selected entry
+REJECTED_BY_POST: Dict[str, Dict[str, Applicant]] = {}  # post_id -> applicant_id -> applicant
+_POST_LOCKS = KeyedLocks()          # serializes read-check-write decisions per post
+_POSTS_LOCK = threading.Lock()      # guards the POSTS / PAST_POSTS list rebuilds
+_STORED_SCORES: Dict[str, List[Optional[float]]] = {}  # post_id -> score per row as last written to storage
+_STORED_SCORES_LOCK = threading.Lock()
+REGISTRY = Registry()
+SCORING = ScoringEngine()
+ANALYTICS = Analytics()
+SEARCH = InvertedIndex()
+APPLICANT_JSON = FragmentCache(applicant_stamp)   # pre-encoded applicant summaries
+POST_JSON = FragmentCache(post_stamp)             # pre-encoded post summaries
+VERSIONS = Versions()                             # change counters behind ETags
+STORAGE = storage_from_env()
+SHARED = shared_from_env()
 # ---------------- Models ----------------
 class HRLoginRequest(BaseModel):
     email: str
@@ -56,6 +134,15 @@ class ScheduleBody(BaseModel):
     datetime_iso: str
     note: Optional[str] = None
 
+class PostUpdateBody(BaseModel):
+    skills_required: Optional[List[str]] = None
+    location_preference: Optional[str] = None
+
+class SearchBody(BaseModel):
+    query: Dict[str, Any]
+    post_ids: Optional[List[str]] = None
+    count_only: bool = False
+
 # ---------------- Dummy HR USERS ----------------
 HR_USERS = {}
 SEED_HR_USERS = [
@@ -73,26 +160,80 @@ for u in SEED_HR_USERS:
         "password": u["password"],
         "department_id": u["department_id"],
         "name": u["name"],
-        "token": None
     }
+SESSIONS = SharedSessionStore(SHARED.kv, SESSION_TTL_SECONDS) if SHARED is not None else SessionStore()
 # -------------------------
 # Helpers
 # -------------------------
-def _notify(department_id: str, message: str):
-    NOTIFICATIONS.setdefault(department_id, []).append({
+def _notify(department_id: str, type: str, message: str, **data):
+    _commit("notify", department_id, {
         "id": str(uuid.uuid4()),
-        "message": message
+        "type": type,
+        "message": message,
+        "created_at": time.time(),
+        **data,
     })
 
-def _move_post_to_past(post_id: str):
-    for dept_id, dept_posts in POSTS.items():
-        for p in dept_posts:
-            if p["id"] == post_id:
-                POSTS[dept_id] = [x for x in dept_posts if x["id"] != post_id]
-                PAST_POSTS.setdefault(dept_id, []).append(p)
-                _notify(dept_id, f"Internship '{p['title']}' moved to Past (all positions filled).")
-                return p
+def _decision_notice(department_id: str, post: Dict[str, Any], type: str, cands: Sequence[Any]):
+    """One notification per select/reject action, however many candidates it covered."""
+    if not cands:
+        return
+    verb = "selected" if type == "candidate_selected" else "rejected"
+    who = cands[0]["name"] if len(cands) == 1 else f"{len(cands)} candidates"
+    _notify(department_id, type, f"{who} {verb} for '{post['title']}'.",
+            post_id=post["id"], applicant_ids=[c["id"] for c in cands])
+
+# Every conditional GET revalidates, so a 304 is never served from a stale local copy
+CACHE_CONTROL = "private, no-cache"
+
+def _conditional(request: Request, response: Response, *keys) -> Optional[Response]:
+    """304 if the client's copy (If-None-Match) is still current; otherwise tags ``response``.
+
+    ``keys`` are the VERSIONS counters the response is built from. They are
+    read before any data, so a change that races the build only makes the
+    tag older than the body, never newer.
+    """
+    etag = VERSIONS.etag(keys, f"{request.url.path}?{request.url.query}")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return None
+
+def _analytics_changed(post_id: str, *keys):
+    """Bump ``keys`` and the department analytics counter of the post's department."""
+    entry = REGISTRY.post_entry(post_id)
+    if entry is not None:
+        keys += (("analytics", entry.department_id),)
+    VERSIONS.bump(*keys)
+
+def _post_changed(post_id: str, *keys):
+    """A post's fields or list membership changed: its department's post lists go stale too."""
+    entry = REGISTRY.post_entry(post_id)
+    if entry is not None:
+        keys += (("posts", entry.department_id),)
+    _analytics_changed(post_id, *keys)
+
+def _applicants_changed(post_id: str):
+    _analytics_changed(post_id, ("applicants", post_id))
+
+def _queue_emails(kind: str, items: Sequence[Any], render: Callable[[Any], Dict[str, str]], preview: int = 20) -> Dict[str, Any]:
+    # Rendering and delivery happen on the mailer workers; only `preview`
+    # messages are rendered here so the response can show them
+    batch = MAILER.submit(kind, items, render)
+    emails = [
+        {"message_id": batch.message_id(i), **render(items[i]), "status": "queued"}
+        for i in range(min(preview, batch.total))
+    ]
+    return {"sent_count": batch.total, "batch_id": batch.id, "emails": emails}
+
+def _move_post_to_past(post_id: str):
+    entry = REGISTRY.post_entry(post_id)
+    if entry is None or entry.state != ACTIVE:
+        return None
+    p = _commit("post_state", post_id, PAST)
+    _notify(entry.department_id, "post_archived", f"Internship '{p['title']}' moved to Past (all positions filled).", post_id=post_id)
+    return p
 # ---------------- Auth ----------------
 @app.post("/auth/login")
 def hr_login(req: HRLoginRequest):
@@ -100,8 +241,9 @@ def hr_login(req: HRLoginRequest):
     if not user or user["password"] != req.password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = str(uuid.uuid4())
-    user["token"] = token
+    token = SESSIONS.create(req.email, user)
+    if STORAGE.persistent:
+        STORAGE.add_session(SESSIONS.get(token))
     return {"access_token": token, "department_id": user["department_id"], "name": user["name"]}
 
 @app.post("/auth/register")
@@ -114,33 +256,44 @@ def hr_register(req: HRRegisterRequest):
         "password": req.password,
         "department_id": req.department_id,
         "name": req.name,
-        "token": None,
     }
+    if STORAGE.persistent:
+        STORAGE.add_user(req.email, HR_USERS[req.email])
     return {"message": "Registered"}
 
 def get_current_hr(request: Request, token: Optional[str] = Header(None), authorization: Optional[str] = Header(None)):
-    bearer = None
-    if authorization and authorization.lower().startswith("bearer "):
-        bearer = authorization.split(" ", 1)[1].strip()
-    active_token = token or bearer
-    for email, u in HR_USERS.items():
-        if u.get("token") == active_token:
-            return {"email": email, **u}
-    raise HTTPException(status_code=401, detail="Invalid token")
+    with METRICS.timer("get_current_hr"):
+        bearer = None
+        if authorization and authorization.lower().startswith("bearer "):
+            bearer = authorization.split(" ", 1)[1].strip()
+        active_token = token or bearer
+        session = SESSIONS.get(active_token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    # A copy, so an endpoint can't change the stored session
+    return dict(session)
+
+async def _purge_sessions():
+    while True:
+        await asyncio.sleep(SESSION_PURGE_SECONDS)
+        await asyncio.to_thread(SESSIONS.purge_expired)
+
+@app.post("/auth/logout")
+def hr_logout(hr=Depends(get_current_hr)):
+    SESSIONS.revoke(hr["token"])
+    if STORAGE.persistent:
+        STORAGE.revoke_session(hr["token"])
+    return {"message": "Logged out"}
+
+@app.post("/auth/logout_all")
+def hr_logout_all(hr=Depends(get_current_hr)):
+    revoked = SESSIONS.revoke_user(hr["email"])
+    if STORAGE.persistent:
+        STORAGE.revoke_user_sessions(hr["email"])
+    return {"message": "Logged out of all sessions", "revoked": revoked}
 
 
 # ---------------- Posts ----------------
-SECTORS = {
-    "it_software": "IT & Software",
-    "banking_finance": "Banking & Finance",
-    "fmcg": "FMCG",
-    "oil_gas": "Oil & Gas",
-    "manufacturing": "Manufacturing",
-    "healthcare": "Healthcare",
-    "retail": "Retail",
-    "hospitality": "Hospitality",
-}
-
 POSTS = {
     "it_software": [
         {"id": "p1", "title": "React Internship", "description": "Build modern web UIs with React, work on component libraries, accessibility, performance optimizations, and collaborate with designers to deliver pixel-perfect experiences.", "stipend": "10k", "positions": 3, "positions_filled": 0, "applied": 0, "skills_required": ["react","javascript","css"], "location_preference": "Bengaluru", "sector": SECTORS["it_software"]},
@@ -170,184 +323,623 @@ POSTS = {
 }
 
 # ---------------- Applicants ----------------
-import random
-
-QUALIFICATIONS = ["B.Tech", "BE", "BSc", "M.Tech", "MBA", "BBA", "BCom", "BA", "MSc"]
-CITIES = ["Bengaluru","Hyderabad","Mumbai","Delhi","Ahmedabad","Pune","Chennai","Kolkata","Goa","Jaipur","Lucknow"]
-SOCIAL_CATEGORIES = ["General","OBC","SC","ST","EWS"]
-FIRST_NAMES = [
-    "Aarav", "Isha", "Karan", "Priya", "Ravi", "Sneha", "Arjun", "Meera",
-    "Vikram", "Ananya", "Rahul", "Neha", "Siddharth", "Pooja", "Manish", "Kavya",
-    "Nikhil", "Sanya", "Amit", "Divya"
-]
+def seed_applicants_for_post(post_id: str, sector: str, required_skills: List[str], count: int = SEED_APPLICANTS_PER_POST,
+                             seed: int = DATA_SEED) -> List[Applicant]:
+    return generate_applicants(post_id, sector, required_skills, count, seed)
+
+def _add_applicants(post_id: str, applicants: List[Dict[str, Any]], persist: bool = True):
+    applicants = [Applicant.coerce(a) for a in applicants]
+    post_apps = APPLICANTS.setdefault(post_id, [])
+    if STORAGE.persistent:
+        if persist:
+            STORAGE.add_applicants(post_id, applicants, start=len(post_apps))
+        with _STORED_SCORES_LOCK:
+            _STORED_SCORES.setdefault(post_id, []).extend(a.score for a in applicants)
+    post_apps.extend(applicants)
+    REGISTRY.add_applicants(post_id, applicants)
+    ANALYTICS.applicants_added(post_id, applicants)
+    SEARCH.add(post_id, applicants)
+    post = REGISTRY.post(post_id)
+    if post is None:
+        SCORING.bump(post_id)
+        _applicants_changed(post_id)
+        return
+    SCORING.add_applicants(post, post_apps, len(applicants))
+    post["applied"] = len(post_apps)
+    _post_changed(post_id, ("applicants", post_id))
+
+def _ranking(post: Dict[str, Any]):
+    return SCORING.ranked(post, APPLICANTS.get(post["id"], []))
+
+def _selected(department_id: str) -> EntryLog:
+    return SELECTED.setdefault(department_id, EntryLog())
+
+def _rejected(department_id: str) -> EntryLog:
+    return REJECTED.setdefault(department_id, EntryLog())
+
+def _page_applicants(request: Request, response: Response, post_id: str, limit, cursor, sort, predicate, fields=None):
+    check_sort(sort, ("default", "score"))
+    after = decode_cursor(cursor, sort)
+    not_modified = _conditional(request, response, ("applicants", post_id))
+    if not_modified is not None:
+        return not_modified
+    applicants = APPLICANTS.get(post_id, [])
+    if sort == "score":
+        post = REGISTRY.post(post_id)
+        if post is None:
+            return []
+        source = ((k, applicants[row]) for k, row in _ranking(post).index.iter_after(after))
+    else:
+        source = iter_positions(applicants, after)
+    page = paginate(response, source, sort, limit, predicate)
+    return respond(join(APPLICANT_JSON.get(a, fields) for a in page), response)
+
+def _page_log(request: Request, response: Response, key, log: Optional[EntryLog], limit, cursor, sort, predicate, fields=None):
+    check_sort(sort, ("oldest", "newest"))
+    not_modified = _conditional(request, response, key)
+    if not_modified is not None:
+        return not_modified
+    if log is None:
+        return []
+    source = log.iter_after(decode_cursor(cursor, sort), reverse=(sort == "newest"))
+    return respond([pick(e, fields) for e in paginate(response, source, sort, limit, predicate)], response)
+
+def _set_status(post_id: str, applicant: Dict[str, Any], status: str):
+    ANALYTICS.status_changed(post_id, applicant, applicant["status"], status)
+    SEARCH.status_changed(applicant["id"], applicant["status"], status)
+    applicant["status"] = status
+    SCORING.status_changed(post_id, applicant["id"], status)
+    _applicants_changed(post_id)
+
+# ---------------- State changes ----------------
+# Selection state, post state and fields, scoring weights and notifications
+# only change through _commit. Locally the change is applied straight away;
+# with shared state it is published and every worker (this one included)
+# applies the event log in order, so all processes end up with the same state.
+def _apply_select(department_id: str, post_id: str, applicant_id: str, selected_at: str, filled: Optional[int] = None) -> Dict[str, Any]:
+    post = REGISTRY.post(post_id)
+    cand = REGISTRY.applicant(applicant_id, post_id=post_id)
+    existing = SELECTED_BY_POST.get(post_id, {}).get(applicant_id)
+    if existing is not None and existing["selected_at"] == selected_at:
+        # The same event again (replayed after a restore from storage)
+        return existing
+    _set_status(post_id, cand, "selected")
 
-LAST_NAMES = [
-    "Sharma", "Patel", "Reddy", "Gupta", "Nair", "Khan", "Mehta", "Iyer",
-    "Das", "Chopra", "Jain", "Mishra", "Agarwal", "Joshi", "Rao", "Singh"
-]
+    # Remove from REJECTED if present
+    _rejected(department_id).remove(applicant_id)
+    REJECTED_BY_POST.get(post_id, {}).pop(applicant_id, None)
+
+    # Add to SELECTED
+    selected_entry = {**cand, "post_id": post_id, "selected_at": selected_at}
+    _selected(department_id).add(selected_entry)
+    SELECTED_BY_POST.setdefault(post_id, {})[applicant_id] = selected_entry
+
+    post["positions_filled"] = post.get("positions_filled", 0) + 1 if filled is None else filled
+    ANALYTICS.fill_changed(post_id, post["positions_filled"], post["positions"])
+    _post_changed(post_id, ("selected", department_id), ("rejected", department_id))
+    return selected_entry
+
+def _apply_reject(department_id: str, post_id: str, applicant_id: str, filled: Optional[int] = None) -> bool:
+    """Whether anything changed; rejecting an applicant who already is rejected is a no-op."""
+    post = REGISTRY.post(post_id)
+    cand = REGISTRY.applicant(applicant_id, post_id=post_id)
+    if applicant_id in REJECTED_BY_POST.get(post_id, {}):
+        return False
+    _set_status(post_id, cand, "rejected")
+
+    # Remove from SELECTED if present
+    was_selected = _selected(department_id).remove(applicant_id) is not None
+    SELECTED_BY_POST.get(post_id, {}).pop(applicant_id, None)
+
+    # Decrement positions_filled if candidate was previously selected
+    if was_selected:
+        post["positions_filled"] = max(0, post.get("positions_filled", 0) - 1) if filled is None else filled
+        ANALYTICS.fill_changed(post_id, post["positions_filled"], post["positions"])
+
+    # Add to REJECTED
+    _rejected(department_id).add(cand)
+    REJECTED_BY_POST.setdefault(post_id, {})[applicant_id] = cand
+    _post_changed(post_id, ("selected", department_id), ("rejected", department_id))
+    return True
+
+def _apply_post_state(post_id: str, state: str) -> Optional[Dict[str, Any]]:
+    entry = REGISTRY.post_entry(post_id)
+    if entry is None:
+        return None
+    dept_id, p = entry.department_id, entry.record
+    with _POSTS_LOCK:
+        if entry.state != state:
+            src, dst = (POSTS, PAST_POSTS) if state == PAST else (PAST_POSTS, POSTS)
+            src[dept_id] = [x for x in src.get(dept_id, []) if x["id"] != post_id]
+            dst.setdefault(dept_id, []).append(p)
+            REGISTRY.set_post_state(post_id, state)
+    _post_changed(post_id)
+    return p
+
+def _apply_post_update(post_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    post = REGISTRY.post(post_id)
+    if post is None:
+        return None
+    post.update(changes)
+    _post_changed(post_id)
+    SCORING.bump(post_id)
+    return post
+
+def _apply_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    SCORING.set_weights(weights)
+    return SCORING.weights
+
+def _notifications(department_id: str) -> NotificationFeed:
+    return NOTIFICATIONS.setdefault(department_id, NotificationFeed())
+
+def _apply_notify(department_id: str, entry: Dict[str, Any]):
+    if _notifications(department_id).append(entry) is None:
+        return
+    VERSIONS.bump(("notifications", department_id))
+    NOTIFY_HUB.notify(department_id)
+
+_APPLY: Dict[str, Callable[..., Any]] = {
+    "select": _apply_select,
+    "reject": _apply_reject,
+    "post_state": _apply_post_state,
+    "post_update": _apply_post_update,
+    "weights": _apply_weights,
+    "notify": _apply_notify,
+}
 
-def seed_applicants_for_post(post_id: str, sector: str, required_skills: List[str], count: int = 24) -> List[Dict[str, Any]]:
-    applicants = []
-    for i in range(count):
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
-        name = f"{first} {last}"
-        email = f"{first.lower()}.{last.lower()}{i+1}@example.com"
-
-        skills_pool = list(set(required_skills + [
-            "python","excel","communication","sql","css","javascript",
-            "statistics","research","presentation","safety","operations"
-        ]))
-        skills = random.sample(skills_pool, k=min(4, len(skills_pool)))
-        qualifications = random.choice(QUALIFICATIONS)
-        location = random.choice(CITIES)
-        sector_interests = list({sector} | set(random.sample(list(SECTORS.values()), k=2)))
-        rural = random.choice([True, False])
-        social_category = random.choice(SOCIAL_CATEGORIES)
-        past_participation = random.choice([0,0,0,1])
-
-        applicants.append({
-            "id": f"{post_id}-{i+1}",
-            "name": name,
-            "email": email,
-            "skills": skills,
-            "qualifications": qualifications,
-            "location": location,
-            "sector_interests": sector_interests,
-            "rural": rural,
-            "social_category": social_category,
-            "past_participation": past_participation,
-            "score": None,
-            "status": "applied"
-        })
-    return applicants
-
-APPLICANTS: Dict[str, List[Dict[str, Any]]] = {}
-for dept_posts in POSTS.values():
-    for p in dept_posts:
-        APPLICANTS[p["id"]] = seed_applicants_for_post(p["id"], p["sector"], p.get("skills_required", []), 24)
-        p["applied"] = len(APPLICANTS[p["id"]])
-
-# ---------------- Selected ----------------
-SELECTED = {}
+def _persist(op: str, args: tuple):
+    if op == "select":
+        STORAGE.record_select(*args[:4])
+    elif op == "reject":
+        STORAGE.record_reject(*args[:3])
+    elif op == "post_state":
+        STORAGE.set_post_state(*args)
+    elif op == "post_update":
+        entry = REGISTRY.post_entry(args[0])
+        STORAGE.save_post(entry.department_id, entry.record, entry.state)
+    elif op == "notify":
+        STORAGE.add_notification(*args)
+
+def _commit(op: str, *args):
+    if SHARED is None:
+        result = _APPLY[op](*args)
+    else:
+        result = _sync_shared(until=SHARED.publish(op, *args))
+    if STORAGE.persistent:
+        # Only the worker that made the change writes it through
+        _persist(op, args)
+    return result
+
+_SYNC_LOCK = threading.Lock()
+_SYNC_STATE = {"seq": START}
+
+def _sync_shared(until: Optional[str] = None):
+    """Apply events other workers published since the last sync; returns the result for ``until``."""
+    if SHARED is None:
+        return None
+    result = None
+    with _SYNC_LOCK:
+        for seq, op, args in SHARED.events_since(_SYNC_STATE["seq"]):
+            r = _APPLY[op](*args)
+            _SYNC_STATE["seq"] = seq
+            if seq == until:
+                result = r
+    return result
+
+@contextmanager
+def _post_guard(post_id: str):
+    """Serialize decisions on one post, across workers too when state is shared.
+
+    Each post has its own lock, so different posts and departments still
+    proceed in parallel on the threadpool.
+    """
+    with _POST_LOCKS(post_id):
+        if SHARED is None:
+            yield
+            return
+        with SHARED.lock(f"post:{post_id}"):
+            _sync_shared()
+            yield
+
+def _on_scored(post_id: str, applicants: Sequence[Applicant], scores, start: int):
+    ANALYTICS.scores_written(post_id, scores, start)
+    _applicants_changed(post_id)
+    if not STORAGE.persistent:
+        return
+    # A full rescore mostly reproduces the stored scores; write only the rows that moved
+    with _STORED_SCORES_LOCK:
+        stored = _STORED_SCORES.setdefault(post_id, [])
+        if len(stored) < start + len(scores):
+            stored.extend([None] * (start + len(scores) - len(stored)))
+        changed = []
+        for row, (a, score) in enumerate(zip(applicants, scores), start):
+            if stored[row] != score:
+                stored[row] = score
+                changed.append((a["id"], float(score)))
+    if changed:
+        STORAGE.set_scores(post_id, changed)
+
+SCORING.on_scored = _on_scored
+
+def _semantic_corpus():
+    posts = [p for dept_posts in list(POSTS.values()) + list(PAST_POSTS.values()) for p in dept_posts]
+    for p in posts:
+        yield post_text(p)
+    for p in posts:
+        for a in APPLICANTS.get(p["id"], []):
+            yield applicant_text(a)
+
+SCORING.semantic.corpus = _semantic_corpus
+
+def _seed_posts():
+    # Optional generated posts on top of the demo ones, for load testing at scale
+    for dept_id, extra in generate_posts(SEED_SYNTHETIC_POSTS).items():
+        POSTS.setdefault(dept_id, []).extend(extra)
+    for dept_id, dept_posts in POSTS.items():
+        for p in dept_posts:
+            REGISTRY.add_post(dept_id, p, ACTIVE)
+            ANALYTICS.add_post(p["id"], dept_id)
+            if STORAGE.persistent:
+                STORAGE.save_post(dept_id, p, ACTIVE)
+
+def _seed_department(department_id: str):
+    for p in POSTS.get(department_id, []):
+        _add_applicants(p["id"], seed_applicants_for_post(p["id"], p["sector"], p.get("skills_required", [])))
+
+def _seed_state():
+    _seed_posts()
+    for dept_id in list(POSTS):
+        _seed_department(dept_id)
+
+def _restore_state(state: Dict[str, Any]):
+    """Rebuild the in-memory indexes from what a persistent backend loaded."""
+    POSTS.clear()
+    PAST_POSTS.clear()
+    for dept_id, st, p in state["posts"]:
+        (POSTS if st == ACTIVE else PAST_POSTS).setdefault(dept_id, []).append(p)
+        REGISTRY.add_post(dept_id, p, st)
+        ANALYTICS.add_post(p["id"], dept_id)
+    for post_id, rows in state["applicants"].items():
+        _add_applicants(post_id, rows, persist=False)
+    for dept_id, entries in state["selected"].items():
+        for post_id, applicant_id, selected_at in entries:
+            cand = REGISTRY.applicant(applicant_id)
+            entry = {**cand, "post_id": post_id, "selected_at": selected_at}
+            _selected(dept_id).add(entry)
+            SELECTED_BY_POST.setdefault(post_id, {})[applicant_id] = entry
+    for dept_id, entries in state["rejected"].items():
+        for post_id, applicant_id in entries:
+            cand = REGISTRY.applicant(applicant_id)
+            _rejected(dept_id).add(cand)
+            REJECTED_BY_POST.setdefault(post_id, {})[applicant_id] = cand
+    MEETINGS.update(state["meetings"])
+    for dept_id, entries in state["notifications"].items():
+        _notifications(dept_id).extend(entries)
+    HR_USERS.update(state.get("users", {}))
+    for session in state.get("sessions", []):
+        SESSIONS.restore(session)
+    TIE_TESTS.update(state.get("tie_tests", {}))
+    for post_id, links in TIE_TESTS.items():
+        ANALYTICS.tie_break(post_id, len(links))
+
+def _load_state():
+    # Read where the shared log ends before loading, so nothing published meanwhile is skipped
+    resume = SHARED.resume_point() if SHARED is not None and STORAGE.persistent else START
+    # One worker at a time: the first to find the store empty seeds it, the rest load that
+    with STORAGE.exclusive():
+        state = STORAGE.load() if STORAGE.persistent else None
+        if state is None:
+            # Seed data is a function of DATA_SEED, so every worker generates the same applicants
+            _seed_state()
+    if state is not None:
+        gc.disable()
+        try:
+            _restore_state(state)
+        finally:
+            gc.enable()
+        # Everything restored lives for the whole process; keep it out of later GC passes
+        gc.freeze()
+    if SHARED is not None:
+        for dept_posts in list(POSTS.values()) + list(PAST_POSTS.values()):
+            for p in dept_posts:
+                SHARED.init_filled(p["id"], p.get("positions_filled", 0))
+        if state is not None:
+            # Storage already has every event written through; only the last few
+            # seconds are replayed (harmlessly, if they were already in)
+            _SYNC_STATE["seq"] = resume
+        _sync_shared()
+
+async def _follow_shared():
+    """Keep an idle worker caught up with the shared log; with persistent storage, also trim it."""
+    next_trim = 0.0
+    while True:
+        if LOADER.complete:
+            await asyncio.to_thread(_sync_shared)
+            if STORAGE.persistent and time.monotonic() >= next_trim:
+                await asyncio.to_thread(SHARED.trim)
+                next_trim = time.monotonic() + SHARED_TRIM_INTERVAL_SECONDS
+        await asyncio.sleep(SHARED_POLL_SECONDS)
+
+# Generated seed data can be built one department at a time, on first use;
+# a persisted or shared snapshot is loaded as a whole
+if LAZY_LOAD and not STORAGE.persistent and SHARED is None:
+    _seed_posts()
+    LOADER = StateLoader(_seed_department, list(POSTS))
+else:
+    LOADER = StateLoader(lambda _: _load_state())
+
+def _ensure_request_state(params: Dict[str, Any]):
+    department_id = params.get("department_id")
+    if department_id is None and "post_id" in params:
+        entry = REGISTRY.post_entry(params["post_id"])
+        department_id = entry.department_id if entry is not None else None
+    if department_id is None and "applicant_id" in params and REGISTRY.applicant(params["applicant_id"]) is None:
+        # Unknown so far; it may belong to a department nobody has asked for yet
+        LOADER.ensure_all()
+        return
+    LOADER.ensure(department_id)
+
+# ---------------- Probes ----------------
+# Paths that must answer without loading or syncing any state
+PROBE_PATHS = ("/healthz", "/readyz", "/metrics")
+
+@app.get("/healthz")
+def liveness():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readiness(response: Response):
+    # 503 until warm-up finishes, so traffic is only routed to a warm process
+    if not LOADER.ready:
+        response.status_code = 503
+    return LOADER.status()
+
+# ---------------- Metrics ----------------
+METRICS.gauge("applicants", "Applicants held in memory.", lambda: sum(len(v) for v in list(APPLICANTS.values())))
+METRICS.gauge("selected", "Selected candidates per department.",
+              lambda: {d: len(log) for d, log in list(SELECTED.items())}, label="department")
+METRICS.gauge("notifications_buffered", "Notifications kept in memory per department.",
+              lambda: {d: len(feed) for d, feed in list(NOTIFICATIONS.items())}, label="department")
+METRICS.gauge("notification_streams", "Open notification streams.", lambda: NOTIFY_HUB.subscribers)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    # Prometheus text exposition format; numbers are per worker process
+    if not METRICS.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile")
+def debug_profile(seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS), hr=Depends(get_current_hr)):
+    """Sample every thread for `seconds` and return collapsed stacks (flamegraph.pl / speedscope input).
+
+    Only available with PROFILER_ENABLED=1.
+    """
+    if PROFILER is None:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    profile = PROFILER.run(seconds)
+    if profile is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(profile)
 
 # ---------------- Endpoints ----------------
 @app.get("/departments/{department_id}/posts")
-def get_department_posts(department_id: str, hr=Depends(get_current_hr)):
+def get_department_posts(department_id: str, request: Request, response: Response,
+                         fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, POST_FIELDS)
     posts = POSTS.get(department_id)
     if posts is None:
         raise HTTPException(status_code=404, detail="No posts found")
-    return posts
+    not_modified = _conditional(request, response, ("posts", department_id))
+    if not_modified is not None:
+        return not_modified
+    return respond(join(POST_JSON.get(p, projection) for p in list(posts)), response)
 
 def _find_post(post_id: str) -> Optional[Dict[str, Any]]:
-    for dept_posts in POSTS.values():
-        for p in dept_posts:
-            if p["id"] == post_id:
-                return p
-    return None
+    # Active posts only: selections (single, batch or auto) need one, so a
+    # past post must be restored first; rejections work on either
+    return REGISTRY.post(post_id, state=ACTIVE)
 @app.get("/departments/{department_id}/past")
-def get_past_posts(department_id: str, hr=Depends(get_current_hr)):
-    return PAST_POSTS.get(department_id, [])
+def get_past_posts(department_id: str, request: Request, response: Response,
+                   fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, POST_FIELDS)
+    not_modified = _conditional(request, response, ("posts", department_id))
+    if not_modified is not None:
+        return not_modified
+    return respond(join(POST_JSON.get(p, projection) for p in list(PAST_POSTS.get(department_id, []))), response)
 
 @app.post("/departments/{department_id}/past/{post_id}/restore")
 def restore_to_active(department_id: str, post_id: str, hr=Depends(get_current_hr)):
-    past_posts = PAST_POSTS.get(department_id, [])
-    post = next((p for p in past_posts if p["id"] == post_id), None)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found in past")
-    PAST_POSTS[department_id] = [p for p in past_posts if p["id"] != post_id]
-    POSTS.setdefault(department_id, []).append(post)
-    _notify(department_id, f"Internship '{post['title']}' restored to Active.")
+    with _post_guard(post_id):
+        post = REGISTRY.post(post_id, state=PAST, department_id=department_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found in past")
+        _commit("post_state", post_id, ACTIVE)
+        _notify(department_id, "post_restored", f"Internship '{post['title']}' restored to Active.", post_id=post_id)
     return {"message": "Restored", "post": post}
 
 @app.get("/posts/{post_id}")
-def get_post_detail(post_id: str, hr=Depends(get_current_hr)):
-    post = _find_post(post_id)
+def get_post_detail(post_id: str, request: Request, response: Response,
+                    fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, POST_FIELDS)
+    entry = REGISTRY.post_entry(post_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    not_modified = _conditional(request, response, ("posts", entry.department_id))
+    if not_modified is not None:
+        return not_modified
+    return respond(Raw(POST_JSON.get(entry.record, projection)), response)
+
+@app.patch("/posts/{post_id}")
+def update_post(post_id: str, body: PostUpdateBody, hr=Depends(get_current_hr)):
+    post = REGISTRY.post(post_id, department_id=hr["department_id"])
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    changes = {}
+    if body.skills_required is not None:
+        changes["skills_required"] = body.skills_required
+    if body.location_preference is not None:
+        changes["location_preference"] = body.location_preference
+    if not changes:
+        return post
+    return _commit("post_update", post_id, changes)
+
+@app.get("/scoring/weights")
+def get_scoring_weights(hr=Depends(get_current_hr)):
+    return SCORING.weights
+
+@app.put("/scoring/weights")
+def update_scoring_weights(weights: Dict[str, float], hr=Depends(get_current_hr)):
+    unknown = sorted(set(weights) - set(SCORING.weights))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown scoring weight: {', '.join(unknown)}")
+    # Every worker must rank with the same weights, so they go through the shared log too
+    return _commit("weights", weights)
 
 @app.get("/posts/{post_id}/applicants")
-def get_post_applicants(post_id: str, hr=Depends(get_current_hr)):
-    return APPLICANTS.get(post_id, [])
+def get_post_applicants(
+    post_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("default"),
+    status: Optional[str] = Query(None),
+    min_score: Optional[float] = Query(None),
+    location: Optional[str] = Query(None),
+    social_category: Optional[str] = Query(None),
+    skill: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    predicate = applicant_filter(status, min_score, location, social_category, skill)
+    return _page_applicants(request, response, post_id, limit, cursor, sort, predicate, project(fields, APPLICANT_FIELDS))
+
+@app.get("/posts/{post_id}/applicants/export")
+def export_post_applicants(
+    post_id: str,
+    request: Request,
+    response: Response,
+    format: str = Query("csv"),
+    fields: Optional[str] = Query(None),
+    gzip: bool = Query(False),
+    hr=Depends(get_current_hr)
+):
+    if REGISTRY.post(post_id) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    fieldnames = parse_fields(fields, ["id", "name", "email", "qualifications", "location", "score", "status"], APPLICANT_FIELDS)
+    not_modified = _conditional(request, response, ("applicants", post_id))
+    if not_modified is not None:
+        return not_modified
+    return carry_headers(stream_export(APPLICANTS.get(post_id, []), fieldnames, f"applicants_{post_id}", format, gzip), response)
 
 @app.get("/departments/{department_id}/posts/{post_id}/applicants")
-def get_department_post_applicants(department_id: str, post_id: str, hr=Depends(get_current_hr)):
-    return APPLICANTS.get(post_id, [])
+def get_department_post_applicants(
+    department_id: str,
+    post_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("default"),
+    status: Optional[str] = Query(None),
+    min_score: Optional[float] = Query(None),
+    location: Optional[str] = Query(None),
+    social_category: Optional[str] = Query(None),
+    skill: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    predicate = applicant_filter(status, min_score, location, social_category, skill)
+    return _page_applicants(request, response, post_id, limit, cursor, sort, predicate, project(fields, APPLICANT_FIELDS))
+
+@app.post("/departments/{department_id}/search")
+def search_applicants(
+    department_id: str,
+    body: SearchBody,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("default"),
+    fields: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    """Boolean search over applicants of every post in the department.
+
+    ``query`` is a tree of and / or / not nodes over skill, location,
+    qualification, sector_interest and status terms, answered from the
+    inverted index. ``sort=score`` ranks matches by their post's
+    match_candidates score.
+    """
+    if hr["department_id"] != department_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    check_sort(sort, ("default", "score"))
+    projection = project(fields, APPLICANT_FIELDS)
+    posts = {p["id"]: p for p in POSTS.get(department_id, []) + PAST_POSTS.get(department_id, [])}
+    if body.post_ids is not None:
+        unknown = [pid for pid in body.post_ids if pid not in posts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Post not found: {', '.join(unknown)}")
+        posts = {pid: posts[pid] for pid in body.post_ids}
+    matches = SEARCH.evaluate(body.query, posts)
+    if body.count_only:
+        return {"count": SEARCH.count(matches), "by_post": SEARCH.count_by_post(matches)}
+    after = decode_cursor(cursor, sort)
+    if sort == "score":
+        ranked = {pid: _ranking(posts[pid]).index for pid, bits in matches.items() if bits}
+        source = SEARCH.iter_by_score(matches, ranked, after)
+    else:
+        source = SEARCH.iter_docs(matches, after)
+    page = paginate(response, ((k, extend(APPLICANT_JSON.get(a, projection), {"post_id": SEARCH.post_of(k[1] if sort == "score" else k)}))
+                               for k, a in source), sort, limit)
+    return respond(join(page), response)
+
+def _submit_rank_job(scope: str, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    work = [(p, APPLICANTS[p["id"]]) for p in posts if APPLICANTS.get(p["id"])]
+    return RANKER.submit(scope, SCORING, work).to_dict()
+
+@app.post("/departments/{department_id}/rank", status_code=202)
+def rank_department(department_id: str, hr=Depends(get_current_hr)):
+    """Re-rank every active post of the department in one background job."""
+    if hr["department_id"] != department_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    return _submit_rank_job(department_id, list(POSTS.get(department_id, [])))
+
+@app.post("/rank", status_code=202)
+def rank_all(hr=Depends(get_current_hr)):
+    LOADER.ensure_all()
+    return _submit_rank_job("all", [p for dept_posts in list(POSTS.values()) for p in list(dept_posts)])
+
+@app.get("/rank/jobs/{job_id}")
+def get_rank_job(job_id: str, hr=Depends(get_current_hr)):
+    status = RANKER.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Rank job not found")
+    return status
+
+# Minimal applicant details the match table displays
+MATCH_FIELDS = ("id", "name", "email", "skills", "qualifications", "location", "score", "status")
 
 @app.post("/posts/{post_id}/match")
-def match_candidates(post_id: str, hr=Depends(get_current_hr)):
+def match_candidates(post_id: str, fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, MATCH_FIELDS) or MATCH_FIELDS
     post = _find_post(post_id)
     applicants = APPLICANTS.get(post_id, [])
     if not post or not applicants:
         return {"ranked": False, "matched_top": []}
 
-    required = set([s.lower() for s in post.get("skills_required", [])])
-    preferred_location = post.get("location_preference")
-    sector = post.get("sector")
-
-    ranked = []
-    for a in applicants:
-        # Skills overlap (max 50)
-        skills = set([s.lower() for s in a.get("skills", [])])
-        skill_overlap = len(required.intersection(skills))
-        skills_score = min(50, skill_overlap * 12.5)
-
-        # Qualification match (max 15)
-        qualification = a.get("qualifications", "")
-        qual_score = 15 if any(k in qualification for k in ["Tech","B.Tech","M.Tech","MBA","BSc","MSc","BE"]) else 8
-
-        # Location preference (max 10)
-        loc_score = 10 if preferred_location and a.get("location") == preferred_location else 5
-
-        # Sector interest (max 15)
-        sec_score = 15 if sector in set(a.get("sector_interests", [])) else 7
-
-        # Affirmative action bonus (max 10)
-        aff_bonus = 0
-        if a.get("rural"):
-            aff_bonus += 5
-        if a.get("social_category") in ["SC","ST","OBC","EWS"]:
-            aff_bonus += 5
-
-        # Past participation penalty (up to -5)
-        past_penalty = -5 if a.get("past_participation", 0) > 0 else 0
-
-        score = round(skills_score + qual_score + loc_score + sec_score + aff_bonus + past_penalty, 2)
-        a["score"] = score
-        ranked.append(a)
-
-    # Sort descending by score
-    ranked.sort(key=lambda x: x["score"], reverse=True)
+    # Score the whole pool in one vectorized pass (50/15/10/15/10/-5),
+    # memoized until the post, its applicants or the weights change
+    with METRICS.timer("match_scoring"):
+        ranking = _ranking(post)
 
     # Take top 20%
-    top_count = max(1, len(ranked) * 20 // 100)
-    top_n = ranked[:top_count]
-
-    # Return minimal details for table display
-    top_n_summary = [
-        {
-            "id": a["id"],
-            "name": a["name"],
-            "email": a["email"],
-            "skills": a["skills"],
-            "qualifications": a["qualifications"],
-            "location": a["location"],
-            "score": a["score"],
-            "status": a["status"]
-        }
-        for a in top_n
-    ]
-
-    return {"ranked": True, "matched_top": top_n_summary}
-
+    top_n = [applicants[i] for i in ranking.index.top_percent(20)]
+    ANALYTICS.shortlisted(post_id, len(top_n))
+    _analytics_changed(post_id)
 
-def _increment_filled(post_id: str):
-    for dept_id, dept_posts in POSTS.items():
-        for p in dept_posts:
-            if p["id"] == post_id:
-                p["positions_filled"] = p.get("positions_filled", 0) + 1
-                return
+    # Return minimal details for table display, from cached encoded summaries
+    return respond({"ranked": True, "matched_top": join(APPLICANT_JSON.get(a, projection) for a in top_n)})
 
 
 @app.post("/posts/{post_id}/schedule")
@@ -363,178 +955,229 @@ def schedule_interview(post_id: str, body: ScheduleBody, hr=Depends(get_current_
         "join_url": meet_url,
     }
     MEETINGS.setdefault(post_id, []).append(entry)
+    VERSIONS.bump(("meetings", post_id))
+    if STORAGE.persistent:
+        STORAGE.add_meeting(entry)
     return {"message": "Interview scheduled", **entry}
 
 @app.get("/posts/{post_id}/meetings")
-def list_meetings(post_id: str, hr=Depends(get_current_hr)):
-    return MEETINGS.get(post_id, [])
-
-TIE_TESTS: Dict[str, Dict[str, str]] = {}
+def list_meetings(
+    post_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("oldest"),
+    applicant_id: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    check_sort(sort, ("oldest", "newest"))
+    not_modified = _conditional(request, response, ("meetings", post_id))
+    if not_modified is not None:
+        return not_modified
+    source = iter_positions(MEETINGS.get(post_id, []), decode_cursor(cursor, sort), reverse=(sort == "newest"))
+    predicate = (lambda m: m["applicant_id"] == applicant_id) if applicant_id else None
+    return paginate(response, source, sort, limit, predicate)
 
 @app.post("/posts/{post_id}/tiebreak")
 def create_tie_break_tests(post_id: str, hr=Depends(get_current_hr)):
+    post = REGISTRY.post(post_id)
     applicants = APPLICANTS.get(post_id, [])
-    if not applicants:
-        return {"created": 0, "links": {}}
-    # find max score and those tied
-    scores = [a.get("score") for a in applicants if a.get("score") is not None]
-    if not scores:
+    if not post or not applicants:
         return {"created": 0, "links": {}}
-    top = max(scores)
-    tied = [a for a in applicants if a.get("score") == top]
+    # find max score and those tied, straight from the ranked index
+    ranking = _ranking(post)
+    top = ranking.index.score_at(0)
+    tied = [applicants[i] for i in ranking.index.tied_at(0)]
     links = {}
     for a in tied:
         link = f"https://assess.example.com/test/{post_id}/{a['id']}"
         links[a["id"]] = link
     TIE_TESTS[post_id] = links
+    ANALYTICS.tie_break(post_id, len(links))
+    _analytics_changed(post_id, ("tie_tests", post_id))
+    if STORAGE.persistent:
+        STORAGE.set_tie_tests(post_id, links)
+    if links:
+        _notify(REGISTRY.post_entry(post_id).department_id, "tie_break_created",
+                f"Tie-break tests created for {len(links)} candidates on '{post['title']}'.",
+                post_id=post_id, applicant_ids=list(links))
     return {"created": len(links), "links": links, "score": top}
 
 @app.get("/posts/{post_id}/tiebreak")
-def get_tie_break_tests(post_id: str, hr=Depends(get_current_hr)):
+def get_tie_break_tests(post_id: str, request: Request, response: Response, hr=Depends(get_current_hr)):
+    not_modified = _conditional(request, response, ("tie_tests", post_id))
+    if not_modified is not None:
+        return not_modified
     return TIE_TESTS.get(post_id, {})
 
 # ---------------- Send Tie-Break Test Emails ----------------
 @app.post("/posts/{post_id}/tiebreak/send")
-def send_tie_break_tests(post_id: str, hr=Depends(get_current_hr)):
+def send_tie_break_tests(post_id: str, preview: int = Query(20, ge=0, le=MAX_PAGE_SIZE), hr=Depends(get_current_hr)):
     # Check if tie-break tests exist
     tests = TIE_TESTS.get(post_id)
     if not tests:
         raise HTTPException(status_code=404, detail="No tie-break tests found for this post")
 
-    # Simulate sending emails
-    emails = []
+    recipients = []
     for applicant_id, link in tests.items():
-        # Find applicant info
-        applicant = None
-        for apps in APPLICANTS.values():
-            for a in apps:
-                if a["id"] == applicant_id:
-                    applicant = a
-                    break
-        if not applicant:
-            continue
+        applicant = REGISTRY.applicant(applicant_id)
+        if applicant:
+            recipients.append((applicant, link))
 
-        emails.append({
+    def render(item):
+        applicant, link = item
+        return {
             "to": applicant["email"],
             "subject": f"Tie-Break Test for {post_id}",
             "body": f"Dear {applicant['name']},\n\nPlease complete your tie-break test using this link:\n{link}\n\nBest Regards,\nHR Team",
-            "status": "queued (simulate sending)"
-        })
-
-    return {"sent_count": len(emails), "emails": emails}
+        }
 
-@app.get("/departments/{department_id}/selected")
-def get_selected(department_id: str, hr=Depends(get_current_hr)):
-    return SELECTED.get(department_id, [])
+    return _queue_emails("tiebreak", recipients, render, preview)
 
-@app.get("/departments/{department_id}/selected/export")
-def export_selected(department_id: str, hr=Depends(get_current_hr)):
-    import csv, io
+@app.get("/emails/batches/{batch_id}")
+def get_email_batch_status(batch_id: str, hr=Depends(get_current_hr)):
+    status = MAILER.batch_status(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Email batch not found")
+    return status
 
-    output = io.StringIO()
-    fieldnames = ["id", "name", "email", "post_id", "selected_at"]
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
+@app.get("/emails/{message_id}")
+def get_email_status(message_id: str, hr=Depends(get_current_hr)):
+    status = MAILER.status(message_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return status
 
-    for s in SELECTED.get(department_id, []):
-        row = {k: s[k] for k in fieldnames}  # only include allowed fields
-        writer.writerow(row)
+@app.get("/departments/{department_id}/selected")
+def get_selected(
+    department_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("oldest"),
+    min_score: Optional[float] = Query(None),
+    location: Optional[str] = Query(None),
+    social_category: Optional[str] = Query(None),
+    skill: Optional[str] = Query(None),
+    post_id: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    projection = project(fields, APPLICANT_FIELDS + ("post_id", "selected_at"))
+    predicate = applicant_filter(None, min_score, location, social_category, skill)
+    if post_id is not None:
+        base = predicate
+        predicate = lambda s: s["post_id"] == post_id and (base is None or base(s))
+    return _page_log(request, response, ("selected", department_id), SELECTED.get(department_id), limit, cursor, sort, predicate, projection)
 
-    csv_bytes = io.BytesIO(output.getvalue().encode("utf-8"))
-    response = StreamingResponse(csv_bytes, media_type="text/csv")
-    response.headers["Content-Disposition"] = f"attachment; filename=selected_{department_id}.csv"
-    return response
+@app.get("/departments/{department_id}/selected/export")
+def export_selected(
+    department_id: str,
+    request: Request,
+    response: Response,
+    format: str = Query("csv"),
+    fields: Optional[str] = Query(None),
+    gzip: bool = Query(False),
+    hr=Depends(get_current_hr)
+):
+    # only include allowed fields; rows are rendered lazily as the client reads
+    fieldnames = parse_fields(fields, ["id", "name", "email", "post_id", "selected_at"],
+                              APPLICANT_FIELDS + ("post_id", "selected_at"))
+    not_modified = _conditional(request, response, ("selected", department_id))
+    if not_modified is not None:
+        return not_modified
+    out = stream_export(SELECTED.get(department_id) or [], fieldnames, f"selected_{department_id}", format, gzip,
+                        instrument=lambda body: METRICS.timed_iter(f"export_selected_{format}", body))
+    return carry_headers(out, response)
 
 
 # Applicant profile lookup
 @app.get("/applicants/{applicant_id}")
-def get_applicant_profile(applicant_id: str, hr=Depends(get_current_hr)):
-    for post_apps in APPLICANTS.values():
-        for a in post_apps:
-            if a["id"] == applicant_id:
-                return a
+def get_applicant_profile(applicant_id: str, request: Request, response: Response,
+                          fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, APPLICANT_FIELDS)
+    entry = REGISTRY.applicant_entry(applicant_id)
+    if entry is not None:
+        not_modified = _conditional(request, response, ("applicants", entry.post_id))
+        if not_modified is not None:
+            return not_modified
+        return respond(Raw(APPLICANT_JSON.get(entry.record, projection)), response)
     raise HTTPException(status_code=404, detail="Applicant not found")
-REJECTED: Dict[str, List[Dict[str, Any]]] = {}  # store rejected applicants by department
-
-# Example: mark rejected applicants automatically (optional)
-for dept_id in POSTS.keys():
-    REJECTED[dept_id] = []
-
 @app.get("/departments/{department_id}/rejected")
-def get_rejected(department_id: str, hr=Depends(get_current_hr)):
+def get_rejected(
+    department_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("oldest"),
+    min_score: Optional[float] = Query(None),
+    location: Optional[str] = Query(None),
+    social_category: Optional[str] = Query(None),
+    skill: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    hr=Depends(get_current_hr)
+):
+    projection = project(fields, APPLICANT_FIELDS)
     # Make sure HR can only see their department
     if hr["department_id"] != department_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
     
     # Gather rejected applicants for this department
-    rejected = REJECTED.get(department_id, [])
-    return rejected
-
-from pydantic import BaseModel
+    predicate = applicant_filter(None, min_score, location, social_category, skill)
+    return _page_log(request, response, ("rejected", department_id), REJECTED.get(department_id), limit, cursor, sort, predicate, projection)
+
+@app.get("/departments/{department_id}/rejected/export")
+def export_rejected(
+    department_id: str,
+    request: Request,
+    response: Response,
+    format: str = Query("csv"),
+    fields: Optional[str] = Query(None),
+    gzip: bool = Query(False),
+    hr=Depends(get_current_hr)
+):
+    if hr["department_id"] != department_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    fieldnames = parse_fields(fields, ["id", "name", "email", "location", "score", "status"], APPLICANT_FIELDS)
+    not_modified = _conditional(request, response, ("rejected", department_id))
+    if not_modified is not None:
+        return not_modified
+    return carry_headers(stream_export(REJECTED.get(department_id) or [], fieldnames, f"rejected_{department_id}", format, gzip), response)
 
 class SelectRejectBody(BaseModel):
     applicant_id: str
 
+class BatchDecisionBody(BaseModel):
+    applicant_ids: List[str]
 
-# ---------------- Select Applicant ----------------
-@app.post("/posts/{post_id}/select")
-def select_candidate(post_id: str, body: SelectRejectBody, hr=Depends(get_current_hr)):
-    applicants = APPLICANTS.get(post_id, [])
-    cand = next((a for a in applicants if a["id"] == body.applicant_id), None)
-    if not cand:
-        raise HTTPException(status_code=404, detail="Applicant not found")
 
-    # Check if already selected
-    selected_list = SELECTED.get(hr["department_id"], [])
-    if any(s["id"] == cand["id"] for s in selected_list):
-        raise HTTPException(status_code=400, detail="Applicant already selected")
+# ---------------- Selection helpers ----------------
+def _do_select(department_id: str, post: Dict[str, Any], cand: Applicant) -> Dict[str, Any]:
+    filled = None
+    if SHARED is not None:
+        # The shared counter has the last word on capacity across workers
+        filled = SHARED.take_position(post["id"], post["positions"])
+        if filled is None:
+            raise HTTPException(status_code=400, detail="No positions available")
+    return _commit("select", department_id, post["id"], cand["id"], str(uuid.uuid4()), filled)
 
-    # Update status
-    cand["status"] = "selected"
 
-    # Remove from REJECTED if present
-    REJECTED[hr["department_id"]] = [r for r in REJECTED.get(hr["department_id"], []) if r["id"] != cand["id"]]
+def _do_reject(department_id: str, post: Dict[str, Any], cand: Applicant) -> bool:
+    filled = None
+    if SHARED is not None and cand["id"] in _selected(department_id):
+        filled = SHARED.add_filled(post["id"], -1)
+    return _commit("reject", department_id, post["id"], cand["id"], filled)
 
-    # Add to SELECTED
-    selected_entry = {**cand, "post_id": post_id, "selected_at": str(uuid.uuid4())}
-    SELECTED.setdefault(hr["department_id"], []).append(selected_entry)
 
-    # Increment positions filled
-    for dept_posts in POSTS.values():
-        for p in dept_posts:
-            if p["id"] == post_id:
-                p["positions_filled"] = p.get("positions_filled", 0) + 1
-
-    return {"message": "Candidate selected", "candidate": selected_entry}
-
-
-# ---------------- Reject Applicant ----------------
-@app.post("/posts/{post_id}/reject")
-def reject_candidate(post_id: str, body: SelectRejectBody, hr=Depends(get_current_hr)):
-    applicants = APPLICANTS.get(post_id, [])
-    cand = next((a for a in applicants if a["id"] == body.applicant_id), None)
-    if not cand:
-        raise HTTPException(status_code=404, detail="Applicant not found")
+def _archive_if_full(post: Dict[str, Any]):
+    if post.get("positions_filled", 0) >= post["positions"]:
+        _move_post_to_past(post["id"])
 
-    # Update status
-    cand["status"] = "rejected"
 
-    # Remove from SELECTED if present
-    selected_list = SELECTED.get(hr["department_id"], [])
-    SELECTED[hr["department_id"]] = [s for s in selected_list if s["id"] != cand["id"]]
-
-    # Decrement positions_filled if candidate was previously selected
-    if any(s["id"] == cand["id"] for s in selected_list):
-        for dept_posts in POSTS.values():
-            for p in dept_posts:
-                if p["id"] == post_id:
-                    p["positions_filled"] = max(0, p.get("positions_filled", 0) - 1)
-
-    # Add to REJECTED
-    REJECTED.setdefault(hr["department_id"], []).append(cand)
-
-    # Optional: Structured rejection email
-    post = _find_post(post_id)
+def _rejection_email(cand: Applicant, post: Dict[str, Any]) -> Dict[str, Any]:
     body_text = f"""
 Dear {cand['name']},
 
@@ -548,35 +1191,197 @@ Best Regards,
 HR Team
 [Organization Name]
 """
+    return {
+        "to": cand["email"],
+        "subject": f"Application Update for {cand['name']} - {post['title']}",
+        "body": body_text.strip(),
+    }
+
+
+def _batch_candidates(post_id: str, applicant_ids: List[str]) -> List[Applicant]:
+    # Resolve every id up front so a bad id fails the whole batch before any change
+    ids = list(dict.fromkeys(applicant_ids))
+    cands = [REGISTRY.applicant(aid, post_id=post_id) for aid in ids]
+    missing = [aid for aid, c in zip(ids, cands) if c is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Applicant(s) not found: {', '.join(missing)}")
+    return cands
+
+
+# ---------------- Select Applicant ----------------
+@app.post("/posts/{post_id}/select")
+def select_candidate(post_id: str, body: SelectRejectBody, hr=Depends(get_current_hr)):
+    cand = REGISTRY.applicant(body.applicant_id, post_id=post_id)
+    if not cand:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+
+    with _post_guard(post_id):
+        # Looked up under the guard, so a post archived meanwhile is seen as such
+        post = _find_post(post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        # Check if already selected
+        if cand["id"] in _selected(hr["department_id"]):
+            raise HTTPException(status_code=400, detail="Applicant already selected")
+        if post.get("positions_filled", 0) >= post["positions"]:
+            raise HTTPException(status_code=400, detail="No positions available")
+
+        selected_entry = _do_select(hr["department_id"], post, cand)
+        _decision_notice(hr["department_id"], post, "candidate_selected", [cand])
+        _archive_if_full(post)
+
+    return {"message": "Candidate selected", "candidate": selected_entry}
+
+
+@app.post("/posts/{post_id}/select:batch")
+def select_candidates_batch(post_id: str, body: BatchDecisionBody, hr=Depends(get_current_hr)):
+    with _post_guard(post_id):
+        post = _find_post(post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        cands = _batch_candidates(post_id, body.applicant_ids)
+        selected = _selected(hr["department_id"])
+        already = [c["id"] for c in cands if c["id"] in selected]
+        if already:
+            raise HTTPException(status_code=400, detail=f"Applicant(s) already selected: {', '.join(already)}")
+        positions_available = post["positions"] - post.get("positions_filled", 0)
+        if len(cands) > positions_available:
+            raise HTTPException(status_code=400, detail=f"Only {max(0, positions_available)} position(s) available")
+
+        entries = [_do_select(hr["department_id"], post, c) for c in cands]
+        _decision_notice(hr["department_id"], post, "candidate_selected", cands)
+        _archive_if_full(post)
+
+    return {
+        "selected_count": len(entries),
+        "selected_candidates": entries,
+        "positions_filled": post["positions_filled"],
+        "message": f"{len(entries)} candidates selected."
+    }
+
+
+# ---------------- Reject Applicant ----------------
+@app.post("/posts/{post_id}/reject")
+def reject_candidate(post_id: str, body: SelectRejectBody, hr=Depends(get_current_hr)):
+    cand = REGISTRY.applicant(body.applicant_id, post_id=post_id)
+    if not cand:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    post = REGISTRY.post(post_id)
+
+    with _post_guard(post_id):
+        # Like a repeated select: no second notification or rejection email
+        if cand["id"] in REJECTED_BY_POST.get(post_id, {}):
+            raise HTTPException(status_code=400, detail="Applicant already rejected")
+        _do_reject(hr["department_id"], post, cand)
+        _decision_notice(hr["department_id"], post, "candidate_rejected", [cand])
+
+    # Optional: Structured rejection email, delivered by the mailer workers
+    queued = _queue_emails("rejection", [cand], lambda c: _rejection_email(c, post), preview=1)
     return {
         "message": "Candidate rejected",
         "candidate": cand,
-        "email": {
-            "to": cand["email"],
-            "subject": f"Application Update for {cand['name']} - {post['title']}",
-            "body": body_text.strip(),
-            "status": "queued (simulate sending)"
-        }
+        "email": queued["emails"][0]
     }
 
 
+@app.post("/posts/{post_id}/reject:batch")
+def reject_candidates_batch(post_id: str, body: BatchDecisionBody, preview: int = Query(20, ge=0, le=MAX_PAGE_SIZE), hr=Depends(get_current_hr)):
+    post = REGISTRY.post(post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    with _post_guard(post_id):
+        cands = _batch_candidates(post_id, body.applicant_ids)
+        rejected = REJECTED_BY_POST.get(post_id, {})
+        already = [c["id"] for c in cands if c["id"] in rejected]
+        if already:
+            raise HTTPException(status_code=400, detail=f"Applicant(s) already rejected: {', '.join(already)}")
+        for c in cands:
+            _do_reject(hr["department_id"], post, c)
+        _decision_notice(hr["department_id"], post, "candidate_rejected", cands)
+
+    queued = _queue_emails("rejection", cands, lambda c: _rejection_email(c, post), preview)
+    return {
+        "rejected_count": len(cands),
+        "rejected_ids": [c["id"] for c in cands],
+        "positions_filled": post["positions_filled"],
+        "batch_id": queued["batch_id"],
+        "emails": queued["emails"]
+    }
+
     
 @app.get("/departments/{department_id}/notifications")
-def get_notifications(department_id: str, hr=Depends(get_current_hr)):
-    return NOTIFICATIONS.get(department_id, [])
+def get_notifications(
+    department_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("oldest"),
+    since: Optional[int] = Query(None, ge=0),
+    hr=Depends(get_current_hr)
+):
+    # Only the most recent NOTIFICATION_BUFFER notifications are kept; `since`
+    # (the last `seq` a client has seen) returns just the newer ones
+    check_sort(sort, ("oldest", "newest"))
+    not_modified = _conditional(request, response, ("notifications", department_id))
+    if not_modified is not None:
+        return not_modified
+    feed = _notifications(department_id)
+    source = feed.iter_after(decode_cursor(cursor, sort), reverse=(sort == "newest"), since=since)
+    return paginate(response, source, sort, limit)
+
+
+def get_stream_hr(request: Request, token: Optional[str] = Header(None), authorization: Optional[str] = Header(None),
+                  access_token: Optional[str] = Query(None)):
+    # EventSource can't send headers, so a stream may pass its token in the query string
+    return get_current_hr(request, token=token or access_token, authorization=authorization)
+
+
+@app.get("/departments/{department_id}/notifications/stream")
+def stream_notifications(
+    department_id: str,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+    hr=Depends(get_stream_hr)
+):
+    """Server-Sent Events: each new notification as it happens, with its `seq` as the event id.
+
+    Starts after `since`, or after the Last-Event-ID a reconnecting
+    EventSource sends, or else with the next notification. A `gap` event
+    means notifications were missed (they fell out of the buffer); fetch
+    the list again to catch up.
+    """
+    after = since
+    if last_event_id is not None and last_event_id.isdigit():
+        after = int(last_event_id)
+    feed = _notifications(department_id)
+    if after is None:
+        after = feed.last_seq
+    return StreamingResponse(
+        NOTIFY_HUB.stream(department_id, feed, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/departments/{department_id}/analytics")
-def analytics(department_id: str, hr=Depends(get_current_hr)):
+def analytics(department_id: str, request: Request, response: Response, hr=Depends(get_current_hr)):
+    not_modified = _conditional(request, response, ("analytics", department_id))
+    if not_modified is not None:
+        return not_modified
     active = len(POSTS.get(department_id, []))
     past = len(PAST_POSTS.get(department_id, []))
-    selected = len(SELECTED.get(department_id, []))
-    rejected = len(REJECTED.get(department_id, []))
+    selected = len(SELECTED.get(department_id) or ())
+    rejected = len(REJECTED.get(department_id) or ())
+    # Funnel, score distribution and breakdowns are kept up to date as
+    # applicants arrive, get scored and change status; nothing is recounted here
+    posts = POSTS.get(department_id, []) + PAST_POSTS.get(department_id, [])
     return {
         "active_internships": active,
         "past_internships": past,
         "selected_candidates": selected,
-        "rejected_candidates": rejected
+        "rejected_candidates": rejected,
+        **ANALYTICS.department(department_id, posts),
     }
 
 @app.get("/profile")
@@ -588,18 +1393,11 @@ def profile(email: str):
 
 @app.post("/posts/{post_id}/email")
 def send_email(post_id: str, applicant_id: str, subject: str, type: str = "selection", message: str = "", hr=Depends(get_current_hr)):
-    applicants = APPLICANTS.get(post_id, [])
-    candidate = next((a for a in applicants if a["id"] == applicant_id), None)
+    candidate = REGISTRY.applicant(applicant_id, post_id=post_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Applicant not found")
 
-    internship = None
-    for p in POSTS.get(hr["department_id"], []):
-        if p["id"] == post_id:
-            internship = p
-    for p in PAST_POSTS.get(hr["department_id"], []):
-        if p["id"] == post_id:
-            internship = p
+    internship = REGISTRY.post(post_id, department_id=hr["department_id"])
 
     if not internship:
         raise HTTPException(status_code=404, detail="Internship not found")
@@ -644,15 +1442,13 @@ def send_email(post_id: str, applicant_id: str, subject: str, type: str = "selec
         [Organization Name]
         """
 
-    # Right now, just return instead of actually sending
-    return {
-        "to": candidate["email"],
-        "subject": subject,
-        "body": body.strip(),
-        "status": "queued (simulate sending)"
-    }
+    # Hand off to the mailer workers; delivery status is at /emails/{message_id}
+    email = {"to": candidate["email"], "subject": subject, "body": body.strip()}
+    queued = _queue_emails(type, [email], lambda e: e, preview=1)
+    return {**queued["emails"][0], "batch_id": queued["batch_id"]}
 @app.post("/posts/{post_id}/auto_select")
-def auto_select_candidates(post_id: str, hr=Depends(get_current_hr)):
+def auto_select_candidates(post_id: str, fields: Optional[str] = Query(None), hr=Depends(get_current_hr)):
+    projection = project(fields, APPLICANT_FIELDS + ("post_id", "selected_at"))
     post = _find_post(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -661,121 +1457,137 @@ def auto_select_candidates(post_id: str, hr=Depends(get_current_hr)):
     if not applicants:
         return {"selected_count": 0, "message": "No applicants found"}
 
-    # Ensure scores exist (run matching first if needed)
-    for a in applicants:
-        if a.get("score") is None:
-            a["score"] = 0  # default if match_candidates not run
-
-    # Sort by score descending
-    applicants_sorted = sorted(applicants, key=lambda x: x.get("score", 0), reverse=True)
+    # Scores come from the cached ranking, computed on demand
+    with METRICS.timer("auto_select_ranking"):
+        ranking = _ranking(post)
 
-    # Determine how many positions are available
-    positions_available = post["positions"] - post.get("positions_filled", 0)
-    if positions_available <= 0:
-        return {"selected_count": 0, "message": "No positions available"}
-
-    # Select top candidates up to available positions
-    selected_candidates = []
-    for a in applicants_sorted:
-        if a["status"] != "applied":
-            continue  # skip already selected/rejected
+    with _post_guard(post_id):
+        if _find_post(post_id) is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        # Determine how many positions are available
+        positions_available = post["positions"] - post.get("positions_filled", 0)
         if positions_available <= 0:
-            break
+            return {"selected_count": 0, "message": "No positions available"}
 
-        # Update status and add to SELECTED
-        a["status"] = "selected"
-        selected_entry = {**a, "post_id": post_id, "selected_at": str(uuid.uuid4())}
-        SELECTED.setdefault(hr["department_id"], []).append(selected_entry)
-        selected_candidates.append(selected_entry)
+        # Select top candidates still in "applied" status, up to available positions
+        picked = [applicants[i] for i in ranking.index.next_applied(positions_available)]
+        selected_candidates = [_do_select(hr["department_id"], post, a) for a in picked]
+        _decision_notice(hr["department_id"], post, "candidate_selected", picked)
+        _archive_if_full(post)
 
-        positions_available -= 1
-        post["positions_filled"] = post.get("positions_filled", 0) + 1
+    return respond({
+        "selected_count": len(selected_candidates),
+        "selected_candidates": [pick(e, projection) for e in selected_candidates],
+        "message": f"{len(selected_candidates)} candidates auto-selected based on score."
+    })
 
-        # Remove from REJECTED if present
-        REJECTED[hr["department_id"]] = [r for r in REJECTED.get(hr["department_id"], []) if r["id"] != a["id"]]
 
+def _allocate(targets: List[Any], dry_run: bool) -> Dict[str, Any]:
+    """Assign applicants across ``targets`` ((department_id, post) pairs) in one optimization.
+
+    Every post involved is locked for the duration, in id order so two
+    allocations can't deadlock. A person (by email) who already holds an
+    offer anywhere, or who is assigned to one post here, is not offered
+    another.
+    """
+    posts = {p["id"]: (dept_id, p) for dept_id, p in targets}
+    with ExitStack() as stack:
+        for post_id in sorted(posts):
+            stack.enter_context(_post_guard(post_id))
+        offered = {e["email"].lower() for entries in SELECTED_BY_POST.values() for e in entries.values()}
+        rankings = {post_id: _ranking(p) for post_id, (_, p) in posts.items()}
+
+        def candidates(post_id: str, k: int):
+            applicants = APPLICANTS.get(post_id, [])
+            out, seen = [], set()
+            for row in rankings[post_id].index.iter_applied():
+                a = applicants[row]
+                person = a["email"].lower()
+                if person in offered or person in seen:
+                    continue
+                seen.add(person)
+                out.append((person, a["id"], a["score"]))
+                if len(out) >= k:
+                    break
+            return out
+
+        capacity = {post_id: p["positions"] - p.get("positions_filled", 0) for post_id, (_, p) in posts.items()}
+        plan = allocate(capacity, candidates)
+        results = []
+        for post_id, rows in plan["assignments"].items():
+            dept_id, post = posts[post_id]
+            assigned, cands = [], []
+            for applicant_id, score in rows:
+                cand = REGISTRY.applicant(applicant_id, post_id=post_id)
+                if not dry_run:
+                    _do_select(dept_id, post, cand)
+                cands.append(cand)
+                assigned.append({"applicant_id": applicant_id, "name": cand["name"], "email": cand["email"], "score": score})
+            if not dry_run:
+                _decision_notice(dept_id, post, "candidate_selected", cands)
+                _archive_if_full(post)
+            results.append({"post_id": post_id, "department_id": dept_id, "available": capacity[post_id], "assigned": assigned})
+    assigned_count = sum(len(r["assigned"]) for r in results)
     return {
-        "selected_count": len(selected_candidates),
-        "selected_candidates": selected_candidates,
-        "message": f"{len(selected_candidates)} candidates auto-selected based on score."
+        "dry_run": dry_run,
+        "assigned_count": assigned_count,
+        "unfilled_positions": sum(capacity.values()) - assigned_count,
+        "total_score": plan["total_score"],
+        "posts": results,
+        "solver": {k: plan[k] for k in ("edges", "rounds", "seconds")},
     }
 
+@app.post("/departments/{department_id}/allocate")
+def allocate_department(department_id: str, dry_run: bool = Query(False), hr=Depends(get_current_hr)):
+    if hr["department_id"] != department_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    return _allocate([(department_id, p) for p in POSTS.get(department_id, [])], dry_run)
 
-# @app.post("/posts/{post_id}/send_top_emails")
-# def send_top_emails(post_id: str, method: str = "top_percent", value: int = 20, hr=Depends(get_current_hr)):
-#     # get applicants
-#     applicants = APPLICANTS.get(post_id, [])
-#     if not applicants:
-#         raise HTTPException(status_code=404, detail="No applicants found")
-    
-#     # ensure scores exist
-#     for a in applicants:
-#         if a.get("score") is None:
-#             a["score"] = 0
-    
-#     # sort by score
-#     applicants_sorted = sorted(applicants, key=lambda x: x.get("score", 0), reverse=True)
-    
-#     # calculate top N
-#     if method == "top_percent":
-#         top_count = max(1, len(applicants_sorted) * value // 100)
-#     elif method == "top_n":
-#         top_count = min(value, len(applicants_sorted))
-#     else:
-#         top_count = 1
-    
-#     top_candidates = applicants_sorted[:top_count]
-
-#     # simulate sending emails
-#     emails = []
-#     for cand in top_candidates:
-#         body = f"Dear {cand['name']},\n\nYou are selected for {post_id} internship!\n\nBest Regards"
-#         emails.append({
-#             "to": cand["email"],
-#             "subject": f"Internship Selection: {post_id}",
-#             "body": body,
-#             "status": "queued (simulate sending)"
-#         })
+@app.post("/allocate")
+def allocate_all(dry_run: bool = Query(False), hr=Depends(get_current_hr)):
+    LOADER.ensure_all()
+    return _allocate([(dept_id, p) for dept_id, dept_posts in list(POSTS.items()) for p in list(dept_posts)], dry_run)
 
-#     return {"sent_count": len(emails), "emails": emails}
 
 @app.post("/posts/{post_id}/send_top_emails")
 def send_top_emails(
     post_id: str,
     method: str = Query("top_percent"),
-    value: int = Query(20)
+    value: int = Query(20),
+    preview: int = Query(20, ge=0, le=MAX_PAGE_SIZE),
+    hr=Depends(get_current_hr)
 ):
+    # Only the post's own department may mail its applicants
+    post = REGISTRY.post(post_id, department_id=hr["department_id"])
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+
     applicants = APPLICANTS.get(post_id, [])
     if not applicants:
         raise HTTPException(status_code=404, detail="No applicants found")
-    
-    # Ensure scores exist
-    for a in applicants:
-        if a.get("score") is None:
-            a["score"] = 0
-    
-    # Sort by score
-    applicants_sorted = sorted(applicants, key=lambda x: x["score"], reverse=True)
+
+    # Scores come from the cached ranking, computed on demand
+    ranking = _ranking(post)
     
     # Calculate top N
     if method == "top_percent":
-        top_count = max(1, len(applicants_sorted) * value // 100)
+        top_rows = ranking.index.top_percent(value)
     elif method == "top_n":
-        top_count = min(value, len(applicants_sorted))
+        top_rows = ranking.index.top(value)
     else:
-        top_count = 1
-    
-    top_candidates = applicants_sorted[:top_count]
-
-    # Simulate sending emails
-    emails = []
-    for cand in top_candidates:
-        body = f"Dear {cand['name']},\n\nYou are selected for {post_id} internship!\n\nBest Regards"
-        emails.append({
+        top_rows = ranking.index.top(1)
+    ANALYTICS.shortlisted(post_id, len(top_rows))
+    _analytics_changed(post_id)
+
+    # Queue emails; bodies are rendered by the mailer workers
+    def render(row):
+        cand = applicants[row]
+        return {
             "to": cand["email"],
             "subject": f"Internship Selection: {post_id}",
-            "body": body,
-            "status": "queued (simulate sending)"
-        })
+            "body": f"Dear {cand['name']},\n\nYou are selected for {post_id} internship!\n\nBest Regards",
+        }
+
+    return _queue_emails("selection", top_rows, render, preview)
 
-    return {"sent_count": len(emails), "emails": emails}
+LOADER.import_seconds = round(time.perf_counter() - _IMPORT_STARTED, 4)
@@ -0,0 +1,73 @@
+import itertools
+import threading
+from typing import Optional, Dict, Any, Iterator, Tuple
+
+from sortedcontainers import SortedDict
+
+
+class EntryLog:
+    """Insertion-ordered set of entries keyed by applicant id.
+
+    Each add gets a monotonically increasing sequence number, so removing an
+    entry never shifts the position of the others. That makes (seq) a stable
+    keyset cursor for pagination, and id -> seq gives O(1) contains/get and
+    O(log n) remove. Adding an id that is already present moves it to the end.
+    """
+
+    def __init__(self):
+        self._entries: SortedDict = SortedDict()
+        self._seq_of: Dict[str, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, entry: Dict[str, Any]) -> int:
+        with self._lock:
+            old = self._seq_of.get(entry["id"])
+            if old is not None:
+                del self._entries[old]
+            seq = next(self._counter)
+            self._entries[seq] = entry
+            self._seq_of[entry["id"]] = seq
+            return seq
+
+    def remove(self, applicant_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            seq = self._seq_of.pop(applicant_id, None)
+            if seq is None:
+                return None
+            return self._entries.pop(seq)
+
+    def get(self, applicant_id: str) -> Optional[Dict[str, Any]]:
+        seq = self._seq_of.get(applicant_id)
+        return None if seq is None else self._entries.get(seq)
+
+    def __contains__(self, applicant_id: str) -> bool:
+        return applicant_id in self._seq_of
+
+    def __len__(self):
+        return len(self._seq_of)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for _, entry in self.iter_after(None):
+            yield entry
+
+    def iter_after(self, seq: Optional[int], reverse: bool = False, chunk: int = 256) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (seq, entry) strictly after ``seq`` in order (or before it if ``reverse``).
+
+        Entries are fetched in small chunks under the lock and the position
+        is re-seeked by key between chunks, so concurrent adds and removes
+        never invalidate a running iteration.
+        """
+        while True:
+            with self._lock:
+                if reverse:
+                    keys = self._entries.irange(maximum=seq, inclusive=(True, False), reverse=True) if seq is not None \
+                        else self._entries.irange(reverse=True)
+                else:
+                    keys = self._entries.irange(minimum=seq, inclusive=(False, True)) if seq is not None \
+                        else self._entries.irange()
+                batch = [(k, self._entries[k]) for k in itertools.islice(keys, chunk)]
+            if not batch:
+                return
+            yield from batch
+            seq = batch[-1][0]
@@ -0,0 +1,289 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+from typing import Optional, Callable, Dict, Any, Iterable, Iterator, List, Tuple, Union
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+# The sampling profiler is off unless asked for; it costs nothing until a profile is taken
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0").lower() not in ("0", "false", "no")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = 60
+
+PREFIX = "pm_"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects it."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Metrics:
+    """Per-process request metrics, hot-path timers and gauges, rendered as Prometheus text.
+
+    Histograms and in-flight counts are updated as requests run; gauges
+    are callbacks read at scrape time, so sizing a collection costs
+    nothing between scrapes. Disabled, ``timer`` hands back a shared
+    no-op context and ``timed_iter`` returns its argument, so the
+    instrumented code pays one attribute check. Each worker process keeps
+    its own numbers; Prometheus sums them across scrape targets.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._families: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Tuple[Callable[[], Union[float, Dict[str, float]]], Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.histogram("timer_seconds", "Time spent in named hot-path sections.", LATENCY_BUCKETS)
+
+    # ---------------- Declaring ----------------
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...]):
+        self._families[name] = ("histogram", help, buckets)
+        self._histograms[name] = {}
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], Union[float, Dict[str, float]]]] = None,
+              label: Optional[str] = None):
+        """A gauge; with ``fn`` it is read at scrape time (a number, or {label value: number} for ``label``)."""
+        self._families[name] = ("gauge", help, None)
+        if fn is not None:
+            self._gauges[name] = (fn, label)
+        else:
+            self._values[name] = {}
+
+    # ---------------- Recording ----------------
+    def series(self, family: str, key: Labels) -> Histogram:
+        """The histogram of ``family`` for label pairs ``key`` (in a fixed order), created on first use."""
+        h = self._histograms[family].get(key)
+        if h is None:
+            with self._lock:
+                h = self._histograms[family].setdefault(key, Histogram(self._families[family][2]))
+        return h
+
+    def observe(self, family: str, value: float, /, **labels):
+        h = self.series(family, _labels(labels))
+        with self._lock:
+            h.observe(value)
+
+    def add(self, family: str, delta: float, /, **labels):
+        key = _labels(labels)
+        with self._lock:
+            values = self._values[family]
+            values[key] = values.get(key, 0) + delta
+
+    def timer(self, name: str):
+        """``with METRICS.timer("name"):`` records the block's duration under ``timer_seconds{name=...}``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.series("timer_seconds", (("name", name),)), self._lock)
+
+    def timed_iter(self, name: str, items: Iterable[Any]) -> Iterable[Any]:
+        """``items``, recording the total time spent producing them (not the time the consumer holds each)."""
+        if not self.enabled:
+            return items
+        return self._timed_iter(name, items)
+
+    def _timed_iter(self, name: str, items: Iterable[Any]) -> Iterator[Any]:
+        spent = 0.0
+        it = iter(items)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    spent += time.perf_counter() - start
+                    return
+                spent += time.perf_counter() - start
+                yield item
+        finally:
+            h = self.series("timer_seconds", (("name", name),))
+            with self._lock:
+                h.observe(spent)
+
+    # ---------------- Exposition ----------------
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, (kind, help, buckets) in self._families.items():
+            full = PREFIX + name
+            lines.append(f"# HELP {full} {help}")
+            lines.append(f"# TYPE {full} {kind}")
+            if kind == "histogram":
+                with self._lock:
+                    series = [(k, list(h.counts), h.sum, h.count) for k, h in self._histograms[name].items()]
+                for labels, counts, total, count in series:
+                    running = 0
+                    for bound, n in zip(buckets, counts):
+                        running += n
+                        lines.append(f"{full}_bucket{_format_labels(labels, ('le', _number(bound)))} {running}")
+                    lines.append(f"{full}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {_number(total)}")
+                    lines.append(f"{full}_count{_format_labels(labels)} {count}")
+            elif name in self._gauges:
+                fn, label = self._gauges[name]
+                value = fn()
+                if label is None:
+                    lines.append(f"{full} {_number(value)}")
+                else:
+                    for k, v in sorted(value.items()):
+                        lines.append(f"{full}{_format_labels(((label, str(k)),))} {_number(v)}")
+            else:
+                with self._lock:
+                    series = list(self._values[name].items())
+                for labels, v in series:
+                    lines.append(f"{full}{_format_labels(labels)} {_number(v)}")
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    __slots__ = ("histogram", "lock", "start")
+
+    def __init__(self, histogram: Histogram, lock: threading.Lock):
+        self.histogram = histogram
+        self.lock = lock
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with self.lock:
+            self.histogram.observe(elapsed)
+        return False
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latency and request/response sizes per route template, in-flight count per method.
+
+    Routes are labelled by their template (``/posts/{post_id}``), which
+    the router leaves in the scope, so ids never become label values.
+    Plain ASGI rather than ``BaseHTTPMiddleware``, so streamed responses
+    pass through untouched; a stream's latency is its full duration.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+        metrics.histogram("http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS)
+        metrics.histogram("http_request_size_bytes", "HTTP request body size by route.", SIZE_BUCKETS)
+        metrics.histogram("http_response_size_bytes", "HTTP response body size by route.", SIZE_BUCKETS)
+        metrics.gauge("http_requests_in_flight", "HTTP requests being handled.")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics, method = self.metrics, scope["method"]
+        sizes = {"in": 0, "out": 0, "status": 500}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["in"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                sizes["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["out"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.add("http_requests_in_flight", 1, method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.add("http_requests_in_flight", -1, method=method)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            key = (("method", method), ("route", route))
+            latency = metrics.series("http_request_duration_seconds", key + (("status", str(sizes["status"])),))
+            request_size = metrics.series("http_request_size_bytes", key)
+            response_size = metrics.series("http_response_size_bytes", key)
+            with metrics._lock:
+                latency.observe(elapsed)
+                request_size.observe(sizes["in"])
+                response_size.observe(sizes["out"])
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval, for flame graphs.
+
+    ``run`` blocks the calling thread for the profile's duration and
+    returns "collapsed stacks": one ``thread;outer;...;inner count`` line
+    per distinct stack, the input format of flamegraph.pl, speedscope and
+    most other flame graph viewers. Only one profile runs at a time.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._busy = threading.Lock()
+
+    def run(self, seconds: float) -> Optional[str]:
+        """The profile, or None if another one is already running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            counts: Counter = Counter()
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != me:
+                        counts[self._collapse(names.get(ident, str(ident)), frame)] += 1
+                time.sleep(self.interval)
+            return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+        finally:
+            self._busy.release()
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ";".join(s.replace(";", ":") for s in reversed(stack))
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, List, Set, Tuple
+
+from .encoding import dumps
+
+
+# Notifications kept in memory per department; older ones are only in storage
+NOTIFICATION_BUFFER = int(os.getenv("NOTIFICATION_BUFFER", "500"))
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+KEEP_ALIVE = b": keep-alive\n\n"
+
+
+class NotificationFeed:
+    """The most recent notifications of one department, numbered in arrival order.
+
+    A ring buffer of ``maxlen`` entries: appends are O(1) and the oldest
+    entry drops off once it is full. Every entry gets the next sequence
+    number, which never changes, so ``seq`` is a stable cursor for paging
+    and for resuming a stream. Because the retained sequence numbers are
+    contiguous, finding the entries after a cursor is index arithmetic.
+    Each entry's Server-Sent Events frame is encoded once, on first use,
+    and shared by every subscriber. An entry whose id is already retained
+    is ignored, so replaying an event twice is harmless.
+    """
+
+    def __init__(self, maxlen: int = NOTIFICATION_BUFFER):
+        self._entries: deque = deque(maxlen=max(1, maxlen))
+        self.last_seq = 0
+        self._ids: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest retained entry (``last_seq + 1`` when empty)."""
+        return self.last_seq - len(self._entries) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def append(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The stored record, or None if an entry with the same id is already retained."""
+        with self._lock:
+            if entry["id"] in self._ids:
+                return None
+            if len(self._entries) == self._entries.maxlen:
+                self._ids.discard(self._entries[0][0]["id"])
+            self.last_seq += 1
+            record = {"seq": self.last_seq, **entry}
+            self._entries.append([record, None])
+            self._ids.add(entry["id"])
+            return record
+
+    def extend(self, entries: List[Dict[str, Any]]):
+        """Append a restored history, skipping (but still numbering) what wouldn't be kept."""
+        skip = max(0, len(entries) - self._entries.maxlen)
+        with self._lock:
+            self.last_seq += skip
+        for entry in entries[skip:]:
+            self.append(entry)
+
+    def _after(self, seq: Optional[int]) -> List[list]:
+        # Caller holds the lock
+        start = 0 if seq is None else max(0, seq - self.first_seq + 1)
+        if start >= len(self._entries):
+            return []
+        if start == 0:
+            return list(self._entries)
+        return [self._entries[i] for i in range(start, len(self._entries))]
+
+    def iter_after(self, seq: Optional[int], reverse: bool = False, since: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (seq, entry) strictly after ``seq`` (or before it if ``reverse``), all newer than ``since``."""
+        with self._lock:
+            if reverse:
+                items = self._after(since)
+                if seq is not None:
+                    items = items[:max(0, seq - (items[0][0]["seq"] if items else seq))]
+                items.reverse()
+            else:
+                bounds = [s for s in (seq, since) if s is not None]
+                items = self._after(max(bounds) if bounds else None)
+        for record, _ in items:
+            yield record["seq"], record
+
+    def frames_after(self, seq: int) -> Tuple[List[bytes], bool, int]:
+        """Encoded stream frames for the entries after ``seq``, whether some were missed, and the new cursor.
+
+        A cursor outside the retained range (too old, or from before a
+        restart) counts as a gap and gets every retained entry.
+        """
+        with self._lock:
+            gap = seq < self.first_seq - 1 or seq > self.last_seq
+            items = self._after(None if gap else seq)
+            for item in items:
+                if item[1] is None:
+                    item[1] = sse_frame(item[0])
+            return [frame for _, frame in items], gap, self.last_seq
+
+
+def sse_frame(record: Dict[str, Any]) -> bytes:
+    # Encoded JSON never contains a raw newline, so the payload fits one data: line
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        record["seq"], record.get("type", "notification").encode("utf-8"), dumps(record),
+    )
+
+
+def gap_frame(feed: NotificationFeed) -> bytes:
+    return b"event: gap\ndata: %s\n\n" % dumps({"first_seq": feed.first_seq, "last_seq": feed.last_seq})
+
+
+class NotificationHub:
+    """Wakes the notification streams of a department when its feed changes.
+
+    Streams don't queue anything of their own: each remembers the last
+    sequence number it sent and reads newer frames from the feed, so an
+    open stream costs one suspended coroutine, and a slow client can't
+    grow memory (it sees a ``gap`` event once it falls behind the buffer).
+    All streams of a department wait on one ``asyncio.Event``; ``notify``
+    may be called from any thread and hands a single wake-up to the loop,
+    which replaces the event and sets the old one. Keep-alives come from
+    one timer that wakes every stream, rather than a timeout per stream.
+    """
+
+    def __init__(self, heartbeat: float = STREAM_HEARTBEAT_SECONDS):
+        self.heartbeat = heartbeat
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self._ticking = False
+        self.subscribers = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def notify(self, department_id: str):
+        loop = self._loop
+        if loop is None or department_id not in self._events:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake, department_id)
+        except RuntimeError:  # loop already closed at shutdown
+            pass
+
+    def _wake(self, department_id: str):
+        event = self._events.pop(department_id, None)
+        if event is not None:
+            event.set()
+
+    def _tick(self):
+        events, self._events = self._events, {}
+        for event in events.values():
+            event.set()
+        self._ticking = self.subscribers > 0
+        if self._ticking:
+            self._loop.call_later(self.heartbeat, self._tick)
+
+    def _event(self, department_id: str) -> asyncio.Event:
+        event = self._events.get(department_id)
+        if event is None:
+            event = self._events[department_id] = asyncio.Event()
+        return event
+
+    async def stream(self, department_id: str, feed: NotificationFeed, after: int) -> AsyncIterator[bytes]:
+        """Server-Sent Events for ``feed``, starting after sequence number ``after``."""
+        if self._loop is None:
+            self.bind(asyncio.get_running_loop())
+        self.subscribers += 1
+        if not self._ticking:
+            self._ticking = True
+            self._loop.call_later(self.heartbeat, self._tick)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                # Take the event before reading, so an append in between still wakes us
+                event = self._event(department_id)
+                frames, gap, after = feed.frames_after(after)
+                if gap:
+                    yield gap_frame(feed)
+                if frames:
+                    yield b"".join(frames)
+                if frames or gap:
+                    continue
+                await event.wait()
+                if feed.last_seq == after:
+                    # Woken by the heartbeat timer
+                    yield KEEP_ALIVE
+        finally:
+            self.subscribers -= 1
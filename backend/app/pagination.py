@@ -0,0 +1,120 @@
+import base64
+import json
+import math
+from typing import Optional, Callable, Dict, Any, Iterable, Iterator, List, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort: str, key) -> str:
+    raw = json.dumps({"s": sort, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _valid_key(sort: str, key) -> bool:
+    """Whether ``key`` has the shape the sort's keyset source expects.
+
+    ``score`` pages on (-score, position) pairs; every other sort on a list
+    position or sequence number.
+    """
+    def is_int(v):
+        return isinstance(v, int) and not isinstance(v, bool)
+
+    if sort == "score":
+        return (isinstance(key, list) and len(key) == 2 and is_int(key[1]) and key[1] >= 0
+                and (is_int(key[0]) or isinstance(key[0], float)) and math.isfinite(key[0]))
+    return is_int(key) and key >= 0
+
+
+def decode_cursor(cursor: Optional[str], sort: str):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("s") != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    key = data.get("k")
+    if not _valid_key(sort, key):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return (float(key[0]), key[1]) if isinstance(key, list) else key
+
+
+def check_sort(sort: str, allowed: Sequence[str]) -> str:
+    if sort not in allowed:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(allowed)}")
+    return sort
+
+
+def applicant_filter(
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    location: Optional[str] = None,
+    social_category: Optional[str] = None,
+    skill: Optional[str] = None,
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    checks = []
+    if status is not None:
+        checks.append(lambda a: a.get("status") == status)
+    if min_score is not None:
+        checks.append(lambda a: a.get("score") is not None and a.get("score") >= min_score)
+    if location is not None:
+        checks.append(lambda a: a.get("location") == location)
+    if social_category is not None:
+        checks.append(lambda a: a.get("social_category") == social_category)
+    if skill is not None:
+        wanted = skill.lower()
+        checks.append(lambda a: any(s.lower() == wanted for s in a.get("skills", [])))
+    if not checks:
+        return None
+    return lambda a: all(c(a) for c in checks)
+
+
+def iter_positions(items: Sequence[Any], after: Optional[int], reverse: bool = False) -> Iterator[Tuple[int, Any]]:
+    """Keyset source over an append-only list; the key is the list position."""
+    if reverse:
+        i = (len(items) if after is None else after) - 1
+        while i >= 0:
+            yield i, items[i]
+            i -= 1
+    else:
+        i = 0 if after is None else after + 1
+        while i < len(items):
+            yield i, items[i]
+            i += 1
+
+
+def paginate(
+    response: Response,
+    source: Iterable[Tuple[Any, Any]],
+    sort: str,
+    limit: Optional[int],
+    predicate: Optional[Callable[[Any], bool]] = None,
+) -> List[Any]:
+    """Collect up to ``limit`` matching items from a keyset ``source``.
+
+    ``source`` yields (key, item) already positioned after the cursor, so a
+    page costs O(page size + skipped non-matches) rather than O(list size).
+    One match past the page is looked for, and only if it exists is the
+    cursor for the next page sent in the ``X-Next-Cursor`` header, so the
+    last page never points at an empty one; the body stays a plain list.
+    """
+    out = []
+    last_key = None
+    for key, item in source:
+        if predicate is not None and not predicate(item):
+            continue
+        if limit is not None and len(out) >= limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, last_key)
+            break
+        out.append(item)
+        last_key = key
+    return out
@@ -0,0 +1,90 @@
+import itertools
+import math
+from typing import Optional, Dict, Iterator, List, Sequence, Tuple
+
+from sortedcontainers import SortedList
+
+
+class RankedIndex:
+    """Per-post ordered view of applicants keyed by (-score, row).
+
+    ``row`` is the applicant's position in ``APPLICANTS[post_id]``, so equal
+    scores keep applicant order just like the stable sort they replace. A
+    second sorted list holds only applicants still in ``applied`` status so
+    selection rounds can take the next k candidates without scanning past
+    people who were already selected or rejected. Updates are O(log n).
+    """
+
+    def __init__(self, ids: Sequence[str], scores: Sequence[float], statuses: Sequence[str], order: Optional[Sequence[int]] = None):
+        """``order``, if given, lists the rows already in key order, which makes building linear."""
+        self._row_of: Dict[str, int] = dict(zip(ids, range(len(ids))))
+        self._keys: List[tuple] = [(-score, row) for row, score in enumerate(scores)]
+        keys = self._keys if order is None else [self._keys[row] for row in order]
+        self._all = SortedList(keys)
+        if order is None:
+            self._applied = SortedList(k for k, st in zip(keys, statuses) if st == "applied")
+        else:
+            self._applied = SortedList(k for k in keys if statuses[k[1]] == "applied")
+
+    def __len__(self):
+        return len(self._all)
+
+    def add(self, applicant_id: str, score: float, status: str) -> int:
+        row = len(self._keys)
+        key = (-score, row)
+        self._row_of[applicant_id] = row
+        self._keys.append(key)
+        self._all.add(key)
+        if status == "applied":
+            self._applied.add(key)
+        return row
+
+    def set_status(self, applicant_id: str, status: str):
+        row = self._row_of.get(applicant_id)
+        if row is None:
+            return
+        key = self._keys[row]
+        if status == "applied":
+            if key not in self._applied:
+                self._applied.add(key)
+        else:
+            self._applied.discard(key)
+
+    def key(self, row: int) -> Tuple[float, int]:
+        return self._keys[row]
+
+    def top(self, k: int) -> List[int]:
+        return [row for _, row in self._all.islice(0, max(0, k))]
+
+    def top_percent(self, percent: int) -> List[int]:
+        """The best ``percent``% of rows, rounded down but at least one."""
+        return self.top(max(1, len(self._all) * percent // 100))
+
+    def next_applied(self, k: int) -> List[int]:
+        return [row for _, row in self._applied.islice(0, max(0, k))]
+
+    def iter_applied(self) -> Iterator[int]:
+        """Rows still in ``applied`` status, best first; callers stop when they have enough."""
+        for _, row in self._applied:
+            yield row
+
+    def score_at(self, rank: int) -> float:
+        return -self._all[rank][0]
+
+    def tied_at(self, rank: int) -> List[int]:
+        """Rows of every applicant sharing the score found at ``rank`` (0-based)."""
+        if not 0 <= rank < len(self._all):
+            return []
+        neg = self._all[rank][0]
+        return [row for _, row in self._all.irange((neg,), (neg, math.inf))]
+
+    def iter_after(self, key: Optional[Tuple[float, int]], chunk: int = 256) -> Iterator[Tuple[Tuple[float, int], int]]:
+        """Yield (key, row) in rank order strictly after ``key``, re-seeking between chunks."""
+        while True:
+            keys = self._all.irange(minimum=key, inclusive=(False, True)) if key is not None else iter(self._all)
+            batch = list(itertools.islice(keys, chunk))
+            if not batch:
+                return
+            for k in batch:
+                yield k, k[1]
+            key = batch[-1]
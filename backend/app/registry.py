@@ -0,0 +1,78 @@
+import threading
+from typing import Optional, Dict, Any, List
+
+
+ACTIVE = "active"
+PAST = "past"
+
+
+class PostEntry:
+    __slots__ = ("department_id", "state", "record")
+
+    def __init__(self, department_id: str, state: str, record: Dict[str, Any]):
+        self.department_id = department_id
+        self.state = state
+        self.record = record
+
+
+class ApplicantEntry:
+    __slots__ = ("post_id", "record")
+
+    def __init__(self, post_id: str, record: Dict[str, Any]):
+        self.post_id = post_id
+        self.record = record
+
+
+class Registry:
+    """Global id index over POSTS/PAST_POSTS and APPLICANTS.
+
+    The department lists stay the source of truth for what the API returns;
+    this only maps ids to the records already held there so single-id
+    lookups don't have to walk every department or every post.
+    """
+
+    def __init__(self):
+        self._posts: Dict[str, PostEntry] = {}
+        self._applicants: Dict[str, ApplicantEntry] = {}
+        self._lock = threading.Lock()
+
+    # ---------------- Posts ----------------
+    def add_post(self, department_id: str, post: Dict[str, Any], state: str = ACTIVE):
+        with self._lock:
+            self._posts[post["id"]] = PostEntry(department_id, state, post)
+
+    def set_post_state(self, post_id: str, state: str):
+        with self._lock:
+            entry = self._posts.get(post_id)
+            if entry is not None:
+                entry.state = state
+
+    def post_entry(self, post_id: str) -> Optional[PostEntry]:
+        return self._posts.get(post_id)
+
+    def post(self, post_id: str, state: Optional[str] = None, department_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        entry = self._posts.get(post_id)
+        if entry is None:
+            return None
+        if state is not None and entry.state != state:
+            return None
+        if department_id is not None and entry.department_id != department_id:
+            return None
+        return entry.record
+
+    # ---------------- Applicants ----------------
+    def add_applicants(self, post_id: str, applicants: List[Dict[str, Any]]):
+        with self._lock:
+            for a in applicants:
+                self._applicants[a["id"]] = ApplicantEntry(post_id, a)
+
+    def applicant_entry(self, applicant_id: str) -> Optional[ApplicantEntry]:
+        return self._applicants.get(applicant_id)
+
+    def applicant(self, applicant_id: str, post_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        entry = self._applicants.get(applicant_id)
+        if entry is None:
+            return None
+        if post_id is not None and entry.post_id != post_id:
+            return None
+        return entry.record
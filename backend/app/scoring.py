@@ -0,0 +1,389 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Callable, Dict, Any, List
+
+import numpy as np
+
+from .applicants import Applicant
+from .ranked_index import RankedIndex
+from .semantic import SemanticIndex
+
+
+QUALIFYING_KEYWORDS = ["Tech", "B.Tech", "M.Tech", "MBA", "BSc", "MSc", "BE"]
+AFFIRMATIVE_CATEGORIES = ["SC", "ST", "OBC", "EWS"]
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "skill_per_match": 12.5,
+    "skills_max": 50,
+    "qualification_match": 15,
+    "qualification_other": 8,
+    "location_match": 10,
+    "location_other": 5,
+    "sector_match": 15,
+    "sector_other": 7,
+    "rural_bonus": 5,
+    "social_category_bonus": 5,
+    "past_participation_penalty": -5,
+    # Points for a perfect TF-IDF match between the post text and the applicant's
+    # profile; 0 keeps the semantic component (and scikit-learn) out entirely
+    "semantic": 0,
+}
+
+SCORE_CACHE_MAX_POSTS = int(os.getenv("SCORE_CACHE_MAX_POSTS", "256"))
+
+
+def round_scores(total):
+    """The one rounding rule for scores (NumPy's, for scalars and arrays alike).
+
+    Python's ``round`` rounds the exact binary value and can land on the
+    other side of a tie than ``np.round``, so both scorers go through here.
+    """
+    return np.round(total, 2)
+
+
+def score_applicant(post: Dict[str, Any], a: Dict[str, Any], weights: Dict[str, float] = DEFAULT_WEIGHTS) -> float:
+    """Scalar reference scorer; the batch engine must agree with it exactly.
+
+    Components are added in the same order as in ``score_rows`` so the
+    float sums match bit for bit, under any weights. The semantic component
+    is not computed here, so the two only agree while its weight is 0.
+    """
+    w = weights
+    required = set([s.lower() for s in post.get("skills_required", [])])
+    preferred_location = post.get("location_preference")
+    sector = post.get("sector")
+
+    skills = set([s.lower() for s in a.get("skills", [])])
+    skills_score = min(w["skills_max"], len(required.intersection(skills)) * w["skill_per_match"])
+    qualification = a.get("qualifications", "")
+    qual_score = w["qualification_match"] if any(k in qualification for k in QUALIFYING_KEYWORDS) else w["qualification_other"]
+    loc_score = w["location_match"] if preferred_location and a.get("location") == preferred_location else w["location_other"]
+    sec_score = w["sector_match"] if sector in set(a.get("sector_interests", [])) else w["sector_other"]
+    rural_bonus = w["rural_bonus"] if a.get("rural") else 0
+    social_bonus = w["social_category_bonus"] if a.get("social_category") in AFFIRMATIVE_CATEGORIES else 0
+    past_penalty = w["past_participation_penalty"] if a.get("past_participation", 0) > 0 else 0
+    total = float(skills_score) + qual_score + loc_score + sec_score + rural_bonus + social_bonus + past_penalty
+    return float(round_scores(total))
+
+
+class _Vocab:
+    __slots__ = ("index", "values")
+
+    def __init__(self):
+        self.index: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        c = self.index.get(value)
+        if c is None:
+            c = len(self.values)
+            self.index[value] = c
+            self.values.append(value)
+        return c
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PostColumns:
+    """Columnar copy of one post's applicant pool.
+
+    Skills and sector interests are boolean membership matrices (one column
+    per vocabulary entry); qualification, location and social_category are
+    integer codes into per-post vocabularies. Rows are appended as applicants
+    arrive, so the Python-level encoding cost is paid once per applicant.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._cap = 0
+        self.skill_vocab = _Vocab()
+        self.sector_vocab = _Vocab()
+        self.qual_vocab = _Vocab()
+        self.loc_vocab = _Vocab()
+        self.social_vocab = _Vocab()
+        self.skills = np.zeros((0, 0), dtype=bool)
+        self.sectors = np.zeros((0, 0), dtype=bool)
+        self.qual = np.zeros(0, dtype=np.int32)
+        self.loc = np.zeros(0, dtype=np.int32)
+        self.social = np.zeros(0, dtype=np.int32)
+        self.rural = np.zeros(0, dtype=bool)
+        self.past = np.zeros(0, dtype=bool)
+
+    def _reserve(self, rows: int, skill_cols: int, sector_cols: int):
+        cap = self._cap
+        if rows > cap:
+            cap = max(rows, cap * 2, 64)
+        if cap != self._cap or skill_cols > self.skills.shape[1] or sector_cols > self.sectors.shape[1]:
+            self.skills = _grow2d(self.skills, cap, max(skill_cols, self.skills.shape[1]))
+            self.sectors = _grow2d(self.sectors, cap, max(sector_cols, self.sectors.shape[1]))
+            if cap != self._cap:
+                self.qual = _grow1d(self.qual, cap)
+                self.loc = _grow1d(self.loc, cap)
+                self.social = _grow1d(self.social, cap)
+                self.rural = _grow1d(self.rural, cap)
+                self.past = _grow1d(self.past, cap)
+                self._cap = cap
+
+    def append(self, applicants: List[Dict[str, Any]]):
+        if not applicants:
+            return
+        skill_rows = [[self.skill_vocab.code(s.lower()) for s in a.get("skills", [])] for a in applicants]
+        sector_rows = [[self.sector_vocab.code(s) for s in a.get("sector_interests", [])] for a in applicants]
+        start, end = self.n, self.n + len(applicants)
+        self._reserve(end, len(self.skill_vocab), len(self.sector_vocab))
+        _scatter(self.skills, start, skill_rows)
+        _scatter(self.sectors, start, sector_rows)
+        self.qual[start:end] = [self.qual_vocab.code(a.get("qualifications", "")) for a in applicants]
+        self.loc[start:end] = [self.loc_vocab.code(a.get("location")) for a in applicants]
+        self.social[start:end] = [self.social_vocab.code(a.get("social_category")) for a in applicants]
+        self.rural[start:end] = [bool(a.get("rural")) for a in applicants]
+        self.past[start:end] = [a.get("past_participation", 0) > 0 for a in applicants]
+        self.n = end
+
+    def plan(self, post: Dict[str, Any], weights: Dict[str, float] = DEFAULT_WEIGHTS) -> Dict[str, Any]:
+        """Resolve the post against this pool's vocabularies into plain codes and lookup tables."""
+        w = weights
+        preferred = post.get("location_preference")
+        return {
+            "weights": dict(w),
+            "required": [self.skill_vocab.index[s] for s in {s.lower() for s in post.get("skills_required", [])} if s in self.skill_vocab.index],
+            "qual_lut": np.array([w["qualification_match"] if any(k in q for k in QUALIFYING_KEYWORDS) else w["qualification_other"]
+                                  for q in self.qual_vocab.values], dtype=np.float64),
+            "loc_code": self.loc_vocab.index.get(preferred) if preferred else None,
+            "sec_code": self.sector_vocab.index.get(post.get("sector")),
+            "social_lut": np.array([w["social_category_bonus"] if c in AFFIRMATIVE_CATEGORIES else 0
+                                    for c in self.social_vocab.values], dtype=np.float64),
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Views of the filled rows, as consumed by ``score_rows``."""
+        n = self.n
+        return {"skills": self.skills[:n], "sectors": self.sectors[:n], "qual": self.qual[:n], "loc": self.loc[:n],
+                "social": self.social[:n], "rural": self.rural[:n], "past": self.past[:n]}
+
+    def score(self, post: Dict[str, Any], weights: Dict[str, float] = DEFAULT_WEIGHTS, start: int = 0) -> np.ndarray:
+        """Score rows ``start:n``; ``start`` lets newly appended rows be scored alone."""
+        if self.n <= start:
+            return np.zeros(0, dtype=np.float64)
+        return score_rows(self.arrays(), self.plan(post, weights), start, self.n)
+
+
+def score_rows(cols: Dict[str, np.ndarray], plan: Dict[str, Any], start: int, end: int) -> np.ndarray:
+    """The batch scorer proper: rows ``start:end`` of ``PostColumns.arrays()`` under a ``plan``.
+
+    Kept free of PostColumns so the process pool can run it over shared-memory views.
+    """
+    w = plan["weights"]
+    rows = slice(start, end)
+    n = end - start
+
+    required = plan["required"]
+    overlap = cols["skills"][rows][:, required].sum(axis=1) if required else np.zeros(n, dtype=np.int64)
+    total = np.minimum(w["skills_max"], overlap * w["skill_per_match"]).astype(np.float64)
+
+    total += plan["qual_lut"][cols["qual"][rows]]
+
+    loc_code = plan["loc_code"]
+    if loc_code is None:
+        total += w["location_other"]
+    else:
+        total += np.where(cols["loc"][rows] == loc_code, w["location_match"], w["location_other"])
+
+    sec_code = plan["sec_code"]
+    if sec_code is None:
+        total += w["sector_other"]
+    else:
+        total += np.where(cols["sectors"][rows][:, sec_code], w["sector_match"], w["sector_other"])
+
+    total += np.where(cols["rural"][rows], w["rural_bonus"], 0)
+    total += plan["social_lut"][cols["social"][rows]]
+    total += np.where(cols["past"][rows], w["past_participation_penalty"], 0)
+    return round_scores(total)
+
+
+def _scatter(matrix: np.ndarray, start: int, rows: List[List[int]]):
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    cols = np.fromiter((c for r in rows for c in r), dtype=np.int64, count=int(lengths.sum()))
+    matrix[np.repeat(np.arange(start, start + len(rows)), lengths), cols] = True
+
+
+def _grow1d(arr: np.ndarray, cap: int) -> np.ndarray:
+    out = np.zeros(cap, dtype=arr.dtype)
+    out[:len(arr)] = arr[:cap]
+    return out
+
+
+def _grow2d(arr: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    out = np.zeros((rows, cols), dtype=arr.dtype)
+    r, c = min(arr.shape[0], rows), arr.shape[1]
+    out[:r, :c] = arr[:r]
+    return out
+
+
+class Ranking:
+    """Ranked index for one post at one (post version, weights version) key."""
+
+    __slots__ = ("key", "index")
+
+    def __init__(self, key, index: RankedIndex):
+        self.key = key
+        self.index = index
+
+
+class ScoringEngine:
+    """Holds one PostColumns per post and scores whole pools in one pass.
+
+    Rankings are memoized per (post_id, post version, weights version) in a
+    bounded LRU. Anything that can change a ranking must call ``bump`` for
+    the post (or go through ``set_weights``) so the next lookup recomputes.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_cached_posts: int = SCORE_CACHE_MAX_POSTS):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.weights_version = 0
+        self.max_cached_posts = max_cached_posts
+        self._columns: Dict[str, PostColumns] = {}
+        self._versions: Dict[str, int] = {}
+        self._rankings: "OrderedDict[str, Ranking]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.semantic = SemanticIndex()
+        # Called with (post_id, applicants, scores, start) whenever scores are written
+        # back; start is the row of the first applicant, 0 when the whole post was scored
+        self.on_scored: Optional[Callable[[str, List[Dict[str, Any]], List[float], int], None]] = None
+
+    def columns(self, post_id: str, applicants: List[Dict[str, Any]]) -> PostColumns:
+        with self._lock:
+            cols = self._columns.get(post_id)
+            if cols is None or cols.n > len(applicants):
+                cols = self._columns[post_id] = PostColumns()
+            if cols.n < len(applicants):
+                cols.append(applicants[cols.n:])
+            return cols
+
+    def drop(self, post_id: str):
+        """Forget the column store, e.g. after applicants were removed."""
+        with self._lock:
+            self._columns.pop(post_id, None)
+            self.semantic.drop(post_id)
+            self._bump(post_id)
+
+    def version(self, post_id: str) -> int:
+        return self._versions.get(post_id, 0)
+
+    def bump(self, post_id: str) -> int:
+        with self._lock:
+            return self._bump(post_id)
+
+    def _bump(self, post_id: str) -> int:
+        v = self._versions.get(post_id, 0) + 1
+        self._versions[post_id] = v
+        self._rankings.pop(post_id, None)
+        return v
+
+    def set_weights(self, weights: Dict[str, float]):
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        with self._lock:
+            self.weights = {**self.weights, **weights}
+            self.weights_version += 1
+            self._rankings.clear()
+
+    def score(self, post: Dict[str, Any], applicants: List[Dict[str, Any]], start: int = 0) -> np.ndarray:
+        scores = self.columns(post["id"], applicants).score(post, self.weights, start=start)
+        w = self.weights.get("semantic", 0)
+        if w and len(scores):
+            scores = round_scores(scores + w * self.semantic.similarity(post, applicants, start))
+        return scores
+
+    def rank(self, post: Dict[str, Any], applicants: List[Dict[str, Any]]):
+        """Return (scores, order) with order sorted by score descending.
+
+        The sort is stable so equal scores keep applicant order, matching the
+        previous ``list.sort(reverse=True)`` behaviour.
+        """
+        scores = self.score(post, applicants)
+        order = np.argsort(-scores, kind="stable")
+        return scores, order
+
+    def ranked(self, post: Dict[str, Any], applicants: List[Dict[str, Any]]) -> Ranking:
+        """Cached ranking; on a miss the scores are also written back to ``a["score"]``."""
+        post_id = post["id"]
+        with self._lock:
+            key = (self._versions.get(post_id, 0), self.weights_version)
+            cached = self._rankings.get(post_id)
+            if cached is not None and cached.key == key:
+                self._rankings.move_to_end(post_id)
+                return cached
+            return self._install(post_id, applicants, self.score(post, applicants).tolist(), key)
+
+    def _install(self, post_id: str, applicants: List[Dict[str, Any]], scores: List[float], key) -> Ranking:
+        compact = bool(applicants) and isinstance(applicants[0], Applicant)
+        if compact:
+            for a, score in zip(applicants, scores):
+                a.score = score
+            ids, statuses = [a.id for a in applicants], [a.status for a in applicants]
+        else:
+            for a, score in zip(applicants, scores):
+                a["score"] = score
+            ids, statuses = [a["id"] for a in applicants], [a["status"] for a in applicants]
+        if self.on_scored is not None:
+            self.on_scored(post_id, applicants, scores, 0)
+        order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable").tolist()
+        index = RankedIndex(ids, scores, statuses, order)
+        ranking = self._rankings[post_id] = Ranking(key, index)
+        self._rankings.move_to_end(post_id)
+        while len(self._rankings) > self.max_cached_posts:
+            self._rankings.popitem(last=False)
+        return ranking
+
+    def snapshot(self, post: Dict[str, Any], applicants: List[Dict[str, Any]]):
+        """(key, column arrays, plan) to score the post outside the engine, e.g. on a process pool."""
+        with self._lock:
+            cols = self.columns(post["id"], applicants)
+            key = (self._versions.get(post["id"], 0), self.weights_version)
+            return key, cols.arrays(), cols.plan(post, self.weights)
+
+    def install(self, post: Dict[str, Any], applicants: List[Dict[str, Any]], key, scores: np.ndarray) -> bool:
+        """Adopt scores computed from a ``snapshot``; False when the post or the weights moved on meanwhile."""
+        post_id = post["id"]
+        with self._lock:
+            if key != (self._versions.get(post_id, 0), self.weights_version) or len(scores) != len(applicants):
+                return False
+            w = self.weights.get("semantic", 0)
+            if w and len(scores):
+                scores = round_scores(scores + w * self.semantic.similarity(post, applicants))
+            self._install(post_id, applicants, np.asarray(scores).tolist(), key)
+            return True
+
+    def add_applicants(self, post: Dict[str, Any], applicants: List[Dict[str, Any]], added: int):
+        """Record that the last ``added`` entries of ``applicants`` are new.
+
+        A warm ranking is kept and only the new rows are scored and inserted;
+        otherwise the post is simply invalidated.
+        """
+        post_id = post["id"]
+        with self._lock:
+            cached = self._rankings.get(post_id)
+            fresh = cached is not None and cached.key == (self._versions.get(post_id, 0), self.weights_version)
+            v = self._bump(post_id)
+            if not fresh or added <= 0:
+                return
+            start = len(applicants) - added
+            new = applicants[start:]
+            scores = self.score(post, applicants, start=start).tolist()
+            for a, score in zip(new, scores):
+                a["score"] = score
+                cached.index.add(a["id"], score, a["status"])
+            if self.on_scored is not None:
+                self.on_scored(post_id, new, scores, start)
+            cached.key = (v, self.weights_version)
+            self._rankings[post_id] = cached
+
+    def status_changed(self, post_id: str, applicant_id: str, status: str):
+        with self._lock:
+            cached = self._rankings.get(post_id)
+            if cached is not None:
+                cached.index.set_status(applicant_id, status)
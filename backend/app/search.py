@@ -0,0 +1,212 @@
+import bisect
+import heapq
+import os
+import threading
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+from .applicants import SKILL_VOCAB, SECTOR_VOCAB
+from .ranked_index import RankedIndex
+
+
+# Query terms; each has its own value -> bitmap postings
+TERMS = ("skill", "location", "qualification", "sector_interest", "status")
+MAX_QUERY_NODES = 256
+# Ranked pages over a post with at most this many matches sort just those
+# rows; more are found by walking the post's ranking and testing bits.
+SORT_MATCHES_MAX = int(os.getenv("SEARCH_SORT_MATCHES_MAX", "256"))
+_CHUNK_BITS = 4096
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+def _bitmap(positions: List[int]) -> int:
+    """Bitmap with bits ``positions`` set, built in one go rather than bit by bit."""
+    width = positions[-1] + 1
+    flags = np.zeros(width, dtype=bool)
+    flags[positions] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+def _positions(bits: int) -> np.ndarray:
+    if bits <= 0:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+def _iter_rows(bits: int, start: int = 0) -> Iterator[int]:
+    """Set bits at or after ``start`` in ascending order, decoded a chunk at a time."""
+    bits >>= start
+    while bits:
+        for p in _positions(bits & _CHUNK_MASK).tolist():
+            yield start + p
+        bits >>= _CHUNK_BITS
+        start += _CHUNK_BITS
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower()
+
+
+class InvertedIndex:
+    """Term -> applicant bitmaps per post, for cross-post search.
+
+    Each term value (skill, location, qualification, sector interest,
+    status) keeps one Python int per post whose set bits are the rows of
+    ``APPLICANTS[post_id]`` carrying it, so boolean queries are a few big-int
+    AND/OR/NOT operations per post in scope and counts are a popcount. A
+    status change rewrites two bitmaps of its own post only. Applicants also
+    get a global document number on arrival, which orders results across
+    posts and keys the cursors.
+    """
+
+    def __init__(self):
+        self._docs: List[Any] = []
+        self._doc_post: List[str] = []
+        self._doc_of: Dict[str, int] = {}
+        self._terms: Dict[str, Dict[str, Dict[str, int]]] = {t: {} for t in TERMS}   # term -> value -> post -> bits
+        self._post_docs: Dict[str, List[int]] = {}   # post -> row -> document, ascending
+        self._lock = threading.Lock()
+
+    # ---------------- Updates ----------------
+    def add(self, post_id: str, applicants: List[Any]):
+        if not applicants:
+            return
+        with self._lock:
+            start = len(self._docs)
+            post_docs = self._post_docs.setdefault(post_id, [])
+            first_row = len(post_docs)
+            groups: Dict[str, Dict[str, List[int]]] = {t: {} for t in TERMS}
+            skills_of: Dict[int, List[str]] = {}
+            sectors_of: Dict[int, List[str]] = {}
+            for i, a in enumerate(applicants):
+                self._doc_of[a["id"]] = start + i
+                row = first_row + i
+                skills = skills_of.get(a.skill_bits)
+                if skills is None:
+                    skills = skills_of[a.skill_bits] = [_norm(s) for s in SKILL_VOCAB.decode(a.skill_bits)]
+                sectors = sectors_of.get(a.sector_bits)
+                if sectors is None:
+                    sectors = sectors_of[a.sector_bits] = [_norm(s) for s in SECTOR_VOCAB.decode(a.sector_bits)]
+                for s in skills:
+                    groups["skill"].setdefault(s, []).append(row)
+                for s in sectors:
+                    groups["sector_interest"].setdefault(s, []).append(row)
+                groups["location"].setdefault(_norm(a.location), []).append(row)
+                groups["qualification"].setdefault(_norm(a.qualifications), []).append(row)
+                groups["status"].setdefault(a.status, []).append(row)
+            self._docs.extend(applicants)
+            self._doc_post.extend([post_id] * len(applicants))
+            post_docs.extend(range(start, start + len(applicants)))
+            for term, values in groups.items():
+                postings = self._terms[term]
+                for value, rows in values.items():
+                    by_post = postings.setdefault(value, {})
+                    by_post[post_id] = by_post.get(post_id, 0) | _bitmap(rows)
+
+    def status_changed(self, applicant_id: str, old: str, new: str):
+        if old == new:
+            return
+        with self._lock:
+            doc = self._doc_of.get(applicant_id)
+            if doc is None:
+                return
+            post_id = self._doc_post[doc]
+            bit = 1 << bisect.bisect_left(self._post_docs[post_id], doc)
+            postings = self._terms["status"]
+            old_bits, new_bits = postings.setdefault(old, {}), postings.setdefault(new, {})
+            old_bits[post_id] = old_bits.get(post_id, 0) & ~bit
+            new_bits[post_id] = new_bits.get(post_id, 0) | bit
+
+    # ---------------- Queries ----------------
+    def evaluate(self, query: Dict[str, Any], post_ids: Iterable[str]) -> Dict[str, int]:
+        """Per-post bitmaps of the rows matching a query tree, for the posts given.
+
+        A node is ``{"and": [...]}``, ``{"or": [...]}``, ``{"not": node}`` or a
+        term such as ``{"skill": "python"}``; a term given a list matches any
+        of its values. Unknown skills, locations etc. simply match nothing.
+        """
+        post_ids = list(post_ids)
+        live = [(1 << len(self._post_docs.get(pid, ()))) - 1 for pid in post_ids]
+        bits = self._eval(query, [MAX_QUERY_NODES], post_ids, live)
+        return {pid: b & l for pid, b, l in zip(post_ids, bits, live)}
+
+    def _eval(self, node, budget: List[int], post_ids: List[str], live: List[int]) -> List[int]:
+        budget[0] -= 1
+        if budget[0] < 0:
+            raise HTTPException(status_code=400, detail=f"Query has more than {MAX_QUERY_NODES} nodes")
+        if not isinstance(node, dict) or len(node) != 1:
+            raise HTTPException(status_code=400, detail="Each query node must be an object with exactly one key")
+        (op, arg), = node.items()
+        if op in ("and", "or"):
+            if not isinstance(arg, list) or not arg:
+                raise HTTPException(status_code=400, detail=f"'{op}' takes a non-empty list")
+            parts = [self._eval(n, budget, post_ids, live) for n in arg]
+            out = parts[0]
+            for p in parts[1:]:
+                out = [x & y for x, y in zip(out, p)] if op == "and" else [x | y for x, y in zip(out, p)]
+            return out
+        if op == "not":
+            return [l & ~b for l, b in zip(live, self._eval(arg, budget, post_ids, live))]
+        if op not in self._terms:
+            raise HTTPException(status_code=400, detail=f"Unknown query term '{op}'; expected and, or, not or one of: {', '.join(TERMS)}")
+        postings = self._terms[op]
+        out = [0] * len(post_ids)
+        for value in (arg if isinstance(arg, list) else [arg]):
+            by_post = postings.get(value if op == "status" else _norm(value))
+            if by_post:
+                out = [b | by_post.get(pid, 0) for b, pid in zip(out, post_ids)]
+        return out
+
+    def count(self, matches: Dict[str, int]) -> int:
+        return sum(bits.bit_count() for bits in matches.values())
+
+    def count_by_post(self, matches: Dict[str, int]) -> Dict[str, int]:
+        return {pid: bits.bit_count() for pid, bits in matches.items()}
+
+    def post_of(self, doc: int) -> str:
+        return self._doc_post[doc]
+
+    def iter_docs(self, matches: Dict[str, int], after: Optional[int] = None) -> Iterator[Tuple[int, Any]]:
+        """(document, applicant) in arrival order, starting after document ``after``."""
+        streams = [self._matched_docs(pid, bits, after) for pid, bits in matches.items() if bits]
+        for d in heapq.merge(*streams):
+            yield d, self._docs[d]
+
+    def _matched_docs(self, post_id: str, bits: int, after: Optional[int]) -> Iterator[int]:
+        docs = self._post_docs[post_id]
+        for row in _iter_rows(bits, 0 if after is None else bisect.bisect_right(docs, after)):
+            yield docs[row]
+
+    def iter_by_score(self, matches: Dict[str, int], ranked: Dict[str, RankedIndex],
+                      after: Optional[Tuple[float, int]] = None) -> Iterator[Tuple[Tuple[float, int], Any]]:
+        """(key, applicant) by score descending, ties in arrival order; key is (-score, document).
+
+        ``ranked`` holds the current RankedIndex of every post with matches;
+        their heads are merged, so a page only reads as far into each post as
+        the page reaches.
+        """
+        streams = [self._ranked_matches(pid, bits, ranked[pid], after) for pid, bits in matches.items() if bits]
+        for key in heapq.merge(*streams):
+            yield key, self._docs[key[1]]
+
+    def _ranked_matches(self, post_id: str, bits: int, index: RankedIndex,
+                        after: Optional[Tuple[float, int]]) -> Iterator[Tuple[float, int]]:
+        docs = self._post_docs[post_id]
+        # RankedIndex keys are (-score, row); rows and documents rise together within a post
+        start = None if after is None else (after[0], bisect.bisect_right(docs, after[1]) - 1)
+        # Rows indexed here but not yet ranked (added mid-request) are left for the next query
+        ranked_rows = len(index)
+        if bits.bit_count() <= SORT_MATCHES_MAX:
+            keys = sorted(index.key(row) for row in _iter_rows(bits) if row < ranked_rows)
+            if start is not None:
+                keys = keys[bisect.bisect_right(keys, start):]
+            for neg, row in keys:
+                yield neg, docs[row]
+            return
+        flags = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        for (neg, row), _ in index.iter_after(start):
+            if row >> 3 < len(flags) and flags[row >> 3] >> (row & 7) & 1:
+                yield neg, docs[row]
@@ -0,0 +1,161 @@
+import itertools
+import os
+import threading
+from typing import Optional, Callable, Dict, Any, Iterable, List
+
+import numpy as np
+
+
+SEMANTIC_FIT_SAMPLE = int(os.getenv("SEMANTIC_FIT_SAMPLE", "5000"))
+_NORM_CHUNK = 16384
+
+
+def post_text(post: Dict[str, Any]) -> str:
+    return " ".join([post.get("title", ""), post.get("description", ""), " ".join(post.get("skills_required", []))])
+
+
+def applicant_text(a: Dict[str, Any]) -> str:
+    return " ".join([" ".join(a.get("skills", [])), a.get("qualifications", "") or "", " ".join(a.get("sector_interests", []))])
+
+
+class _PostBlock:
+    __slots__ = ("counts", "norms", "rows", "text", "vec", "sims")
+
+    def __init__(self):
+        self.counts: List[Any] = []        # applicant x word count matrices, one per append
+        self.norms: List[np.ndarray] = []  # TF-IDF row norms matching each count matrix
+        self.rows = 0
+        self.text: Optional[str] = None
+        self.vec = None
+        self.sims = np.zeros(0, dtype=np.float64)
+
+
+class SemanticIndex:
+    """TF-IDF similarity between a post's text and its applicants' profiles.
+
+    One vectorizer over character n-grams (so "postgres" / "postgresql" or
+    "react" / "reactjs" still overlap) is fitted once, on the first request,
+    from up to ``fit_sample`` texts of the corpus callback. Word-boundary
+    n-grams never span words, so a profile's TF-IDF row is the sum of its
+    words' rows: the index keeps one sparse word x n-gram matrix for the
+    whole vocabulary and, per post, a sparse applicant x word count matrix
+    with the resulting row norms. Similarity to a post is then
+    ``counts @ (words @ post)`` divided by those norms, and new applicants
+    only add count rows. Results are cached per post until its text changes.
+
+    scikit-learn is imported on first use only.
+    """
+
+    def __init__(self, fit_sample: int = SEMANTIC_FIT_SAMPLE):
+        self.fit_sample = fit_sample
+        # Returns the texts the vectorizer is fitted on: post texts first, then applicant profiles
+        self.corpus: Optional[Callable[[], Iterable[str]]] = None
+        self._vectorizer = None
+        self._word_ids: Dict[str, int] = {}
+        self._word_rows: List[Any] = []
+        self._words = None
+        self._posts: Dict[str, _PostBlock] = {}
+        self._part_words: Dict[Any, List[int]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def fitted(self) -> bool:
+        return self._vectorizer is not None
+
+    def _fit(self, extra: List[str]):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        texts = list(itertools.islice(self.corpus(), self.fit_sample)) if self.corpus is not None else []
+        # Raw tf * idf, unnormalised, so word rows can be summed into profile rows
+        vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), norm=None, dtype=np.float32)
+        vectorizer.fit(texts + extra)
+        self._vectorizer = vectorizer
+
+    def _word_matrix(self):
+        if self._words is None or self._words.shape[0] != len(self._word_rows):
+            from scipy import sparse
+            self._words = sparse.vstack(self._word_rows, format="csr")
+        return self._words
+
+    def _ids(self, text: str, new_words: List[str]) -> List[int]:
+        word_ids = self._word_ids
+        out = []
+        for w in text.lower().split():
+            i = word_ids.get(w)
+            if i is None:
+                i = word_ids[w] = len(word_ids)
+                new_words.append(w)
+            out.append(i)
+        return out
+
+    def _part(self, key, text_of: Callable[[], str], new_words: List[str]) -> List[int]:
+        ids = self._part_words.get(key)
+        if ids is None:
+            ids = self._part_words[key] = self._ids(text_of(), new_words)
+        return ids
+
+    def _encode(self, applicants: List[Dict[str, Any]]):
+        """Applicant x word count matrix for ``applicants``, registering unseen words."""
+        from scipy import sparse
+        indptr, indices = [0], []
+        new_words: List[str] = []
+        for a in applicants:
+            if hasattr(a, "skill_bits"):
+                # Compact records: skills, qualification and sectors come from small
+                # vocabularies, so each distinct part is split into words once
+                indices += self._part(("s", a.skill_bits), lambda: " ".join(a.skills), new_words)
+                indices += self._part(("q", a.qualifications), lambda: a.qualifications or "", new_words)
+                indices += self._part(("i", a.sector_bits), lambda: " ".join(a.sector_interests), new_words)
+            else:
+                indices += self._ids(applicant_text(a), new_words)
+            indptr.append(len(indices))
+        word_ids = self._word_ids
+        if new_words:
+            self._word_rows.append(self._vectorizer.transform(new_words))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(applicants), len(word_ids)),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def _norms(self, counts) -> np.ndarray:
+        words = self._word_matrix()[:counts.shape[1]]
+        out = np.empty(counts.shape[0], dtype=np.float64)
+        for lo in range(0, counts.shape[0], _NORM_CHUNK):
+            rows = counts[lo:lo + _NORM_CHUNK] @ words
+            out[lo:lo + _NORM_CHUNK] = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+        return out
+
+    def _sims(self, block: _PostBlock, counts, norms: np.ndarray) -> np.ndarray:
+        per_word = np.asarray((self._word_matrix()[:counts.shape[1]] @ block.vec.T).todense(), dtype=np.float64).ravel()
+        dots = counts @ per_word
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def drop(self, post_id: str):
+        with self._lock:
+            self._posts.pop(post_id, None)
+
+    def similarity(self, post: Dict[str, Any], applicants: List[Dict[str, Any]], start: int = 0) -> np.ndarray:
+        """Cosine similarity of ``applicants[start:]`` to the post, in [0, 1]."""
+        post_id = post["id"]
+        with self._lock:
+            text = post_text(post)
+            if self._vectorizer is None:
+                sample = [] if self.corpus is not None else [applicant_text(a) for a in applicants[:self.fit_sample]]
+                self._fit([text] + sample)
+            block = self._posts.get(post_id)
+            if block is None or block.rows > len(applicants):
+                block = self._posts[post_id] = _PostBlock()
+            if block.text != text:
+                vec = self._vectorizer.transform([text])
+                norm = np.sqrt(vec.multiply(vec).sum())
+                block.text, block.vec = text, (vec / norm if norm else vec)
+                block.sims = np.concatenate([self._sims(block, c, n) for c, n in zip(block.counts, block.norms)] or [block.sims[:0]])
+            if block.rows < len(applicants):
+                counts = self._encode(applicants[block.rows:])
+                norms = self._norms(counts)
+                block.counts.append(counts)
+                block.norms.append(norms)
+                block.sims = np.concatenate([block.sims, self._sims(block, counts, norms)])
+                block.rows = len(applicants)
+            return block.sims[start:]
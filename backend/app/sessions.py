@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any, Set
+
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(8 * 60 * 60)))
+# Sessions one user may hold at once; logging in beyond that ends their oldest
+SESSION_MAX_PER_USER = int(os.getenv("SESSION_MAX_PER_USER", "20"))
+# Seconds between sweeps that drop expired sessions nobody has presented since
+SESSION_PURGE_SECONDS = float(os.getenv("SESSION_PURGE_SECONDS", "300"))
+
+
+class SessionStore:
+    """Token -> session index with expiry, a per-user bound and revocation.
+
+    Lookups are a single hash probe. A valid session is never dropped to
+    make room for someone else's: growth is bounded per user (their oldest
+    session ends once they exceed ``max_per_user``), and expired sessions
+    go on lookup or through ``purge_expired``, which the app runs every
+    ``SESSION_PURGE_SECONDS``. A secondary email -> tokens index lets one
+    user hold several sessions and lets us revoke all of them at once.
+    """
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS, max_per_user: int = SESSION_MAX_PER_USER):
+        self.ttl_seconds = ttl_seconds
+        self.max_per_user = max_per_user
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, email: str, user: Dict[str, Any]) -> str:
+        token = str(uuid.uuid4())
+        now = time.time()
+        session = {
+            "token": token,
+            "email": email,
+            "name": user["name"],
+            "department_id": user["department_id"],
+            "created_at": now,
+            "expires_at": now + self.ttl_seconds,
+        }
+        with self._lock:
+            self._sessions[token] = session
+            tokens = self._by_user.setdefault(email, set())
+            tokens.add(token)
+            while len(tokens) > self.max_per_user:
+                oldest = min(tokens, key=lambda t: self._sessions[t]["created_at"])
+                del self._sessions[oldest]
+                tokens.discard(oldest)
+        return token
+
+    def get(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not token:
+            return None
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session["expires_at"] <= time.time():
+                del self._sessions[token]
+                self._unlink(token, session["email"])
+                return None
+            return session
+
+    def restore(self, session: Dict[str, Any]) -> bool:
+        """Re-admit a session persisted by a previous process, unless it has expired."""
+        if session["expires_at"] <= time.time():
+            return False
+        with self._lock:
+            self._sessions[session["token"]] = session
+            self._by_user.setdefault(session["email"], set()).add(session["token"])
+        return True
+
+    def revoke(self, token: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(token, None)
+            if session is None:
+                return False
+            self._unlink(token, session["email"])
+            return True
+
+    def revoke_user(self, email: str) -> int:
+        with self._lock:
+            tokens = self._by_user.pop(email, set())
+            for t in tokens:
+                self._sessions.pop(t, None)
+            return len(tokens)
+
+    def sessions_for(self, email: str) -> int:
+        with self._lock:
+            return len(self._by_user.get(email, ()))
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [t for t, s in self._sessions.items() if s["expires_at"] <= now]
+            for t in expired:
+                s = self._sessions.pop(t)
+                self._unlink(t, s["email"])
+            return len(expired)
+
+    def _unlink(self, token: str, email: str):
+        tokens = self._by_user.get(email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[email]
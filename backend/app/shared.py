@@ -0,0 +1,394 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+
+SHARED_STATE = os.getenv("SHARED_STATE", "none")   # none | redis | fake
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SHARED_PREFIX = os.getenv("SHARED_PREFIX", "pm:")
+SHARED_LOCK_TTL_MS = int(os.getenv("SHARED_LOCK_TTL_MS", "10000"))
+# With persistent storage holding the state, events older than this are trimmed from the log
+SHARED_EVENTS_RETAIN_SECONDS = int(os.getenv("SHARED_EVENTS_RETAIN_SECONDS", "3600"))
+# On startup from storage, events this recent are replayed too, in case their write-through was still in flight
+SHARED_REPLAY_OVERLAP_MS = int(os.getenv("SHARED_REPLAY_OVERLAP_MS", "5000"))
+# How often an idle worker catches up with the log (and trims it, with persistent storage)
+SHARED_POLL_SECONDS = float(os.getenv("SHARED_POLL_SECONDS", "1"))
+SHARED_TRIM_INTERVAL_SECONDS = 60
+
+START = "0-0"
+
+# Scripts run atomically on the server; FakeRedis implements the same three by name
+RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+RENEW_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+return 0
+"""
+INCR_BELOW = """
+local v = tonumber(redis.call('get', KEYS[1]) or '0')
+if v >= tonumber(ARGV[1]) then return -1 end
+return redis.call('incr', KEYS[1])
+"""
+
+
+class LockLost(RuntimeError):
+    """A shared lock expired, or was taken over, before its holder released it."""
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    ms, _, n = entry_id.partition("-")
+    return int(ms), int(n or 0)
+
+
+class FakeRedis:
+    """In-process stand-in for the handful of Redis commands the app uses.
+
+    Method names, arguments and return values follow redis-py with
+    ``decode_responses=True``, so everything built on top can be exercised
+    without a server. Commands are atomic under one lock, like Redis.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._stream_last: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str):
+        exp = self._expires.get(key)
+        if exp is not None and exp <= time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = str(value)
+            self._expires.pop(key, None)
+            if ex is not None:
+                self._expires[key] = time.time() + ex
+            elif px is not None:
+                self._expires[key] = time.time() + px / 1000
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            n = 0
+            for k in keys:
+                if self._live(k) is not None:
+                    n += 1
+                self._data.pop(k, None)
+                self._expires.pop(k, None)
+            return n
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._live(key) or 0) + amount
+            self._data[key] = str(value)
+            return value
+
+    def sadd(self, key: str, *members: str) -> int:
+        with self._lock:
+            s: Set[str] = self._data.setdefault(key, set())
+            before = len(s)
+            s.update(members)
+            return len(s) - before
+
+    def srem(self, key: str, *members: str) -> int:
+        with self._lock:
+            s = self._data.get(key, set())
+            before = len(s)
+            s.difference_update(members)
+            if not s:
+                self._data.pop(key, None)
+            return before - len(s)
+
+    def smembers(self, key: str) -> Set[str]:
+        with self._lock:
+            return set(self._data.get(key, ()))
+
+    def scard(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key, ()))
+
+    def xadd(self, name: str, fields: Dict[str, str]) -> str:
+        with self._lock:
+            entries: List[Tuple[Tuple[int, int], Dict[str, str]]] = self._data.setdefault(name, [])
+            ms = int(time.time() * 1000)
+            # Ids keep increasing even after a trim empties the stream, as in Redis
+            last = self._stream_last.get(name, (0, 0))
+            new = (ms, 0) if ms > last[0] else (last[0], last[1] + 1)
+            self._stream_last[name] = new
+            entries.append((new, dict(fields)))
+            return f"{new[0]}-{new[1]}"
+
+    def _bound(self, bound: str, low: bool) -> Tuple[Tuple[int, int], bool]:
+        if bound in ("-", "+"):
+            return ((0, 0) if bound == "-" else (2 ** 63, 0)), False
+        exclusive = bound.startswith("(")
+        ms, _, n = bound.lstrip("(").partition("-")
+        return (int(ms), int(n) if n else (0 if low else 2 ** 63)), exclusive
+
+    def xrange(self, name: str, min: str = "-", max: str = "+", count: Optional[int] = None):
+        (lo, lo_ex), (hi, hi_ex) = self._bound(min, True), self._bound(max, False)
+        with self._lock:
+            out = [(f"{i[0]}-{i[1]}", dict(f)) for i, f in self._data.get(name, [])
+                   if (i > lo if lo_ex else i >= lo) and (i < hi if hi_ex else i <= hi)]
+        return out[:count] if count is not None else out
+
+    def xrevrange(self, name: str, max: str = "+", min: str = "-", count: Optional[int] = None):
+        out = self.xrange(name, min, max)[::-1]
+        return out[:count] if count is not None else out
+
+    def xtrim(self, name: str, minid: str, approximate: bool = True) -> int:
+        floor = _stream_id(minid)
+        with self._lock:
+            entries = self._data.get(name, [])
+            keep = [e for e in entries if e[0] >= floor]
+            self._data[name] = keep
+            return len(entries) - len(keep)
+
+    def register_script(self, script: str):
+        impl = {RELEASE_LOCK: self._release_lock, RENEW_LOCK: self._renew_lock, INCR_BELOW: self._incr_below}[script]
+
+        def run(keys=(), args=()):
+            with self._lock:
+                return impl(*keys, *args)
+        return run
+
+    def _release_lock(self, key: str, token: str) -> int:
+        if self._live(key) != token:
+            return 0
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+        return 1
+
+    def _renew_lock(self, key: str, token: str, ttl_ms) -> int:
+        if self._live(key) != token:
+            return 0
+        self._expires[key] = time.time() + int(ttl_ms) / 1000
+        return 1
+
+    def _incr_below(self, key: str, limit) -> int:
+        value = int(self._live(key) or 0)
+        if value >= int(limit):
+            return -1
+        self._data[key] = str(value + 1)
+        return value + 1
+
+
+class SharedSessionStore:
+    """SessionStore with the same interface, kept in Redis so every worker sees every token.
+
+    Each session is one JSON value expiring with the session; an email ->
+    tokens set supports logout-everywhere. Redis' TTL replaces the local
+    expiry sweep.
+    """
+
+    def __init__(self, kv, ttl_seconds: int, prefix: str = SHARED_PREFIX):
+        self.kv = kv
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, token: str) -> str:
+        return f"{self.prefix}session:{token}"
+
+    def _user_key(self, email: str) -> str:
+        return f"{self.prefix}user_sessions:{email}"
+
+    def _put(self, session: Dict[str, Any], ttl: int):
+        self.kv.set(self._key(session["token"]), json.dumps(session), ex=max(1, ttl))
+        self.kv.sadd(self._user_key(session["email"]), session["token"])
+
+    def create(self, email: str, user: Dict[str, Any]) -> str:
+        token = str(uuid.uuid4())
+        now = time.time()
+        self._put({
+            "token": token,
+            "email": email,
+            "name": user["name"],
+            "department_id": user["department_id"],
+            "created_at": now,
+            "expires_at": now + self.ttl_seconds,
+        }, self.ttl_seconds)
+        return token
+
+    def get(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not token:
+            return None
+        raw = self.kv.get(self._key(token))
+        return None if raw is None else json.loads(raw)
+
+    def restore(self, session: Dict[str, Any]) -> bool:
+        remaining = int(session["expires_at"] - time.time())
+        if remaining <= 0:
+            return False
+        self._put(session, remaining)
+        return True
+
+    def revoke(self, token: str) -> bool:
+        session = self.get(token)
+        if session is None:
+            return False
+        self.kv.delete(self._key(token))
+        self.kv.srem(self._user_key(session["email"]), token)
+        return True
+
+    def revoke_user(self, email: str) -> int:
+        tokens = self.kv.smembers(self._user_key(email))
+        revoked = self.kv.delete(*[self._key(t) for t in tokens]) if tokens else 0
+        self.kv.delete(self._user_key(email))
+        return revoked
+
+    def sessions_for(self, email: str) -> int:
+        return self.kv.scard(self._user_key(email))
+
+    def purge_expired(self) -> int:
+        # Expiry itself is Redis' job; nothing is held locally
+        return 0
+
+
+class SharedState:
+    """Cross-process coordination for the selection workflow.
+
+    Mutations to selection state, post state and notifications are
+    published to one ordered event log (a Redis stream), and every worker
+    applies that log in order, so all replicas hold the same state. Event
+    ids are stream ids (``<ms>-<n>``), so a worker's cursor is the id of the
+    last event it applied. When persistent storage holds the state, the log
+    only has to cover live propagation and is trimmed by age; otherwise it
+    is the state and is kept whole. Per-post locks (SET NX with a TTL)
+    serialize the check-then-act of each decision across workers; a
+    background thread renews the TTL of every lock this process holds, and
+    release is a compare-and-delete, so a lock is never freed by anyone but
+    its owner. positions_filled is a counter that only grows while below
+    the post's capacity, so even a lost lock can't overfill a post.
+    """
+
+    def __init__(self, kv, prefix: str = SHARED_PREFIX, lock_ttl_ms: int = SHARED_LOCK_TTL_MS):
+        self.kv = kv
+        self.prefix = prefix
+        self.lock_ttl_ms = lock_ttl_ms
+        self.events_key = f"{prefix}events"
+        self._release = kv.register_script(RELEASE_LOCK)
+        self._renew = kv.register_script(RENEW_LOCK)
+        self._incr_below = kv.register_script(INCR_BELOW)
+        self._held: Dict[str, str] = {}     # lock key -> our token
+        self._lost: Set[str] = set()
+        self._held_lock = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+    # ---------------- Event log ----------------
+    def publish(self, op: str, *args) -> str:
+        """Append an event; returns its id."""
+        return self.kv.xadd(self.events_key, {"e": json.dumps([op, list(args)])})
+
+    def events_since(self, event_id: str) -> List[Tuple[str, str, list]]:
+        out = []
+        for i, fields in self.kv.xrange(self.events_key, min=f"({event_id}"):
+            op, args = json.loads(fields["e"])
+            out.append((i, op, args))
+        return out
+
+    def last_event_id(self) -> str:
+        tail = self.kv.xrevrange(self.events_key, count=1)
+        return tail[0][0] if tail else START
+
+    def resume_point(self, overlap_ms: int = SHARED_REPLAY_OVERLAP_MS) -> str:
+        """Cursor for a worker whose state came from storage: just before the last ``overlap_ms`` of events."""
+        ms, _ = _stream_id(self.last_event_id())
+        return START if ms <= overlap_ms else f"{ms - overlap_ms}-0"
+
+    def trim(self, retain_seconds: int = SHARED_EVENTS_RETAIN_SECONDS) -> int:
+        """Drop events older than ``retain_seconds``; only safe while storage holds the state."""
+        return self.kv.xtrim(self.events_key, minid=f"{int((time.time() - retain_seconds) * 1000)}-0", approximate=True)
+
+    # ---------------- Counters ----------------
+    def add_filled(self, post_id: str, delta: int) -> int:
+        return self.kv.incrby(f"{self.prefix}filled:{post_id}", delta)
+
+    def take_position(self, post_id: str, positions: int) -> Optional[int]:
+        """Count one more filled position, unless ``positions`` are already filled (then None)."""
+        filled = self._incr_below(keys=[f"{self.prefix}filled:{post_id}"], args=[positions])
+        return None if filled < 0 else filled
+
+    def init_filled(self, post_id: str, value: int):
+        """Seed the counter from local state unless another worker already did."""
+        self.kv.set(f"{self.prefix}filled:{post_id}", value, nx=True)
+
+    def filled(self, post_id: str) -> int:
+        return int(self.kv.get(f"{self.prefix}filled:{post_id}") or 0)
+
+    # ---------------- Locks ----------------
+    @contextmanager
+    def lock(self, name: str, timeout: float = 30.0):
+        key = f"{self.prefix}lock:{name}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not self.kv.set(key, token, px=self.lock_ttl_ms, nx=True):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Could not acquire shared lock {name!r}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        self._hold(key, token)
+        try:
+            yield
+        finally:
+            lost = self._drop(key)
+            # Compare-and-delete: only our own lock is released
+            released = self._release(keys=[key], args=[token])
+        if lost or not released:
+            raise LockLost(f"Shared lock {name!r} expired while held")
+
+    def _hold(self, key: str, token: str):
+        with self._held_lock:
+            self._held[key] = token
+            if self._renewer is None or not self._renewer.is_alive():
+                self._renewer = threading.Thread(target=self._renew_held, name="shared-lock-renewer", daemon=True)
+                self._renewer.start()
+
+    def _drop(self, key: str) -> bool:
+        with self._held_lock:
+            self._held.pop(key, None)
+            if key in self._lost:
+                self._lost.discard(key)
+                return True
+            return False
+
+    def _renew_held(self):
+        # Renew at a third of the TTL, so two missed rounds still leave the lock alive
+        while True:
+            time.sleep(self.lock_ttl_ms / 3000)
+            with self._held_lock:
+                held = list(self._held.items())
+                if not held:
+                    self._renewer = None
+                    return
+            for key, token in held:
+                if not self._renew(keys=[key], args=[token, self.lock_ttl_ms]):
+                    with self._held_lock:
+                        if self._held.get(key) == token:
+                            self._lost.add(key)
+
+
+def shared_from_env() -> Optional[SharedState]:
+    """SharedState for SHARED_STATE, or None when every process keeps its own state."""
+    if SHARED_STATE == "redis":
+        import redis  # only needed when sharing through a real server
+        return SharedState(redis.Redis.from_url(REDIS_URL, decode_responses=True))
+    if SHARED_STATE == "fake":
+        return SharedState(FakeRedis())
+    return None
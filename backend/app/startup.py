@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from typing import Optional, Callable, Dict, Any, List
+
+
+LAZY_LOAD = os.getenv("LAZY_LOAD", "1").lower() not in ("0", "false", "no")
+# Departments loaded in the background at startup: "*" for all, "" for none, or a comma list
+WARM_DEPARTMENTS = os.getenv("WARM_DEPARTMENTS", "*")
+
+ALL = "*"
+STARTING, WARMING, READY, FAILED = "starting", "warming", "ready", "failed"
+
+
+class StateLoader:
+    """Loads application state in units, each on first access.
+
+    A unit is a department when state can be built one department at a time
+    (generated seed data), or the single unit ``ALL`` when it arrives as one
+    snapshot (persistent storage, shared state). Loads are serialized, since
+    they all write the same global indexes, and each unit loads once; callers
+    for a unit that is loading wait for it. Once every unit is in,
+    ``complete`` is set and ``ensure`` is a single attribute check.
+
+    Warm-up loads the configured units on a background thread; readiness is
+    reported once it finishes, so a load balancer only routes traffic to a
+    warm process. Cold units requested before that still load on demand.
+    """
+
+    def __init__(self, load: Callable[[str], None], units: Optional[List[str]] = None):
+        self.load = load
+        self.units = list(units) if units is not None else [ALL]
+        self._unit_set = set(self.units)
+        self._seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.complete = not self.units
+        self.phase = STARTING
+        self.error: Optional[str] = None
+        self.import_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+    @property
+    def lazy(self) -> bool:
+        return self.units != [ALL]
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == READY
+
+    def ensure(self, department_id: Optional[str] = None):
+        """Load whatever ``department_id`` needs; with no department, only the snapshot unit."""
+        if self.complete:
+            return
+        unit = department_id if self.lazy else ALL
+        if unit is None or unit not in self._unit_set or unit in self._seconds:
+            return
+        with self._lock:
+            if unit in self._seconds:
+                return
+            start = time.perf_counter()
+            self.load(unit)
+            self._seconds[unit] = round(time.perf_counter() - start, 4)
+            self.complete = len(self._seconds) == len(self.units)
+
+    def ensure_all(self):
+        for unit in self.units:
+            self.ensure(unit)
+
+    def start_warmup(self, spec: str = WARM_DEPARTMENTS):
+        names = [s.strip() for s in spec.split(",") if s.strip()]
+        if not self.lazy:
+            units = self.units if names else []
+        else:
+            units = self.units if ALL in names else [u for u in names if u in self._unit_set]
+        if not units:
+            self.phase = READY
+            return
+        self.phase = WARMING
+        threading.Thread(target=self._warm, args=(units,), name="state-warmup", daemon=True).start()
+
+    def _warm(self, units: List[str]):
+        start = time.perf_counter()
+        try:
+            for unit in units:
+                self.ensure(unit)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.phase = FAILED
+            return
+        self.warmup_seconds = round(time.perf_counter() - start, 4)
+        self.phase = READY
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": self.phase,
+            "ready": self.ready,
+            "lazy": self.lazy,
+            "import_seconds": self.import_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "units_loaded": len(self._seconds),
+            "units_total": len(self.units),
+            "load_seconds": dict(self._seconds),
+            "error": self.error,
+        }
@@ -0,0 +1,238 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, List, Tuple
+
+from .applicants import Applicant
+
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")   # memory | sql | wal
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./pm_internship.db")
+
+
+class Storage(ABC):
+    """Interface every storage backend implements.
+
+    The API process keeps its working set in memory (registry, ranked
+    indexes, entry logs). A ``persistent`` backend is written through on
+    every mutation and read back by ``load`` at startup; requests are served
+    from the working set, never from the backend.
+    """
+
+    name = "base"
+    persistent = False
+
+    # ---------------- Lifecycle ----------------
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return previously persisted state, or None when the store is empty."""
+
+    def exclusive(self):
+        """Context manager serializing startup (load, or seed an empty store) across processes."""
+        return nullcontext()
+
+    def close(self):
+        pass
+
+    # ---------------- Writes ----------------
+    @abstractmethod
+    def save_post(self, department_id: str, post: Dict[str, Any], state: str):
+        ...
+
+    @abstractmethod
+    def set_post_state(self, post_id: str, state: str):
+        ...
+
+    @abstractmethod
+    def add_applicants(self, post_id: str, applicants: List[Dict[str, Any]], start: int = 0):
+        """Bulk insert; ``start`` is the position of the first row within the post."""
+
+    @abstractmethod
+    def set_scores(self, post_id: str, scores: List[Tuple[str, float]]):
+        ...
+
+    @abstractmethod
+    def set_status(self, post_id: str, applicant_id: str, status: str):
+        ...
+
+    @abstractmethod
+    def record_select(self, department_id: str, post_id: str, applicant_id: str, selected_at: str):
+        """Mark selected, add to the department's selection and bump positions_filled atomically."""
+
+    @abstractmethod
+    def record_reject(self, department_id: str, post_id: str, applicant_id: str):
+        """Mark rejected, move from selected to rejected and release the position if one was held."""
+
+    @abstractmethod
+    def add_meeting(self, entry: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def add_notification(self, department_id: str, entry: Dict[str, Any]):
+        ...
+
+    # Auth and tie-break state is only kept by backends that override these
+    def add_user(self, email: str, user: Dict[str, Any]):
+        pass
+
+    def add_session(self, session: Dict[str, Any]):
+        pass
+
+    def revoke_session(self, token: str):
+        pass
+
+    def revoke_user_sessions(self, email: str):
+        pass
+
+    def set_tie_tests(self, post_id: str, links: Dict[str, str]):
+        pass
+
+
+_SCORE = Applicant.__slots__.index("score")
+_STATUS = Applicant.__slots__.index("status")
+
+
+class MemoryStorage(Storage):
+    """Dict-backed store; the app's own globals already play this role at runtime.
+
+    Applicants are kept as immutable ``Applicant.to_row`` tuples, replaced on
+    update, so the store never shares records with the API's working set
+    and a consistent copy of it is just a copy of the row lists.
+    """
+
+    name = "memory"
+    persistent = False
+
+    def __init__(self):
+        self.posts: Dict[str, Dict[str, Any]] = {}
+        self.post_meta: Dict[str, Tuple[str, str]] = {}   # post_id -> (department_id, state)
+        self.by_post: Dict[str, List[tuple]] = {}
+        self._rows_index: Dict[str, Dict[str, int]] = {}   # post_id -> applicant_id -> index, built on demand
+        self.selected: Dict[str, Dict[str, Tuple[str, str]]] = {}   # dept -> applicant_id -> (post_id, selected_at)
+        self.rejected: Dict[str, Dict[str, str]] = {}   # dept -> applicant_id -> post_id
+        self.meetings: List[Dict[str, Any]] = []
+        self.notifications: Dict[str, List[Dict[str, Any]]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.tie_tests: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.RLock()
+
+    def load(self):
+        return None
+
+    def save_post(self, department_id, post, state):
+        with self._lock:
+            self.posts[post["id"]] = dict(post)
+            self.post_meta[post["id"]] = (department_id, state)
+
+    def set_post_state(self, post_id, state):
+        with self._lock:
+            dept, _ = self.post_meta[post_id]
+            self.post_meta[post_id] = (dept, state)
+
+    def add_applicants(self, post_id, applicants, start=0):
+        with self._lock:
+            rows = self.by_post.setdefault(post_id, [])
+            index = self._rows_index.get(post_id)
+            for a in applicants:
+                if index is not None:
+                    index[a["id"]] = len(rows)
+                rows.append(Applicant.coerce(a).to_row())
+
+    def _index(self, post_id: str) -> Dict[str, int]:
+        index = self._rows_index.get(post_id)
+        if index is None:
+            rows = self.by_post.get(post_id, [])
+            index = self._rows_index[post_id] = {r[0]: i for i, r in enumerate(rows)}
+        return index
+
+    def _set(self, post_id: str, applicant_id: str, slot: int, value):
+        i = self._index(post_id)[applicant_id]
+        rows = self.by_post[post_id]
+        row = rows[i]
+        rows[i] = row[:slot] + (value,) + row[slot + 1:]
+
+    def set_scores(self, post_id, scores):
+        with self._lock:
+            for applicant_id, score in scores:
+                self._set(post_id, applicant_id, _SCORE, score)
+
+    def set_status(self, post_id, applicant_id, status):
+        with self._lock:
+            self._set(post_id, applicant_id, _STATUS, status)
+
+    def record_select(self, department_id, post_id, applicant_id, selected_at):
+        with self._lock:
+            self._set(post_id, applicant_id, _STATUS, "selected")
+            self.rejected.get(department_id, {}).pop(applicant_id, None)
+            self.selected.setdefault(department_id, {})[applicant_id] = (post_id, selected_at)
+            post = self.posts[post_id]
+            post["positions_filled"] = post.get("positions_filled", 0) + 1
+
+    def record_reject(self, department_id, post_id, applicant_id):
+        with self._lock:
+            self._set(post_id, applicant_id, _STATUS, "rejected")
+            if self.selected.get(department_id, {}).pop(applicant_id, None) is not None:
+                post = self.posts[post_id]
+                post["positions_filled"] = max(0, post.get("positions_filled", 0) - 1)
+            rejected = self.rejected.setdefault(department_id, {})
+            rejected.pop(applicant_id, None)
+            rejected[applicant_id] = post_id
+
+    def add_meeting(self, entry):
+        with self._lock:
+            self.meetings.append(dict(entry))
+
+    def add_notification(self, department_id, entry):
+        with self._lock:
+            self.notifications.setdefault(department_id, []).append(dict(entry))
+
+    def add_user(self, email, user):
+        with self._lock:
+            self.users[email] = dict(user)
+
+    def add_session(self, session):
+        with self._lock:
+            self.sessions[session["token"]] = dict(session)
+
+    def revoke_session(self, token):
+        with self._lock:
+            self.sessions.pop(token, None)
+
+    def revoke_user_sessions(self, email):
+        with self._lock:
+            for token in [t for t, s in self.sessions.items() if s["email"] == email]:
+                del self.sessions[token]
+
+    def set_tie_tests(self, post_id, links):
+        with self._lock:
+            self.tie_tests[post_id] = dict(links)
+
+    def state(self) -> Dict[str, Any]:
+        """Everything stored, in the shape ``load`` returns; rows are fresh copies."""
+        with self._lock:
+            meetings: Dict[str, List[Dict[str, Any]]] = {}
+            for m in self.meetings:
+                meetings.setdefault(m["post_id"], []).append(dict(m))
+            return {
+                "posts": [(dept, st, dict(self.posts[pid])) for pid, (dept, st) in self.post_meta.items()],
+                "applicants": {pid: [Applicant.from_row(r) for r in rows] for pid, rows in self.by_post.items()},
+                "selected": {d: [(pid, aid, at) for aid, (pid, at) in sel.items()] for d, sel in self.selected.items()},
+                "rejected": {d: [(pid, aid) for aid, pid in rej.items()] for d, rej in self.rejected.items()},
+                "meetings": meetings,
+                "notifications": {d: [dict(n) for n in ns] for d, ns in self.notifications.items()},
+                "users": {e: dict(u) for e, u in self.users.items()},
+                "sessions": [dict(s) for s in self.sessions.values()],
+                "tie_tests": {pid: dict(links) for pid, links in self.tie_tests.items()},
+            }
+
+
+def storage_from_env() -> Storage:
+    if STORAGE_BACKEND == "wal":
+        from .storage_wal import WALStorage
+        return WALStorage()
+    if STORAGE_BACKEND == "sql":
+        from .storage_sql import SQLStorage  # SQLAlchemy is only needed for this backend
+        return SQLStorage(DATABASE_URL)
+    return MemoryStorage()
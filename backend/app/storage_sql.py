@@ -0,0 +1,256 @@
+import os
+from contextlib import contextmanager
+from typing import Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: SQLite seeding isn't serialized across processes
+    fcntl = None
+
+from sqlalchemy import (
+    Boolean, Column, Float, Index, Integer, JSON, MetaData, String, Table, Text, UniqueConstraint,
+    bindparam, case, create_engine, delete, func, insert, select, update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .storage import Storage
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+metadata = MetaData()
+
+posts = Table(
+    "posts", metadata,
+    Column("id", String, primary_key=True),
+    Column("department_id", String, nullable=False),
+    Column("state", String, nullable=False),
+    Column("positions", Integer, nullable=False),
+    Column("positions_filled", Integer, nullable=False, default=0),
+    Column("data", JSON, nullable=False),
+    Index("ix_posts_department", "department_id"),
+)
+
+applicants = Table(
+    "applicants", metadata,
+    Column("id", String, primary_key=True),
+    Column("post_id", String, nullable=False),
+    Column("position", Integer, nullable=False),
+    Column("name", String, nullable=False),
+    Column("email", String, nullable=False),
+    Column("skills", JSON, nullable=False),
+    Column("qualifications", String),
+    Column("location", String),
+    Column("sector_interests", JSON, nullable=False),
+    Column("rural", Boolean, nullable=False),
+    Column("social_category", String),
+    Column("past_participation", Integer, nullable=False, default=0),
+    Column("score", Float),
+    Column("status", String, nullable=False),
+    Index("ix_applicants_post_status_score", "post_id", "status", "score"),
+)
+
+selected = Table(
+    "selected", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("department_id", String, nullable=False),
+    Column("post_id", String, nullable=False),
+    Column("applicant_id", String, nullable=False),
+    Column("selected_at", String, nullable=False),
+    UniqueConstraint("department_id", "applicant_id", name="uq_selected_department_applicant"),
+    Index("ix_selected_department", "department_id"),
+)
+
+rejected = Table(
+    "rejected", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("department_id", String, nullable=False),
+    Column("post_id", String, nullable=False),
+    Column("applicant_id", String, nullable=False),
+    UniqueConstraint("department_id", "applicant_id", name="uq_rejected_department_applicant"),
+    Index("ix_rejected_department", "department_id"),
+)
+
+meetings = Table(
+    "meetings", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("meeting_id", String, nullable=False, unique=True),
+    Column("post_id", String, nullable=False),
+    Column("applicant_id", String, nullable=False),
+    Column("datetime", String),
+    Column("note", Text),
+    Column("join_url", String),
+    Index("ix_meetings_post", "post_id"),
+)
+
+notifications = Table(
+    "notifications", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("id", String, nullable=False),
+    Column("department_id", String, nullable=False),
+    Column("message", Text, nullable=False),
+    Index("ix_notifications_department", "department_id"),
+)
+
+APPLICANT_COLUMNS = [c.name for c in applicants.columns if c.name not in ("post_id", "position")]
+POST_COLUMNS = ("id", "positions", "positions_filled")
+# Dialects with INSERT ... ON CONFLICT, for saving a post in one statement
+_UPSERT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+# pg_advisory_lock key taken while creating the schema and seeding
+_ADVISORY_LOCK_KEY = 0x706D5F73656564   # "pm_seed"
+
+# Statements are built once with bind parameters and reused for every call,
+# so SQLAlchemy's compiled-statement cache serves the hot paths.
+_Q_POST = select(posts).where(posts.c.id == bindparam("post_id"))
+_U_STATUS = update(applicants).where(applicants.c.id == bindparam("b_id")).values(status=bindparam("b_status"))
+_U_SCORE = update(applicants).where(applicants.c.id == bindparam("b_id")).values(score=bindparam("b_score"))
+_U_FILLED_INC = update(posts).where(posts.c.id == bindparam("b_post")).values(positions_filled=posts.c.positions_filled + 1)
+_U_FILLED_DEC = update(posts).where(posts.c.id == bindparam("b_post")).values(
+    positions_filled=case((posts.c.positions_filled > 0, posts.c.positions_filled - 1), else_=0))
+_D_SELECTED = delete(selected).where(selected.c.department_id == bindparam("b_dept"), selected.c.applicant_id == bindparam("b_id"))
+_D_REJECTED = delete(rejected).where(rejected.c.department_id == bindparam("b_dept"), rejected.c.applicant_id == bindparam("b_id"))
+
+
+def _applicant_row(row) -> Dict[str, Any]:
+    m = row._mapping
+    return {k: m[k] for k in APPLICANT_COLUMNS}
+
+
+def _post_row(row) -> Dict[str, Any]:
+    m = row._mapping
+    return {**m["data"], "positions": m["positions"], "positions_filled": m["positions_filled"]}
+
+
+class SQLStorage(Storage):
+    """SQLAlchemy Core backend: SQLite locally, Postgres in docker-compose.
+
+    Uses a pooled engine, composite indexes for the per-post ranking and
+    per-department queries, executemany bulk inserts for applicant
+    ingestion, and statements prebuilt with bind parameters. Workers
+    starting together on an empty database take turns through
+    ``exclusive``, so one seeds and the rest load what it wrote.
+    """
+
+    name = "sql"
+    persistent = True
+
+    def __init__(self, url: str, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+        kwargs: Dict[str, Any] = {"pool_pre_ping": True, "future": True}
+        if url.startswith("sqlite"):
+            kwargs["connect_args"] = {"check_same_thread": False}
+        else:
+            kwargs.update(pool_size=pool_size, max_overflow=max_overflow)
+        self.engine = create_engine(url, **kwargs)
+        self._insert = _UPSERT_INSERT.get(self.engine.dialect.name)
+        database = self.engine.url.database
+        self._lock_path = database + ".lock" if self.engine.dialect.name == "sqlite" and database not in (None, "", ":memory:") else None
+        with self.exclusive():
+            metadata.create_all(self.engine)
+
+    def close(self):
+        self.engine.dispose()
+
+    # ---------------- Lifecycle ----------------
+    @contextmanager
+    def exclusive(self):
+        """Hold a database-wide lock across processes: an advisory lock on Postgres, a lock file next to SQLite."""
+        if self.engine.dialect.name == "postgresql":
+            with self.engine.connect() as conn:
+                conn.execute(select(func.pg_advisory_lock(_ADVISORY_LOCK_KEY)))
+                try:
+                    yield
+                finally:
+                    conn.execute(select(func.pg_advisory_unlock(_ADVISORY_LOCK_KEY)))
+        elif self._lock_path is not None and fcntl is not None:
+            with open(self._lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        else:
+            yield
+
+    def load(self):
+        with self.engine.connect() as conn:
+            if conn.execute(select(func.count()).select_from(posts)).scalar_one() == 0:
+                return None
+            state: Dict[str, Any] = {"posts": [], "applicants": {}, "selected": {}, "rejected": {}, "meetings": {}, "notifications": {}}
+            for row in conn.execute(select(posts)):
+                state["posts"].append((row.department_id, row.state, _post_row(row)))
+            for row in conn.execute(select(applicants).order_by(applicants.c.post_id, applicants.c.position)):
+                state["applicants"].setdefault(row.post_id, []).append(_applicant_row(row))
+            for row in conn.execute(select(selected).order_by(selected.c.seq)):
+                state["selected"].setdefault(row.department_id, []).append((row.post_id, row.applicant_id, row.selected_at))
+            for row in conn.execute(select(rejected).order_by(rejected.c.seq)):
+                state["rejected"].setdefault(row.department_id, []).append((row.post_id, row.applicant_id))
+            for row in conn.execute(select(meetings).order_by(meetings.c.seq)):
+                m = row._mapping
+                state["meetings"].setdefault(row.post_id, []).append({k: m[k] for k in m.keys() if k != "seq"})
+            for row in conn.execute(select(notifications).order_by(notifications.c.seq)):
+                state["notifications"].setdefault(row.department_id, []).append({"id": row.id, "message": row.message})
+            return state
+
+    # ---------------- Writes ----------------
+    def save_post(self, department_id, post, state):
+        data = {k: v for k, v in post.items() if k not in POST_COLUMNS}
+        data["id"] = post["id"]
+        # positions_filled is only moved by record_select / record_reject, so an
+        # existing row keeps its count even if another worker filled a position
+        values = {"department_id": department_id, "state": state, "positions": post["positions"], "data": data}
+        filled = post.get("positions_filled", 0)
+        with self.engine.begin() as conn:
+            if self._insert is not None:
+                conn.execute(self._insert(posts).values(id=post["id"], positions_filled=filled, **values)
+                             .on_conflict_do_update(index_elements=[posts.c.id], set_=values))
+            elif conn.execute(_Q_POST, {"post_id": post["id"]}).first() is None:
+                conn.execute(insert(posts).values(id=post["id"], positions_filled=filled, **values))
+            else:
+                conn.execute(update(posts).where(posts.c.id == post["id"]).values(**values))
+
+    def set_post_state(self, post_id, state):
+        with self.engine.begin() as conn:
+            conn.execute(update(posts).where(posts.c.id == post_id).values(state=state))
+
+    def add_applicants(self, post_id, rows, start=0):
+        if not rows:
+            return
+        payload = [{**{k: a.get(k) for k in APPLICANT_COLUMNS}, "post_id": post_id, "position": start + i}
+                   for i, a in enumerate(rows)]
+        with self.engine.begin() as conn:
+            conn.execute(insert(applicants), payload)
+
+    def set_scores(self, post_id, scores):
+        if not scores:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(_U_SCORE, [{"b_id": i, "b_score": s} for i, s in scores])
+
+    def set_status(self, post_id, applicant_id, status):
+        with self.engine.begin() as conn:
+            conn.execute(_U_STATUS, {"b_id": applicant_id, "b_status": status})
+
+    def record_select(self, department_id, post_id, applicant_id, selected_at):
+        with self.engine.begin() as conn:
+            conn.execute(_U_STATUS, {"b_id": applicant_id, "b_status": "selected"})
+            conn.execute(_D_REJECTED, {"b_dept": department_id, "b_id": applicant_id})
+            conn.execute(insert(selected).values(department_id=department_id, post_id=post_id,
+                                                 applicant_id=applicant_id, selected_at=selected_at))
+            conn.execute(_U_FILLED_INC, {"b_post": post_id})
+
+    def record_reject(self, department_id, post_id, applicant_id):
+        with self.engine.begin() as conn:
+            conn.execute(_U_STATUS, {"b_id": applicant_id, "b_status": "rejected"})
+            if conn.execute(_D_SELECTED, {"b_dept": department_id, "b_id": applicant_id}).rowcount:
+                conn.execute(_U_FILLED_DEC, {"b_post": post_id})
+            conn.execute(_D_REJECTED, {"b_dept": department_id, "b_id": applicant_id})
+            conn.execute(insert(rejected).values(department_id=department_id, post_id=post_id, applicant_id=applicant_id))
+
+    def add_meeting(self, entry):
+        with self.engine.begin() as conn:
+            conn.execute(insert(meetings).values(**{c.name: entry.get(c.name) for c in meetings.columns if c.name != "seq"}))
+
+    def add_notification(self, department_id, entry):
+        with self.engine.begin() as conn:
+            conn.execute(insert(notifications).values(id=entry["id"], department_id=department_id, message=entry["message"]))
@@ -0,0 +1,293 @@
+import gc
+import glob
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Optional, Dict, Any, List, Tuple
+
+from .applicants import Applicant, SKILL_VOCAB, SECTOR_VOCAB
+from .storage import MemoryStorage
+
+
+WAL_DIR = os.getenv("WAL_DIR", "./data")
+WAL_FSYNC = os.getenv("WAL_FSYNC", "0") == "1"
+WAL_SNAPSHOT_EVERY = int(os.getenv("WAL_SNAPSHOT_EVERY", "50000"))
+
+_RECORD = struct.Struct("<II")           # payload length, crc32
+_SNAP_MAGIC = b"PMSNAP1\n"
+_SNAP_HEADER = struct.Struct("<QQI")     # lsn, payload length, crc32
+
+
+def _log_path(directory: str, lsn: int) -> str:
+    return os.path.join(directory, f"wal-{lsn:020d}.log")
+
+
+def _snapshot_path(directory: str, lsn: int) -> str:
+    return os.path.join(directory, f"snapshot-{lsn:020d}.bin")
+
+
+def _lsn_of(path: str) -> int:
+    return int(os.path.basename(path).split("-", 1)[1].split(".", 1)[0])
+
+
+def _fsync_dir(directory: str):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_log(path: str):
+    """Yield decoded records until the end of the file or the first torn/corrupt one."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    while pos + _RECORD.size <= len(data):
+        length, crc = _RECORD.unpack_from(data, pos)
+        start = pos + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        yield pickle.loads(payload)
+        pos = start + length
+
+
+class WALStorage(MemoryStorage):
+    """Local durable mode: an append-only write-ahead log plus binary snapshots.
+
+    Every write is framed as (length, crc32, pickled op) and appended to the
+    current log before it is applied to the in-process mirror that
+    MemoryStorage keeps. Every ``snapshot_every`` records the mirror is
+    captured under the lock, the log is rotated, and the capture is pickled
+    to ``snapshot-<lsn>.bin`` on a background thread; older logs and
+    snapshots are then deleted. Recovery memory-maps the newest snapshot and
+    replays only the logs written after it, stopping at a torn tail.
+
+    Records are flushed to the OS on every append, which survives a process
+    crash; set WAL_FSYNC=1 to also fsync each one against power loss.
+    """
+
+    name = "wal"
+    persistent = True
+
+    def __init__(self, directory: str = WAL_DIR, fsync: bool = WAL_FSYNC, snapshot_every: int = WAL_SNAPSHOT_EVERY):
+        super().__init__()
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        self._lsn = 0                 # sequence number of the next record
+        self._since_snapshot = 0
+        self._log = None
+        self._snapshotting: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    # ---------------- Lifecycle ----------------
+    def load(self):
+        # Recovery allocates millions of long-lived objects; cyclic GC passes would only slow it down
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._recover()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _recover(self):
+        snapshots = sorted(glob.glob(os.path.join(self.directory, "snapshot-*.bin")), key=_lsn_of)
+        restored = False
+        while snapshots:
+            path = snapshots.pop()
+            if self._read_snapshot(path):
+                restored = True
+                break
+        for path in sorted(glob.glob(os.path.join(self.directory, "wal-*.log")), key=_lsn_of):
+            lsn = _lsn_of(path)
+            if lsn > self._lsn:
+                raise RuntimeError(f"{path} starts at record {lsn} but state is only recovered up to {self._lsn}")
+            for op, args in read_log(path):
+                if lsn >= self._lsn:
+                    getattr(MemoryStorage, op)(self, *args)
+                    self._lsn = lsn + 1
+                    self._since_snapshot += 1
+                    restored = True
+                lsn += 1
+        self._open_log()
+        return self.state() if restored else None
+
+    def close(self):
+        if self._log is None:
+            return
+        self.snapshot(background=False)
+        with self._lock:
+            self._log.close()
+            self._log = None
+
+    # ---------------- Log ----------------
+    def _open_log(self):
+        self._log = open(_log_path(self.directory, self._lsn), "ab", buffering=0)
+        _fsync_dir(self.directory)
+
+    def _append(self, op: str, *args):
+        payload = pickle.dumps((op, args), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._log is None:
+                self._open_log()
+            self._log.write(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            getattr(MemoryStorage, op)(self, *args)
+            self._lsn += 1
+            self._since_snapshot += 1
+            due = self._since_snapshot >= self.snapshot_every
+        if due:
+            self.snapshot()
+
+    # ---------------- Snapshots ----------------
+    def _capture(self) -> Tuple[int, Dict[str, Any]]:
+        # Plain tuples and copied dicts, so pickling can run without the lock
+        meta = self.post_meta
+        return self._lsn, {
+            "skill_vocab": list(SKILL_VOCAB.values),
+            "sector_vocab": list(SECTOR_VOCAB.values),
+            "posts": [(meta[pid][0], meta[pid][1], dict(p)) for pid, p in self.posts.items()],
+            "applicants": {pid: list(rows) for pid, rows in self.by_post.items()},
+            "selected": {d: list(sel.items()) for d, sel in self.selected.items()},
+            "rejected": {d: list(rej.items()) for d, rej in self.rejected.items()},
+            "meetings": [dict(m) for m in self.meetings],
+            "notifications": {d: [dict(n) for n in ns] for d, ns in self.notifications.items()},
+            "users": {e: dict(u) for e, u in self.users.items()},
+            "sessions": [dict(s) for s in self.sessions.values()],
+            "tie_tests": {pid: dict(links) for pid, links in self.tie_tests.items()},
+        }
+
+    def snapshot(self, background: bool = True):
+        with self._lock:
+            if self._snapshotting is not None and self._snapshotting.is_alive():
+                if background:
+                    return
+                self._snapshotting.join()
+            lsn, data = self._capture()
+            self._since_snapshot = 0
+            self._log.close()
+            self._open_log()
+        if background:
+            self._snapshotting = threading.Thread(target=self._write_snapshot, args=(lsn, data), daemon=True)
+            self._snapshotting.start()
+        else:
+            self._write_snapshot(lsn, data)
+
+    def _write_snapshot(self, lsn: int, data: Dict[str, Any]):
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        path = _snapshot_path(self.directory, lsn)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_SNAP_MAGIC + _SNAP_HEADER.pack(lsn, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(self.directory)
+        for old in glob.glob(os.path.join(self.directory, "snapshot-*.bin")):
+            if _lsn_of(old) < lsn:
+                os.remove(old)
+        for old in glob.glob(os.path.join(self.directory, "wal-*.log")):
+            if _lsn_of(old) < lsn:
+                os.remove(old)
+
+    def _read_snapshot(self, path: str) -> bool:
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:   # empty file
+                return False
+        with mm:
+            head = len(_SNAP_MAGIC) + _SNAP_HEADER.size
+            if len(mm) < head or mm[:len(_SNAP_MAGIC)] != _SNAP_MAGIC:
+                return False
+            lsn, length, crc = _SNAP_HEADER.unpack_from(mm, len(_SNAP_MAGIC))
+            view = memoryview(mm)[head:head + length]
+            try:
+                if len(view) < length or zlib.crc32(view) != crc:
+                    return False
+                data = pickle.loads(view)
+            finally:
+                view.release()
+        self._restore(data)
+        self._lsn = lsn
+        return True
+
+    def _restore(self, data: Dict[str, Any]):
+        skill_map = SKILL_VOCAB.remap(data["skill_vocab"])
+        sector_map = SECTOR_VOCAB.remap(data["sector_vocab"])
+        for dept, st, post in data["posts"]:
+            self.posts[post["id"]] = post
+            self.post_meta[post["id"]] = (dept, st)
+        for pid, rows in data["applicants"].items():
+            if skill_map is not None or sector_map is not None:
+                rows = [self._translate(r, skill_map, sector_map) for r in rows]
+            self.by_post[pid] = rows
+        self.selected = {d: dict(items) for d, items in data["selected"].items()}
+        self.rejected = {d: dict(items) for d, items in data["rejected"].items()}
+        self.meetings = data["meetings"]
+        self.notifications = data["notifications"]
+        self.users = data["users"]
+        self.sessions = {s["token"]: s for s in data["sessions"]}
+        self.tie_tests = data["tie_tests"]
+
+    @staticmethod
+    def _translate(row: tuple, skill_map: Optional[List[int]], sector_map: Optional[List[int]]) -> tuple:
+        a = Applicant.from_row(row)
+        if skill_map is not None:
+            a.skill_bits, a.skill_codes = SKILL_VOCAB.translate(a.skill_bits, a.skill_codes, skill_map)
+        if sector_map is not None:
+            a.sector_bits, a.sector_codes = SECTOR_VOCAB.translate(a.sector_bits, a.sector_codes, sector_map)
+        return a.to_row()
+
+    # ---------------- Writes ----------------
+    def save_post(self, department_id, post, state):
+        self._append("save_post", department_id, dict(post), state)
+
+    def set_post_state(self, post_id, state):
+        self._append("set_post_state", post_id, state)
+
+    def add_applicants(self, post_id, applicants, start=0):
+        # Rows are logged as plain dicts: bitsets are only meaningful to this process
+        self._append("add_applicants", post_id, [dict(a) for a in applicants], start)
+
+    def set_scores(self, post_id, scores):
+        if scores:
+            self._append("set_scores", post_id, list(scores))
+
+    def set_status(self, post_id, applicant_id, status):
+        self._append("set_status", post_id, applicant_id, status)
+
+    def record_select(self, department_id, post_id, applicant_id, selected_at):
+        self._append("record_select", department_id, post_id, applicant_id, selected_at)
+
+    def record_reject(self, department_id, post_id, applicant_id):
+        self._append("record_reject", department_id, post_id, applicant_id)
+
+    def add_meeting(self, entry):
+        self._append("add_meeting", dict(entry))
+
+    def add_notification(self, department_id, entry):
+        self._append("add_notification", department_id, dict(entry))
+
+    def add_user(self, email, user):
+        self._append("add_user", email, dict(user))
+
+    def add_session(self, session):
+        self._append("add_session", dict(session))
+
+    def revoke_session(self, token):
+        self._append("revoke_session", token)
+
+    def revoke_user_sessions(self, email):
+        self._append("revoke_user_sessions", email)
+
+    def set_tie_tests(self, post_id, links):
+        self._append("set_tie_tests", post_id, dict(links))
@@ -0,0 +1,137 @@
+import os
+import zlib
+from functools import reduce
+from operator import or_
+from typing import Dict, Any, List, Sequence
+
+import numpy as np
+
+from .applicants import Applicant, SKILL_VOCAB, SECTOR_VOCAB
+
+
+DATA_SEED = int(os.getenv("DATA_SEED", "1"))
+SEED_APPLICANTS_PER_POST = int(os.getenv("SEED_APPLICANTS_PER_POST", "24"))
+SEED_SYNTHETIC_POSTS = int(os.getenv("SEED_SYNTHETIC_POSTS", "0"))
+
+SECTORS = {
+    "it_software": "IT & Software",
+    "banking_finance": "Banking & Finance",
+    "fmcg": "FMCG",
+    "oil_gas": "Oil & Gas",
+    "manufacturing": "Manufacturing",
+    "healthcare": "Healthcare",
+    "retail": "Retail",
+    "hospitality": "Hospitality",
+}
+
+QUALIFICATIONS = ["B.Tech", "BE", "BSc", "M.Tech", "MBA", "BBA", "BCom", "BA", "MSc"]
+CITIES = ["Bengaluru","Hyderabad","Mumbai","Delhi","Ahmedabad","Pune","Chennai","Kolkata","Goa","Jaipur","Lucknow"]
+SOCIAL_CATEGORIES = ["General","OBC","SC","ST","EWS"]
+FIRST_NAMES = [
+    "Aarav", "Isha", "Karan", "Priya", "Ravi", "Sneha", "Arjun", "Meera",
+    "Vikram", "Ananya", "Rahul", "Neha", "Siddharth", "Pooja", "Manish", "Kavya",
+    "Nikhil", "Sanya", "Amit", "Divya"
+]
+
+LAST_NAMES = [
+    "Sharma", "Patel", "Reddy", "Gupta", "Nair", "Khan", "Mehta", "Iyer",
+    "Das", "Chopra", "Jain", "Mishra", "Agarwal", "Joshi", "Rao", "Singh"
+]
+
+COMMON_SKILLS = [
+    "python","excel","communication","sql","css","javascript",
+    "statistics","research","presentation","safety","operations"
+]
+
+SECTOR_SKILLS = {
+    "it_software": ["react", "javascript", "css", "python", "fastapi", "sql", "docker"],
+    "banking_finance": ["excel", "finance", "statistics", "accounting", "risk"],
+    "fmcg": ["marketing", "communication", "research", "sales"],
+    "oil_gas": ["petroleum", "safety", "reporting", "geology"],
+    "manufacturing": ["lean", "excel", "maintenance", "quality"],
+    "healthcare": ["biology", "research", "documentation", "pharmacology"],
+    "retail": ["python", "excel", "visualization", "merchandising"],
+    "hospitality": ["operations", "communication", "customer service", "front office"],
+}
+
+
+def _rng(seed: int, key: str) -> np.random.Generator:
+    # Keyed by post id too, so a post's applicants don't depend on which posts were generated before it
+    return np.random.default_rng([seed, zlib.crc32(key.encode("utf-8"))])
+
+
+def _pick_distinct(rng: np.random.Generator, rows: int, n: int, k: int) -> np.ndarray:
+    """``rows`` x ``k`` matrix of distinct indices into range(n)."""
+    return np.argsort(rng.random((rows, n)), axis=1)[:, :k]
+
+
+def _or_bits(picks: np.ndarray, bits: Sequence[int]) -> List[int]:
+    if max(bits).bit_length() < 63:
+        return np.bitwise_or.reduce(np.asarray(bits, dtype=np.int64)[picks], axis=1).tolist()
+    # Vocabulary has outgrown a machine word; fall back to Python ints
+    return [reduce(or_, (bits[j] for j in row), 0) for row in picks.tolist()]
+
+
+def generate_applicants(post_id: str, sector: str, required_skills: List[str], count: int = SEED_APPLICANTS_PER_POST,
+                        seed: int = DATA_SEED) -> List[Applicant]:
+    """``count`` applicants for one post, identical for the same (seed, post_id) on every run and process.
+
+    Each applicant has four distinct skills from the post's required skills
+    plus the common pool, the post's sector plus two more sector interests,
+    and uniformly drawn name, qualification, city, rural flag and category;
+    a quarter have past participation. Draws are made column-wise with
+    NumPy and records are built straight from slot tuples.
+    """
+    if count <= 0:
+        return []
+    rng = _rng(seed, post_id)
+    pool = sorted(set(required_skills) | set(COMMON_SKILLS))
+    skill_bits = _or_bits(_pick_distinct(rng, count, len(pool), min(4, len(pool))), [1 << SKILL_VOCAB.bit(s) for s in pool])
+    sectors = list(SECTORS.values())
+    own = 1 << SECTOR_VOCAB.bit(sector)
+    sector_bits = [own | b for b in _or_bits(_pick_distinct(rng, count, len(sectors), 2), [1 << SECTOR_VOCAB.bit(s) for s in sectors])]
+
+    first = rng.integers(len(FIRST_NAMES), size=count).tolist()
+    last = rng.integers(len(LAST_NAMES), size=count).tolist()
+    qual = rng.integers(len(QUALIFICATIONS), size=count).tolist()
+    city = rng.integers(len(CITIES), size=count).tolist()
+    social = rng.integers(len(SOCIAL_CATEGORIES), size=count).tolist()
+    rural = (rng.random(count) < 0.5).tolist()
+    past = (rng.random(count) < 0.25).astype(np.int64).tolist()
+
+    lower_first = [n.lower() for n in FIRST_NAMES]
+    lower_last = [n.lower() for n in LAST_NAMES]
+    return [
+        Applicant.from_row((
+            f"{post_id}-{i + 1}",
+            f"{FIRST_NAMES[f]} {LAST_NAMES[l]}",
+            f"{lower_first[f]}.{lower_last[l]}{i + 1}@example.com",
+            skill_bits[i], QUALIFICATIONS[qual[i]], CITIES[city[i]], sector_bits[i],
+            rural[i], SOCIAL_CATEGORIES[social[i]], past[i], None, "applied",
+        ))
+        for i, (f, l) in enumerate(zip(first, last))
+    ]
+
+
+def generate_posts(count: int, seed: int = DATA_SEED, prefix: str = "g") -> Dict[str, List[Dict[str, Any]]]:
+    """``count`` posts spread round-robin over the eight sectors, as {department_id: [post]}."""
+    rng = _rng(seed, f"posts:{prefix}")
+    depts = list(SECTORS)
+    out: Dict[str, List[Dict[str, Any]]] = {d: [] for d in depts}
+    for i in range(count):
+        dept = depts[i % len(depts)]
+        skills = SECTOR_SKILLS[dept]
+        required = [skills[j] for j in sorted(rng.choice(len(skills), size=3, replace=False).tolist())]
+        out[dept].append({
+            "id": f"{prefix}{i + 1}",
+            "title": f"{SECTORS[dept]} Intern {i + 1}",
+            "description": f"Work with the {SECTORS[dept]} team using {', '.join(required)}.",
+            "stipend": f"{int(rng.integers(5, 25))}k",
+            "positions": int(rng.integers(1, 11)),
+            "positions_filled": 0,
+            "applied": 0,
+            "skills_required": required,
+            "location_preference": CITIES[int(rng.integers(len(CITIES)))],
+            "sector": SECTORS[dept],
+        })
+    return out
@@ -0,0 +1,44 @@
+import threading
+import uuid
+import zlib
+from typing import Optional, Dict, Hashable, Sequence
+
+
+class Versions:
+    """Monotonic change counters per collection, the source of response ETags.
+
+    Keys are small tuples such as ``("selected", department_id)``; every
+    write to a collection bumps its counter. An ETag combines the counters a
+    response is built from with a checksum of the request's path and query
+    (so pages, filters and projections get their own tags) and a per-process
+    epoch, so a restarted or different worker never reuses a tag for other
+    data. Checking one costs a few dict lookups and no data access.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._counts: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *keys: Hashable):
+        with self._lock:
+            for k in keys:
+                self._counts[k] = self._counts.get(k, 0) + 1
+
+    def get(self, key: Hashable) -> int:
+        return self._counts.get(key, 0)
+
+    def etag(self, keys: Sequence[Hashable], variant: str = "") -> str:
+        counts = ".".join(str(self._counts.get(k, 0)) for k in keys)
+        return f'"{self.epoch}-{counts}-{zlib.crc32(variant.encode("utf-8")):08x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header covers ``etag`` (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,69 @@
+"""Bytes per applicant: plain dict records vs slotted Applicant records.
+
+Run from backend/:  python -m benchmarks.applicant_memory [count]
+"""
+import gc
+import json
+import random
+import sys
+import tracemalloc
+
+from app.main import seed_applicants_for_post
+from app.synthetic import QUALIFICATIONS, CITIES, SOCIAL_CATEGORIES, FIRST_NAMES, LAST_NAMES, SECTORS
+
+
+def legacy_seed(post_id, sector, required_skills, count):
+    # The dict layout seed_applicants_for_post produced before Applicant existed
+    applicants = []
+    for i in range(count):
+        first = random.choice(FIRST_NAMES)
+        last = random.choice(LAST_NAMES)
+        skills_pool = list(set(required_skills + [
+            "python","excel","communication","sql","css","javascript",
+            "statistics","research","presentation","safety","operations"
+        ]))
+        applicants.append({
+            "id": f"{post_id}-{i+1}",
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}{i+1}@example.com",
+            "skills": random.sample(skills_pool, k=min(4, len(skills_pool))),
+            "qualifications": random.choice(QUALIFICATIONS),
+            "location": random.choice(CITIES),
+            "sector_interests": list({sector} | set(random.sample(list(SECTORS.values()), k=2))),
+            "rural": random.choice([True, False]),
+            "social_category": random.choice(SOCIAL_CATEGORIES),
+            "past_participation": random.choice([0,0,0,1]),
+            "score": None,
+            "status": "applied"
+        })
+    return applicants
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    data = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    gc.collect()
+    return current / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    args = ("bench", SECTORS["it_software"], ["react", "javascript", "css"])
+    random.seed(0)
+    before = measure(lambda n: legacy_seed(*args, n), count)
+    random.seed(0)
+    after = measure(lambda n: seed_applicants_for_post(*args, n), count)
+    print(json.dumps({
+        "applicants": count,
+        "dict_bytes_per_applicant": round(before, 1),
+        "compact_bytes_per_applicant": round(after, 1),
+        "reduction": round(1 - after / before, 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
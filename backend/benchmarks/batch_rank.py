@@ -0,0 +1,60 @@
+"""Department-wide re-rank: post-by-post in one thread vs the shared-memory process pool.
+
+Run from backend/:  python -m benchmarks.batch_rank [applicants] [posts] [workers]
+"""
+import json
+import sys
+import time
+
+from app.applicants import Applicant
+from app.batch_rank import BatchRanker, DONE
+from app.main import seed_applicants_for_post, SECTORS
+from app.scoring import ScoringEngine
+
+
+def pools(count, n_posts):
+    out = []
+    for n in range(n_posts):
+        post = {"id": f"p{n}", "title": f"Post {n}", "skills_required": ["python", "sql", "excel"],
+                "location_preference": "Pune", "sector": SECTORS["it_software"]}
+        out.append((post, [Applicant.coerce(a) for a in seed_applicants_for_post(post["id"], post["sector"], post["skills_required"], count // n_posts)]))
+    return out
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_posts = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    work = pools(count, n_posts)
+
+    engine = ScoringEngine(max_cached_posts=n_posts)
+    for post, applicants in work:
+        engine.columns(post["id"], applicants)  # as in the server, columns already exist
+    start = time.perf_counter()
+    for post, applicants in work:
+        engine.ranked(post, applicants)
+    sequential_s = time.perf_counter() - start
+
+    engine = ScoringEngine(max_cached_posts=n_posts)
+    for post, applicants in work:
+        engine.columns(post["id"], applicants)
+    ranker = BatchRanker(workers=workers)
+    ranker._executor().submit(int).result()  # start the workers outside the timing
+    start = time.perf_counter()
+    job = ranker.submit("bench", engine, work)
+    while ranker.status(job.id)["status"] not in (DONE, "failed"):
+        time.sleep(0.01)
+    pool_s = time.perf_counter() - start
+    ranker.shutdown()
+    print(json.dumps({
+        "applicants": sum(len(a) for _, a in work),
+        "posts": n_posts,
+        "workers": workers,
+        "sequential_s": round(sequential_s, 2),
+        "pool_s": round(pool_s, 2),
+        "job": {k: v for k, v in ranker.status(job.id).items() if k in ("status", "rows_done", "stale_posts", "error")},
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Hammer select / reject / auto_select from many threads and check the invariants.
+
+Run from backend/:  python -m benchmarks.concurrency_stress [threads] [ops_per_thread]
+
+Threads send one request per round and wait for each other at a barrier.
+Between rounds every target post gets POSITIONS_STEP more open positions
+and posts that filled up are restored to Active, so requests race on a
+live post's capacity instead of finding it archived.
+
+Exits non-zero if any post ends up past its capacity or the selection
+bookkeeping (ranked index and analytics included) disagrees with itself;
+the checks are tests/invariants.py, which the test suite runs as well.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("SEED_APPLICANTS_PER_POST", "200")   # enough undecided applicants for every round
+from app import main
+from tests.invariants import selection_problems
+
+
+POSITIONS_STEP = 10
+
+
+def login(client, email, password):
+    r = client.post("/auth/login", json={"email": email, "password": password})
+    return {"token": r.json()["access_token"]}
+
+
+def worker(client, headers, posts, ops, seed, counts, barrier):
+    rnd = random.Random(seed)
+    for _ in range(ops):
+        barrier.wait()
+        post_id = rnd.choice(posts)
+        ids = [a.id for a in main.APPLICANTS[post_id]]
+        kind = rnd.choice(("select", "select", "reject", "auto_select", "select:batch", "reject:batch"))
+        if kind == "select":
+            r = client.post(f"/posts/{post_id}/select", json={"applicant_id": rnd.choice(ids)}, headers=headers)
+        elif kind == "reject":
+            r = client.post(f"/posts/{post_id}/reject", json={"applicant_id": rnd.choice(ids)}, headers=headers)
+        elif kind == "auto_select":
+            r = client.post(f"/posts/{post_id}/auto_select", headers=headers)
+        elif kind == "select:batch":
+            r = client.post(f"/posts/{post_id}/select:batch", json={"applicant_ids": rnd.sample(ids, 2)}, headers=headers)
+        else:
+            r = client.post(f"/posts/{post_id}/reject:batch?preview=0", json={"applicant_ids": rnd.sample(ids, 3)}, headers=headers)
+        counts[(kind, r.status_code)] += 1
+
+
+def reopen(client, sessions):
+    """Give every target post POSITIONS_STEP more positions and bring filled ones back to Active."""
+    for headers, posts in sessions:
+        for post_id in posts:
+            post = main.REGISTRY.post(post_id)
+            post["positions"] = post["positions_filled"] + POSITIONS_STEP
+            entry = main.REGISTRY.post_entry(post_id)
+            if entry.state == main.PAST:
+                r = client.post(f"/departments/{entry.department_id}/past/{post_id}/restore", headers=headers)
+                assert r.status_code == 200, r.text
+
+
+def main_():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    main.LOADER.ensure_all()  # workers read main.APPLICANTS directly
+    client = TestClient(main.app)
+    users = [u for u in main.SEED_HR_USERS if main.POSTS.get(u["department_id"])]
+    sessions = [(login(client, u["email"], u["password"]), [p["id"] for p in main.POSTS[u["department_id"]]]) for u in users]
+    counts: Counter = Counter()
+    reopen(client, sessions)
+    barrier = threading.Barrier(threads, action=lambda: reopen(client, sessions))
+    pool = [
+        threading.Thread(target=worker, args=(client, *sessions[i % len(sessions)], ops, i, counts, barrier))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    problems = selection_problems(main)
+    print(json.dumps({
+        "threads": threads,
+        "requests": sum(counts.values()),
+        "seconds": round(elapsed, 2),
+        "responses": {f"{k} {s}": n for (k, s), n in sorted(counts.items())},
+        "problems": problems[:20],
+    }, indent=2))
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,74 @@
+"""Encoding large applicant lists: FastAPI's default path vs orjson, cached fragments and projection.
+
+Run from backend/:  python -m benchmarks.json_responses [rows] [repeats]
+
+Times the encode step alone and a full GET /posts/{id}/applicants through
+the app, so the rows below read as before (jsonable_encoder + JSONResponse)
+and after (FastJSONResponse over cached fragments).
+"""
+import json
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app import main
+from app.encoding import FragmentCache, applicant_stamp, dumps, join, pick, respond
+
+
+def best_ms(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 2)
+
+
+def main_():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    post = main.POSTS["it_software"][0]
+    main.LOADER.ensure_all()
+    main._add_applicants(post["id"], main.seed_applicants_for_post(post["id"] + "x", post["sector"], post["skills_required"], rows))
+    applicants = main.APPLICANTS[post["id"]][-rows:]
+    main._ranking(post)
+    slim = ("id", "name", "score", "status")
+
+    cache = FragmentCache(applicant_stamp)
+    cold = []
+
+    def fragments_cold():
+        cache.clear()
+        cold.append(respond(join(cache.get(a) for a in applicants)).body)
+
+    baseline = JSONResponse(jsonable_encoder(applicants)).body
+    fragments_cold()
+    assert cold[-1] == baseline, "fast path must produce the same bytes"
+
+    client = TestClient(main.app)
+    headers = {"token": client.post("/auth/login", json={"email": "it.hr@example.com", "password": "it12345"}).json()["access_token"]}
+    url = f"/posts/{post['id']}/applicants"
+
+    print(json.dumps({
+        "rows": rows,
+        "payload_bytes": len(baseline),
+        "projected_bytes": len(join(cache.get(a, slim) for a in applicants)),
+        "encode_ms": {
+            "jsonable_encoder_json": best_ms(lambda: JSONResponse(jsonable_encoder(applicants)).body, repeats),
+            "orjson_dicts": best_ms(lambda: dumps([pick(a, None) for a in applicants]), repeats),
+            "fragments_cold": best_ms(fragments_cold, repeats),
+            "fragments_warm": best_ms(lambda: respond(join(cache.get(a) for a in applicants)).body, repeats),
+            "fragments_warm_projected": best_ms(lambda: respond(join(cache.get(a, slim) for a in applicants)).body, repeats),
+        },
+        "endpoint_ms": {
+            "all_fields": best_ms(lambda: client.get(url, headers=headers), repeats),
+            "projected": best_ms(lambda: client.get(url, headers=headers, params={"fields": ",".join(slim)}), repeats),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main_()
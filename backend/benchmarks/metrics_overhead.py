@@ -0,0 +1,65 @@
+"""Cost of the built-in metrics: instrumented hot paths and a full request, enabled vs disabled.
+
+Run from backend/:  python -m benchmarks.metrics_overhead [calls] [requests]
+
+Each setting runs in a fresh process (METRICS_ENABLED=1 / 0), since the
+middleware is installed at import time.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter() - start) / calls * 1e9, 1)
+
+
+def child(calls, requests):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    client = TestClient(main.app)
+    token = client.post("/auth/login", json={"email": "it.hr@example.com", "password": "it12345"}).json()["access_token"]
+    headers = {"token": token}
+
+    def timer_block():
+        with main.METRICS.timer("bench"):
+            pass
+
+    for _ in range(50):
+        client.get("/posts/p1", headers=headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/posts/p1", headers=headers)
+    return {
+        "enabled": main.METRICS.enabled,
+        "timer_block_ns": per_call_ns(timer_block, calls),
+        "get_current_hr_ns": per_call_ns(lambda: main.get_current_hr(None, token=token, authorization=None), calls),
+        "request_us": round((time.perf_counter() - start) / requests * 1e6, 1),
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--child":
+        print(json.dumps(child(int(args[1]), int(args[2]))))
+        return
+    calls = int(args[0]) if args else 200_000
+    requests = int(args[1]) if len(args) > 1 else 2000
+    runs = []
+    for enabled in ("0", "1"):
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.metrics_overhead", "--child", str(calls), str(requests)],
+                              env={**os.environ, "METRICS_ENABLED": enabled}, capture_output=True, text=True)
+        if proc.returncode:
+            sys.exit(proc.stderr)
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    print(json.dumps(runs, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Fan-out cost of the notification stream with many open subscribers.
+
+Run from backend/:  python -m benchmarks.notification_stream [subscribers] [events]
+
+Subscribers are the same async generators the SSE endpoint returns, read
+directly on one event loop (no sockets), so the numbers are the server's
+share: memory per open stream, and how long it takes from a worker thread
+appending a notification until every subscriber has its frame.
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+from app.notifications import NotificationFeed, NotificationHub
+
+
+async def run(subscribers: int, events: int):
+    hub = NotificationHub(heartbeat=3600)
+    hub.bind(asyncio.get_running_loop())
+    feed = NotificationFeed()
+    received = [0] * subscribers
+    all_in = asyncio.Event()
+    pending = {"n": subscribers}
+
+    async def consume(i):
+        async for chunk in hub.stream("dept", feed, 0):
+            received[i] += chunk.count(b"\nid: ") + chunk.startswith(b"id: ")
+            if received[i] == target["n"]:
+                pending["n"] -= 1
+                if pending["n"] == 0:
+                    all_in.set()
+
+    target = {"n": 0}
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(consume(i)) for i in range(subscribers)]
+    await asyncio.sleep(0.1)  # let every subscriber reach its wait
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - base) / subscribers
+    tracemalloc.stop()
+
+    latencies = []
+    for n in range(1, events + 1):
+        target["n"], pending["n"] = n, subscribers
+        all_in.clear()
+        start = time.perf_counter()
+
+        def publish():
+            feed.append({"id": str(n), "type": "candidate_selected", "message": f"event {n}"})
+            hub.notify("dept")
+
+        threading.Thread(target=publish).start()
+        await all_in.wait()
+        latencies.append(time.perf_counter() - start)
+
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    latencies.sort()
+    return {
+        "subscribers": subscribers,
+        "events": events,
+        "bytes_per_subscriber": round(per_subscriber),
+        "fanout_ms": {
+            "p50": round(latencies[len(latencies) // 2] * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+        "per_subscriber_us": round(latencies[len(latencies) // 2] / subscribers * 1e6, 2),
+    }
+
+
+def main():
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(json.dumps(asyncio.run(run(subscribers, events)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Batch scorer vs the scalar reference, under random weights.
+
+Run from backend/:  python -m benchmarks.scoring_equivalence [trials] [applicants]
+
+Every trial draws fresh weights (fractional ones included, so sums land on
+rounding ties) and checks that ``ScoringEngine.rank`` returns exactly the
+scores of ``score_applicant`` and the order of a stable sort on them.
+Exits 1 on the first mismatch.
+"""
+import json
+import random
+import sys
+import time
+
+from app.main import seed_applicants_for_post
+from app.scoring import DEFAULT_WEIGHTS, ScoringEngine, score_applicant
+from app.synthetic import CITIES, SECTORS
+
+
+POST = {"id": "bench", "skills_required": ["python", "fastapi", "sql", "react"],
+        "sector": SECTORS["it_software"], "location_preference": CITIES[0]}
+# Known to round differently under Python's round() and np.round()
+TIE_WEIGHTS = {"skill_per_match": 12.5, "location_match": 2.675}
+
+
+def random_weights(rng: random.Random):
+    weights = {k: round(rng.uniform(-10, 40), rng.choice((0, 1, 2, 3))) for k in DEFAULT_WEIGHTS}
+    weights["semantic"] = 0
+    return weights
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(7)
+    applicants = seed_applicants_for_post(POST["id"], POST["sector"], POST["skills_required"], count)
+    start = time.perf_counter()
+    for trial in range(trials):
+        weights = {**DEFAULT_WEIGHTS, **TIE_WEIGHTS} if trial == 0 else random_weights(rng)
+        engine = ScoringEngine(weights)
+        scores, order = engine.rank(POST, applicants)
+        expected = [score_applicant(POST, a, weights) for a in applicants]
+        if scores.tolist() != expected:
+            row = next(i for i, (x, y) in enumerate(zip(scores.tolist(), expected)) if x != y)
+            sys.exit(f"trial {trial}: row {row} scored {scores[row]} (reference {expected[row]}) with weights {weights}")
+        if order.tolist() != sorted(range(count), key=lambda i: -expected[i]):
+            sys.exit(f"trial {trial}: ranking order differs with weights {weights}")
+    print(json.dumps({"trials": trials, "applicants": count, "mismatches": 0,
+                      "seconds": round(time.perf_counter() - start, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Cross-post boolean search: inverted bitmaps vs filtering every applicant.
+
+Run from backend/:  python -m benchmarks.search_index [applicants] [posts]
+
+Also times a status change (one bit flip in its post's bitmaps) and the
+first page of score-ranked matches, merged from the posts' rankings.
+"""
+import json
+import sys
+import itertools
+import time
+
+from app.applicants import Applicant
+from app.main import seed_applicants_for_post, SECTORS
+from app.scoring import ScoringEngine
+from app.search import InvertedIndex
+
+
+POST = {"skills_required": ["python", "sql"], "sector": SECTORS["it_software"], "location_preference": "Pune"}
+QUERY = {"and": [{"skill": "python"}, {"skill": "sql"}, {"or": [{"location": "Pune"}, {"location": "Delhi"}]}]}
+
+
+def scan(posts):
+    return sum(
+        1 for rows in posts.values() for a in rows
+        if "python" in a["skills"] and "sql" in a["skills"] and a["location"] in ("Pune", "Delhi")
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_posts = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    posts = {
+        f"p{n}": [Applicant.coerce(a) for a in seed_applicants_for_post(f"p{n}", SECTORS["it_software"], ["python", "sql"], count // n_posts)]
+        for n in range(n_posts)
+    }
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for pid, rows in posts.items():
+        index.add(pid, rows)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    matches = index.evaluate(QUERY, posts)
+    hits = index.count(matches)
+    query_ms = (time.perf_counter() - start) * 1000
+
+    flips = [a["id"] for rows in posts.values() for a in rows[:20]]
+    start = time.perf_counter()
+    for aid in flips:
+        index.status_changed(aid, "applied", "selected")
+    flip_us = (time.perf_counter() - start) * 1e6 / len(flips)
+
+    engine = ScoringEngine()
+    ranked = {pid: engine.ranked({**POST, "id": pid}, rows).index for pid, rows in posts.items()}
+    start = time.perf_counter()
+    page = list(itertools.islice(index.iter_by_score(matches, ranked), 50))
+    page_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    expected = scan(posts)
+    scan_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps({
+        "applicants": sum(len(r) for r in posts.values()),
+        "hits": hits,
+        "matches_scan": hits == expected,
+        "build_ms": round(build_ms, 1),
+        "query_ms": round(query_ms, 2),
+        "status_flip_us": round(flip_us, 1),
+        "ranked_page_ms": round(page_ms, 2),
+        "ranked_page_sorted": [k for k, _ in page] == sorted(k for k, _ in page) and len(page) == min(50, hits),
+        "scan_ms": round(scan_ms, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
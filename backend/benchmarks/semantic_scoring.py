@@ -0,0 +1,47 @@
+"""Semantic scoring cost: vectorizer fit, full-pool similarity and incremental appends.
+
+Run from backend/:  python -m benchmarks.semantic_scoring [applicants] [batch]
+"""
+import json
+import sys
+import time
+
+from app.applicants import Applicant
+from app.main import seed_applicants_for_post, SECTORS
+from app.semantic import SemanticIndex, applicant_text
+
+
+POST = {"id": "bench", "title": "Backend Internship",
+        "description": "Design and implement REST APIs with FastAPI, integrate databases, add tests and observability.",
+        "skills_required": ["python", "fastapi", "sql"], "sector": SECTORS["it_software"]}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, round((time.perf_counter() - start) * 1000, 1)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    pool = [Applicant.coerce(a) for a in seed_applicants_for_post("bench", POST["sector"], POST["skills_required"], count + batch)]
+    applicants = pool[:count]
+
+    index = SemanticIndex()
+    index.corpus = lambda: (applicant_text(a) for a in applicants)
+    _, first_ms = timed(lambda: index.similarity(POST, applicants))
+    _, warm_ms = timed(lambda: index.similarity(POST, applicants))
+    applicants = pool
+    _, append_ms = timed(lambda: index.similarity(POST, applicants, start=count))
+    print(json.dumps({
+        "applicants": count,
+        "fit_and_score_ms": first_ms,
+        "cached_score_ms": warm_ms,
+        "append_batch": batch,
+        "append_score_ms": append_ms,
+    }))
+
+
+if __name__ == "__main__":
+    main()
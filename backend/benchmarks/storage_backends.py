@@ -0,0 +1,63 @@
+"""Write-through latency: in-memory storage vs the SQL backend.
+
+Run from backend/:  python -m benchmarks.storage_backends [count] [database_url]
+
+Times the writes a persistent backend adds to each request: applicant
+ingestion, storing match scores and recording selections. Reads are
+served from the API's working set and never reach the backend. Without a
+URL the SQL backend uses a throwaway SQLite file.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from app.main import seed_applicants_for_post, SECTORS
+from app.scoring import score_applicant, DEFAULT_WEIGHTS
+from app.storage import MemoryStorage
+from app.storage_sql import SQLStorage
+
+
+POST = {"id": "bench", "title": "Bench", "positions": 1_000_000, "positions_filled": 0, "applied": 0,
+        "skills_required": ["python", "fastapi", "sql"], "location_preference": "Hyderabad",
+        "sector": SECTORS["it_software"]}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def run(storage, applicants, selections):
+    out = {}
+    storage.save_post("bench", POST, "active")
+    out["ingest_ms"] = timed(lambda: storage.add_applicants(POST["id"], applicants))
+
+    scores = [(a["id"], score_applicant(POST, a, DEFAULT_WEIGHTS)) for a in applicants]
+    out["score_ms"] = timed(lambda: storage.set_scores(POST["id"], scores))
+
+    ids = [a["id"] for a in applicants[:selections]]
+    out["select_ms_per_op"] = round(timed(lambda: [
+        storage.record_select("bench", POST["id"], i, str(n)) for n, i in enumerate(ids)
+    ]) / max(1, len(ids)), 3)
+    storage.close()
+    return out
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    applicants = [a.to_dict() for a in seed_applicants_for_post(POST["id"], POST["sector"], POST["skills_required"], count)]
+    selections = min(200, count)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = sys.argv[2] if len(sys.argv) > 2 else "sqlite:///" + os.path.join(tmp, "bench.db")
+        print(json.dumps({
+            "applicants": count,
+            "memory": run(MemoryStorage(), applicants, selections),
+            "sql": run(SQLStorage(url), applicants, selections),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Latency of the hot HR paths at several data sizes, as JSON.
+
+Run from backend/:  python -m benchmarks.suite [per_post_sizes] [extra_posts] [repeats] [--out file]
+
+e.g. ``python -m benchmarks.suite 100,1000,5000 200 20 --out bench.json``.
+Each size runs in a fresh process seeded through SEED_APPLICANTS_PER_POST
+and SEED_SYNTHETIC_POSTS, so sizes don't share caches and every run sees
+the same applicants (DATA_SEED). Timings go through the full request path
+(TestClient); the first call of each operation is reported separately as
+``cold_ms`` since it may build columns or a ranking.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def summarize(samples):
+    rest = np.asarray(samples[1:] or samples) * 1000
+    return {
+        "cold_ms": round(samples[0] * 1000, 3),
+        "mean_ms": round(float(rest.mean()), 3),
+        "p50_ms": round(float(np.percentile(rest, 50)), 3),
+        "p95_ms": round(float(np.percentile(rest, 95)), 3),
+        "n": len(samples),
+    }
+
+
+def timed(samples, fn):
+    start = time.perf_counter()
+    out = fn()
+    samples.append(time.perf_counter() - start)
+    return out
+
+
+def child(repeats):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.synthetic import generate_applicants
+
+    start = time.perf_counter()
+    main.LOADER.ensure_all()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generate_applicants("throughput", main.SECTORS["it_software"], ["python", "sql"], 100_000)
+    gen_rate = 100_000 / (time.perf_counter() - start)
+
+    client = TestClient(main.app)
+    token = client.post("/auth/login", json={"email": "it.hr@example.com", "password": "it12345"}).json()["access_token"]
+    headers = {"token": token}
+    dept = "it_software"
+    post = main.POSTS[dept][0]
+    pid = post["id"]
+    ids = [a.id for a in main.APPLICANTS[pid]]
+    post["positions"] = len(ids) + 1  # never fills up and moves to Past mid-run
+
+    def ok(r):
+        assert r.status_code == 200, (r.status_code, r.text[:200])
+        return r
+
+    times = {k: [] for k in ("get_current_hr", "match_candidates", "auto_select_candidates",
+                             "select_candidate", "export_selected", "get_applicant_profile")}
+    for i in range(repeats):
+        timed(times["get_current_hr"], lambda: main.get_current_hr(None, token=token, authorization=None))
+        timed(times["match_candidates"], lambda: ok(client.post(f"/posts/{pid}/match", headers=headers)))
+        timed(times["get_applicant_profile"], lambda: ok(client.get(f"/applicants/{ids[-1 - i]}", headers=headers)))
+        timed(times["select_candidate"],
+              lambda: ok(client.post(f"/posts/{pid}/select", json={"applicant_id": ids[i]}, headers=headers)))
+    for i in range(repeats):
+        # Room for a few more each time, so every call does real selection work; filling
+        # the post moves it to Past, so it is restored (untimed) before the next call
+        post["positions"] = post.get("positions_filled", 0) + 5
+        timed(times["auto_select_candidates"], lambda: ok(client.post(f"/posts/{pid}/auto_select", headers=headers)))
+        ok(client.post(f"/departments/{dept}/past/{pid}/restore", headers=headers))
+    for _ in range(repeats):
+        timed(times["export_selected"], lambda: ok(client.get(f"/departments/{dept}/selected/export", headers=headers)).content)
+
+    n_posts = sum(len(v) for v in main.POSTS.values())
+    return {
+        "applicants_per_post": len(ids),
+        "posts": n_posts,
+        "applicants_total": sum(len(main.APPLICANTS.get(p["id"], [])) for v in main.POSTS.values() for p in v),
+        "generate_per_second": round(gen_rate),
+        "import_seconds": main.LOADER.import_seconds,
+        "load_all_seconds": round(load_seconds, 3),
+        "ops": {k: summarize(v) for k, v in times.items()},
+    }
+
+
+def main():
+    args, out_path = sys.argv[1:], None
+    if "--out" in args:
+        i = args.index("--out")
+        out_path = args[i + 1]
+        del args[i:i + 2]
+    if args and args[0] == "--child":
+        print(json.dumps(child(int(args[1]))))
+        return
+    sizes = [int(s) for s in (args[0] if args else "100,1000,5000").split(",")]
+    extra_posts = int(args[1]) if len(args) > 1 else 200
+    repeats = int(args[2]) if len(args) > 2 else 20
+
+    runs = []
+    for size in sizes:
+        env = {**os.environ, "SEED_APPLICANTS_PER_POST": str(size), "SEED_SYNTHETIC_POSTS": str(extra_posts)}
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--child", str(repeats)],
+                              env=env, capture_output=True, text=True)
+        if proc.returncode:
+            sys.exit(f"size {size} failed:\n{proc.stderr}")
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        run["startup_and_run_s"] = round(time.perf_counter() - start, 2)
+        runs.append(run)
+        print(f"{size:>8} per post: done in {run['startup_and_run_s']}s", file=sys.stderr)
+
+    report = {"data_seed": int(os.getenv("DATA_SEED", "1")), "repeats": repeats, "runs": runs}
+    text = json.dumps(report, indent=2)
+    if out_path:
+        with open(out_path, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
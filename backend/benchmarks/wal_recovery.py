@@ -0,0 +1,55 @@
+"""Crash-recovery time of the WAL storage: mmap the snapshot, replay the log tail.
+
+Run from backend/:  python -m benchmarks.wal_recovery [applicants] [tail_records]
+"""
+import json
+import sys
+import tempfile
+import time
+
+from app.main import seed_applicants_for_post, SECTORS
+from app.storage_wal import WALStorage
+
+
+POSTS_COUNT = 100
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tail = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    per_post = count // POSTS_COUNT
+    with tempfile.TemporaryDirectory() as tmp:
+        wal = WALStorage(tmp, snapshot_every=10 ** 12)
+        wal.load()
+        ids = []
+        for n in range(POSTS_COUNT):
+            post = {"id": f"p{n}", "title": f"Post {n}", "positions": tail, "positions_filled": 0,
+                    "sector": SECTORS["it_software"]}
+            wal.save_post("bench", post, "active")
+            rows = seed_applicants_for_post(post["id"], post["sector"], ["python", "sql"], per_post)
+            wal.add_applicants(post["id"], rows)
+            ids.extend((post["id"], a["id"]) for a in rows[:tail // POSTS_COUNT + 1])
+        start = time.perf_counter()
+        wal.snapshot(background=False)
+        snapshot_ms = (time.perf_counter() - start) * 1000
+        for post_id, applicant_id in ids[:tail]:
+            wal.record_select("bench", post_id, applicant_id, str(time.time()))
+        # Simulate a crash: drop the handle without the shutdown snapshot
+        wal._log.close()
+        del wal
+
+        start = time.perf_counter()
+        recovered = WALStorage(tmp)
+        state = recovered.load()
+        recovery_ms = (time.perf_counter() - start) * 1000
+        print(json.dumps({
+            "applicants": per_post * POSTS_COUNT,
+            "tail_records": tail,
+            "snapshot_ms": round(snapshot_ms, 1),
+            "recovery_ms": round(recovery_ms, 1),
+            "recovered_selected": len(state["selected"].get("bench", [])),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main
+
+
+@pytest.fixture
+def main():
+    """app.main imported afresh, so every test starts from the seed data."""
+    return importlib.reload(app.main)
+
+
+@pytest.fixture
+def client(main):
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture
+def hr(client):
+    r = client.post("/auth/login", json={"email": "it.hr@example.com", "password": "it12345"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
@@ -0,0 +1,36 @@
+"""Consistency checks over app.main's selection state, shared by the tests and the stress benchmark."""
+from typing import List
+
+
+def selection_problems(main) -> List[str]:
+    """Every way the selection bookkeeping of ``main`` can disagree with itself; empty when consistent."""
+    main.LOADER.ensure_all()
+    problems = []
+    for dept_id, dept_posts in list(main.POSTS.items()) + list(main.PAST_POSTS.items()):
+        for post in dept_posts:
+            pid = post["id"]
+            selected = main.SELECTED_BY_POST.get(pid, {})
+            if post["positions_filled"] > post["positions"]:
+                problems.append(f"{pid}: {post['positions_filled']} filled > {post['positions']} positions")
+            if post["positions_filled"] != len(selected):
+                problems.append(f"{pid}: positions_filled {post['positions_filled']} != {len(selected)} selected")
+            for a in main.APPLICANTS[pid]:
+                in_sel = a.id in selected
+                in_rej = a.id in main.REJECTED_BY_POST.get(pid, {})
+                if in_sel and in_rej:
+                    problems.append(f"{a.id}: both selected and rejected")
+                expected = "selected" if in_sel else "rejected" if in_rej else "applied"
+                if a.status != expected:
+                    problems.append(f"{a.id}: status {a.status}, expected {expected}")
+            funnel = main.ANALYTICS.post_summary(post)["funnel"]
+            if (funnel["selected"], funnel["rejected"]) != (len(selected), len(main.REJECTED_BY_POST.get(pid, {}))):
+                problems.append(f"{pid}: analytics funnel {funnel} disagrees with selection state")
+            ranking = main._ranking(post)
+            applied = {main.APPLICANTS[pid][row].id for row in ranking.index.next_applied(len(main.APPLICANTS[pid]))}
+            if applied != {a.id for a in main.APPLICANTS[pid] if a.status == "applied"}:
+                problems.append(f"{pid}: ranked index disagrees on applied applicants")
+    for dept_id, log in main.SELECTED.items():
+        by_post = sum(len(main.SELECTED_BY_POST.get(p["id"], {})) for p in main.POSTS.get(dept_id, []) + main.PAST_POSTS.get(dept_id, []))
+        if len(log) != by_post:
+            problems.append(f"{dept_id}: {len(log)} in SELECTED vs {by_post} by post")
+    return problems
@@ -0,0 +1,50 @@
+def get(client, hr, url, etag=None, **params):
+    headers = {**hr, "If-None-Match": etag} if etag else hr
+    return client.get(url, headers=headers, params=params)
+
+
+def test_unchanged_resource_is_304(client, hr):
+    r = get(client, hr, "/posts/p1/applicants")
+    assert r.status_code == 200 and r.headers["ETag"]
+    again = get(client, hr, "/posts/p1/applicants", r.headers["ETag"])
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == r.headers["ETag"]
+
+
+def test_etag_depends_on_the_query(client, hr):
+    a = get(client, hr, "/posts/p1/applicants", limit=5)
+    b = get(client, hr, "/posts/p1/applicants", limit=6)
+    assert a.headers["ETag"] != b.headers["ETag"]
+    assert get(client, hr, "/posts/p1/applicants", a.headers["ETag"], limit=6).status_code == 200
+
+
+def test_select_invalidates_what_it_changes(client, hr):
+    urls = ["/posts/p1/applicants", "/posts/p1", "/departments/it_software/posts",
+            "/departments/it_software/selected", "/departments/it_software/analytics"]
+    tags = {u: get(client, hr, u).headers["ETag"] for u in urls}
+    assert all(get(client, hr, u, tags[u]).status_code == 304 for u in urls)
+
+    assert client.post("/posts/p1/select", headers=hr, json={"applicant_id": "p1-1"}).status_code == 200
+
+    for u in urls:
+        r = get(client, hr, u, tags[u])
+        assert r.status_code == 200, u
+        assert r.headers["ETag"] != tags[u], u
+    selected = get(client, hr, "/departments/it_software/selected").json()
+    assert [a["id"] for a in selected] == ["p1-1"]
+    assert get(client, hr, "/posts/p1").json()["positions_filled"] == 1
+
+
+def test_select_leaves_other_departments_cached(client, hr):
+    health = client.post("/auth/login", json={"email": "health.hr@example.com", "password": "health12345"})
+    other = {"Authorization": f"Bearer {health.json()['access_token']}"}
+    tag = get(client, other, "/departments/healthcare/posts").headers["ETag"]
+    assert client.post("/posts/p1/select", headers=hr, json={"applicant_id": "p1-1"}).status_code == 200
+    assert get(client, other, "/departments/healthcare/posts", tag).status_code == 304
+
+
+def test_weak_and_listed_etags_match(client, hr):
+    tag = get(client, hr, "/posts/p1").headers["ETag"]
+    assert get(client, hr, "/posts/p1", f'"other", W/{tag}').status_code == 304
+    assert get(client, hr, "/posts/p1", "*").status_code == 304
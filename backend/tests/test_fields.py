@@ -0,0 +1,47 @@
+import pytest
+
+
+def test_applicant_projection(client, hr):
+    full = client.get("/posts/p1/applicants", headers=hr).json()
+    r = client.get("/posts/p1/applicants", headers=hr, params={"fields": "id,score,name"})
+    assert r.status_code == 200
+    assert [list(a) for a in r.json()] == [["id", "score", "name"]] * len(full)
+    assert r.json() == [{"id": a["id"], "score": a["score"], "name": a["name"]} for a in full]
+
+
+def test_projection_keeps_paging(client, hr):
+    r = client.get("/posts/p1/applicants", headers=hr, params={"fields": "id", "limit": 4, "sort": "score"})
+    first = [a["id"] for a in r.json()]
+    rest = client.get("/posts/p1/applicants", headers=hr,
+                      params={"fields": "id", "sort": "score", "cursor": r.headers["X-Next-Cursor"]}).json()
+    full = client.get("/posts/p1/applicants", headers=hr, params={"fields": "id", "sort": "score"}).json()
+    assert first + [a["id"] for a in rest] == [a["id"] for a in full]
+
+
+def test_filters_apply_to_unprojected_fields(client, hr):
+    full = client.get("/posts/p1/applicants", headers=hr).json()
+    location = full[0]["location"]
+    r = client.get("/posts/p1/applicants", headers=hr, params={"fields": "id", "location": location})
+    assert r.json() == [{"id": a["id"]} for a in full if a["location"] == location]
+
+
+def test_post_projection(client, hr):
+    one = client.get("/posts/p1", headers=hr, params={"fields": "id,positions_filled"})
+    assert one.json() == {"id": "p1", "positions_filled": 0}
+    listed = client.get("/departments/it_software/posts", headers=hr, params={"fields": "id,title"}).json()
+    assert listed and all(list(p) == ["id", "title"] for p in listed)
+
+
+def test_selected_projection_reflects_changes(client, hr):
+    params = {"fields": "id,post_id,status"}
+    assert client.get("/departments/it_software/selected", headers=hr, params=params).json() == []
+    client.post("/posts/p1/select", headers=hr, json={"applicant_id": "p1-2"})
+    got = client.get("/departments/it_software/selected", headers=hr, params=params).json()
+    assert got == [{"id": "p1-2", "post_id": "p1", "status": "selected"}]
+
+
+@pytest.mark.parametrize("url", ["/posts/p1/applicants", "/posts/p1", "/departments/it_software/posts"])
+def test_unknown_field_is_400(client, hr, url):
+    r = client.get(url, headers=hr, params={"fields": "id,password"})
+    assert r.status_code == 400
+    assert "password" in r.json()["detail"]
@@ -0,0 +1,110 @@
+import asyncio
+
+from app.notifications import NotificationFeed, NotificationHub
+
+
+def notify_three(client, hr):
+    for aid in ("p1-1", "p1-2", "p1-3"):
+        assert client.post("/posts/p1/reject", headers=hr, json={"applicant_id": aid}).status_code == 200
+
+
+def test_since_returns_only_newer(client, hr):
+    notify_three(client, hr)
+    url = "/departments/it_software/notifications"
+    every = client.get(url, headers=hr).json()
+    assert [n["seq"] for n in every] == [1, 2, 3]
+    assert [n["seq"] for n in client.get(url, headers=hr, params={"since": 1}).json()] == [2, 3]
+    assert client.get(url, headers=hr, params={"since": 3}).json() == []
+    newest = client.get(url, headers=hr, params={"since": 1, "sort": "newest"}).json()
+    assert [n["seq"] for n in newest] == [3, 2]
+
+
+def test_since_then_new_notification(client, hr):
+    notify_three(client, hr)
+    url = "/departments/it_software/notifications"
+    last = client.get(url, headers=hr).json()[-1]["seq"]
+    client.post("/posts/p1/reject", headers=hr, json={"applicant_id": "p1-4"})
+    got = client.get(url, headers=hr, params={"since": last}).json()
+    assert [n["seq"] for n in got] == [last + 1]
+    assert got[0]["type"] == "candidate_rejected"
+
+
+def test_since_pages_with_cursor(client, hr):
+    notify_three(client, hr)
+    url = "/departments/it_software/notifications"
+    r = client.get(url, headers=hr, params={"since": 1, "limit": 1})
+    assert [n["seq"] for n in r.json()] == [2]
+    rest = client.get(url, headers=hr, params={"since": 1, "limit": 1, "cursor": r.headers["X-Next-Cursor"]})
+    assert [n["seq"] for n in rest.json()] == [3]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_negative_since_is_422(client, hr):
+    assert client.get("/departments/it_software/notifications", headers=hr, params={"since": -1}).status_code == 422
+
+
+def feed_of(count, maxlen=10):
+    feed = NotificationFeed(maxlen)
+    for i in range(count):
+        feed.append({"id": f"n{i}", "type": "note", "message": str(i)})
+    return feed
+
+
+def read_stream(feed, after, frames=2):
+    """The first ``frames`` chunks a stream resumed after ``after`` sends."""
+    async def run():
+        stream = NotificationHub(heartbeat=60).stream("d", feed, after)
+        out = [await stream.__anext__() for _ in range(frames)]
+        await stream.aclose()
+        return out
+    return asyncio.run(run())
+
+
+def event_ids(chunk):
+    return [int(line[4:]) for line in chunk.decode().splitlines() if line.startswith("id: ")]
+
+
+def test_stream_resumes_after_last_event_id():
+    retry, chunk = read_stream(feed_of(5), after=3)
+    assert retry.startswith(b"retry:")
+    assert event_ids(chunk) == [4, 5]
+
+
+def test_stream_reports_gap_when_resume_point_fell_out():
+    feed = feed_of(15, maxlen=10)   # seqs 6-15 retained
+    _, gap, chunk = read_stream(feed, after=2, frames=3)
+    assert gap.startswith(b"event: gap")
+    assert event_ids(chunk) == list(range(6, 16))
+
+
+def test_replayed_entry_is_ignored():
+    feed = feed_of(2)
+    assert feed.append({"id": "n1", "type": "note", "message": "again"}) is None
+    assert [seq for seq, _ in feed.iter_after(None)] == [1, 2]
+
+
+def test_restored_history_keeps_sequence_numbers():
+    feed = NotificationFeed(3)
+    feed.extend([{"id": f"n{i}", "message": str(i)} for i in range(5)])
+    assert (feed.first_seq, feed.last_seq) == (3, 5)
+    assert [e["message"] for _, e in feed.iter_after(None, since=3)] == ["3", "4"]
+
+
+def test_waiting_stream_wakes_on_append():
+    feed = feed_of(2)
+
+    async def run():
+        hub = NotificationHub(heartbeat=60)
+        hub.bind(asyncio.get_running_loop())
+        stream = hub.stream("d", feed, feed.last_seq)
+        await stream.__anext__()   # retry hint
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        feed.append({"id": "n-new", "type": "note", "message": "new"})
+        hub.notify("d")
+        chunk = await asyncio.wait_for(pending, 5)
+        await stream.aclose()
+        return chunk
+
+    assert event_ids(asyncio.run(run())) == [3]
@@ -0,0 +1,93 @@
+import pytest
+
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor
+
+
+def pages(client, hr, url, **params):
+    """Follow X-Next-Cursor from the first page to the last; returns the pages."""
+    out, cursor = [], None
+    while True:
+        r = client.get(url, headers=hr, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        out.append(r.json())
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return out
+
+
+@pytest.mark.parametrize("sort", ["default", "score"])
+def test_pages_cover_the_list_once(client, hr, sort):
+    full = client.get("/posts/p1/applicants", headers=hr, params={"sort": sort}).json()
+    got = pages(client, hr, "/posts/p1/applicants", sort=sort, limit=5)
+    assert all(len(p) == 5 for p in got[:-1]) and 0 < len(got[-1]) <= 5
+    assert [a["id"] for p in got for a in p] == [a["id"] for a in full]
+
+
+def test_score_pages_are_ranked(client, hr):
+    ids = [a["id"] for p in pages(client, hr, "/posts/p1/applicants", sort="score", limit=7) for a in p]
+    scores = {a["id"]: a["score"] for a in client.get("/posts/p1/applicants", headers=hr).json()}
+    assert [scores[i] for i in ids] == sorted(scores.values(), reverse=True)
+
+
+def test_last_page_has_no_cursor(client, hr):
+    total = len(client.get("/posts/p1/applicants", headers=hr).json())
+    r = client.get("/posts/p1/applicants", headers=hr, params={"limit": total})
+    assert len(r.json()) == total
+    assert NEXT_CURSOR_HEADER not in r.headers
+
+
+def test_filtered_pages(client, hr, main):
+    main.LOADER.ensure("it_software")
+    location = main.APPLICANTS["p1"][0].location
+    full = client.get("/posts/p1/applicants", headers=hr, params={"location": location}).json()
+    got = pages(client, hr, "/posts/p1/applicants", location=location, limit=2)
+    assert full and all(a["location"] == location for a in full)
+    assert [a["id"] for p in got for a in p] == [a["id"] for a in full]
+
+
+def test_cursor_resumes_after_the_last_item(client, hr, main):
+    first = client.get("/posts/p1/applicants", headers=hr, params={"limit": 10})
+    rest = client.get("/posts/p1/applicants", headers=hr,
+                      params={"cursor": first.headers[NEXT_CURSOR_HEADER], "limit": MAX_PAGE_SIZE}).json()
+    assert [a["id"] for a in first.json() + rest] == [a["id"] for a in main.APPLICANTS["p1"]]
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("default", "not-base64!"),
+    ("default", "bm90IGpzb24"),                  # base64 of "not json"
+    ("default", encode_cursor("default", -1)),
+    ("default", encode_cursor("default", "3")),
+    ("default", encode_cursor("default", True)),
+    ("score", encode_cursor("score", 3)),
+    ("score", encode_cursor("score", [1.0])),
+    ("score", encode_cursor("score", [float("inf"), 1])),
+])
+def test_malformed_cursor_is_400(client, hr, sort, cursor):
+    r = client.get("/posts/p1/applicants", headers=hr, params={"cursor": cursor, "sort": sort})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_from_another_sort_is_400(client, hr):
+    r = client.get("/posts/p1/applicants", headers=hr, params={"limit": 3})
+    cursor = r.headers[NEXT_CURSOR_HEADER]
+    r = client.get("/posts/p1/applicants", headers=hr, params={"cursor": cursor, "sort": "score"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Cursor does not match sort order"
+
+
+def test_unknown_sort_is_400(client, hr):
+    r = client.get("/posts/p1/applicants", headers=hr, params={"sort": "newest"})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_range_is_422(client, hr, limit):
+    assert client.get("/posts/p1/applicants", headers=hr, params={"limit": limit}).status_code == 422
+
+
+def test_log_pages_newest_first(client, hr):
+    for aid in ("p1-1", "p1-2", "p1-3"):
+        assert client.post("/posts/p1/reject", headers=hr, json={"applicant_id": aid}).status_code == 200
+    got = pages(client, hr, "/departments/it_software/rejected", sort="newest", limit=2)
+    assert [a["id"] for p in got for a in p] == ["p1-3", "p1-2", "p1-1"]
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.startup import StateLoader
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_not_ready_until_warmup_finishes(main):
+    release = threading.Event()
+    loaded = []
+
+    def load(unit):
+        release.wait(10)
+        loaded.append(unit)
+
+    main.LOADER = StateLoader(load, ["it_software", "healthcare"])
+    with TestClient(main.app) as client:
+        r = client.get("/readyz")
+        assert r.status_code == 503
+        assert r.json()["status"] == "warming" and r.json()["units_loaded"] == 0
+        assert client.get("/healthz").status_code == 200
+
+        release.set()
+        wait_for(lambda: main.LOADER.ready)
+        r = client.get("/readyz")
+        assert r.status_code == 200
+        assert r.json()["status"] == "ready"
+        assert r.json()["units_loaded"] == r.json()["units_total"] == 2
+        assert loaded == ["it_software", "healthcare"]
+
+
+def test_not_ready_before_startup(main):
+    client = TestClient(main.app)   # no lifespan, so warm-up never starts
+    r = client.get("/readyz")
+    assert r.status_code == 503
+    assert r.json()["status"] == "starting"
+
+
+def test_failed_warmup_stays_unready(main):
+    def load(unit):
+        raise RuntimeError("disk on fire")
+
+    main.LOADER = StateLoader(load, ["it_software"])
+    with TestClient(main.app) as client:
+        wait_for(lambda: main.LOADER.phase == "failed")
+        r = client.get("/readyz")
+        assert r.status_code == 503
+        assert r.json()["error"] == "RuntimeError: disk on fire"
+
+
+def test_seed_data_warms_every_department(client, main):
+    if not main.LOADER.lazy:
+        pytest.skip("state is loaded as one snapshot")
+    wait_for(lambda: client.get("/readyz").status_code == 200)
+    status = client.get("/readyz").json()
+    assert status["units_loaded"] == status["units_total"] == len(main.POSTS)
+    assert all(main.APPLICANTS.get(p["id"]) for posts in main.POSTS.values() for p in posts)
+
+
+def test_cold_department_loads_on_request(main):
+    if not main.LOADER.lazy:
+        pytest.skip("state is loaded as one snapshot")
+    client = TestClient(main.app)   # no warm-up
+    token = client.post("/auth/login", json={"email": "it.hr@example.com", "password": "it12345"}).json()["access_token"]
+    assert "p1" not in main.APPLICANTS
+    r = client.get("/posts/p1/applicants", headers={"token": token})
+    assert r.status_code == 200 and r.json()
+    assert "p7" not in main.APPLICANTS
+    assert client.get("/readyz").status_code == 503
@@ -0,0 +1,95 @@
+import importlib
+import random
+import threading
+
+import pytest
+
+import app.main
+import app.shared
+from tests.invariants import selection_problems
+
+
+@pytest.fixture(params=["none", "fake"])
+def main(request, monkeypatch):
+    """app.main with per-process state, and with state shared through an in-memory Redis."""
+    monkeypatch.setattr(app.shared, "SHARED_STATE", request.param)
+    return importlib.reload(app.main)
+
+
+def race(n, fn):
+    """Run ``fn(i)`` on ``n`` threads released together; returns the results in order."""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = fn(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_racing_selects_fill_exactly_the_open_positions(client, hr, main):
+    main.LOADER.ensure_all()
+    ids = [a.id for a in main.APPLICANTS["p1"]][:16]
+    codes = race(16, lambda i: client.post("/posts/p1/select", headers=hr, json={"applicant_id": ids[i]}).status_code)
+    post = main.REGISTRY.post("p1")
+    assert codes.count(200) == post["positions"] == post["positions_filled"] == 3
+    assert set(codes) <= {200, 400, 404}
+    assert main.REGISTRY.post_entry("p1").state == main.PAST
+    assert selection_problems(main) == []
+
+
+def test_racing_auto_selects_and_batches(client, hr, main):
+    main.LOADER.ensure_all()
+    ids = [a.id for a in main.APPLICANTS["p2"]]
+
+    def act(i):
+        if i % 2:
+            return client.post("/posts/p2/auto_select", headers=hr)
+        return client.post("/posts/p2/select:batch", headers=hr, json={"applicant_ids": ids[i:i + 2]})
+
+    race(12, act)
+    post = main.REGISTRY.post("p2")
+    assert post["positions_filled"] == post["positions"]
+    assert len(main.SELECTED_BY_POST["p2"]) == post["positions"]
+    assert selection_problems(main) == []
+
+
+def test_mixed_workload_keeps_bookkeeping_consistent(client, hr, main):
+    main.LOADER.ensure_all()
+    for pid in ("p1", "p2"):
+        main.REGISTRY.post(pid)["positions"] = 12   # fills up partway through the run
+    ids = {pid: [a.id for a in main.APPLICANTS[pid]] for pid in ("p1", "p2")}
+
+    def work(i):
+        rnd = random.Random(i)
+        for _ in range(20):
+            pid = rnd.choice(("p1", "p2"))
+            kind = rnd.choice(("select", "reject", "auto_select", "select:batch", "reject:batch"))
+            if kind in ("select", "reject"):
+                client.post(f"/posts/{pid}/{kind}", headers=hr, json={"applicant_id": rnd.choice(ids[pid])})
+            elif kind == "auto_select":
+                client.post(f"/posts/{pid}/auto_select", headers=hr)
+            else:
+                client.post(f"/posts/{pid}/{kind}?preview=0", headers=hr, json={"applicant_ids": rnd.sample(ids[pid], 3)})
+
+    race(8, work)
+    assert selection_problems(main) == []
+
+
+def test_reject_releases_a_held_position(client, hr, main):
+    assert client.post("/posts/p1/select", headers=hr, json={"applicant_id": "p1-1"}).status_code == 200
+    assert client.get("/posts/p1", headers=hr).json()["positions_filled"] == 1
+    assert client.post("/posts/p1/reject", headers=hr, json={"applicant_id": "p1-1"}).status_code == 200
+    assert client.get("/posts/p1", headers=hr).json()["positions_filled"] == 0
+    assert selection_problems(main) == []
+    # Selecting again moves them back out of the rejected list
+    assert client.post("/posts/p1/select", headers=hr, json={"applicant_id": "p1-1"}).status_code == 200
+    assert client.get("/departments/it_software/rejected", headers=hr).json() == []
+    assert client.get("/posts/p1", headers=hr).json()["positions_filled"] == 1
+    assert selection_problems(main) == []